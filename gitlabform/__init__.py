@@ -1,4 +1,6 @@
+import functools
 import sys
+from enum import Enum
 from logging import debug
 
 import argparse
@@ -12,12 +14,8 @@ from cli_ui import (
     Symbol,
     reset,
     blue,
-    message,
     error,
-    info,
     fatal,
-    info_1,
-    debug as verbose,
     red,
     green,
     yellow,
@@ -26,27 +24,48 @@ from cli_ui import (
     warning,
 )
 from packaging import version
-from typing import Any, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from gitlabform.configuration import Configuration
 from gitlabform.configuration.core import (
     ConfigFileNotFoundException,
     ConfigInvalidException,
 )
+from gitlabform.configuration.diff import ConfigurationDiff
 from gitlabform.configuration.transform import ConfigurationTransformers
 from gitlabform.constants import EXIT_INVALID_INPUT, EXIT_PROCESSING_ERROR
 from gitlabform.gitlab import GitLab
-from gitlabform.gitlab.core import TestRequestFailedException
+from gitlabform.gitlab.core import NotFoundException, TestRequestFailedException
+from gitlabform.incremental import IncrementalState
 from gitlabform.lists import Entities
 from gitlabform.lists.filter import GroupsAndProjectsFilters
 from gitlabform.lists.groups import GroupsProvider
 from gitlabform.lists.projects import ProjectsProvider
-from gitlabform.output import EffectiveConfigurationFile
+from gitlabform.output import (
+    EffectiveConfigurationFile,
+    EntityOutputBuffer,
+    debug as verbose,
+    info,
+    info_1,
+    info_table,
+    message,
+)
+from gitlabform.parallel import DependentTasksExecutor, get_namespace_dependencies
+from gitlabform.plan import Plan
+from gitlabform.prefetch.groups import GroupsStatePrefetcher
+from gitlabform.prefetch.projects import ProjectsStatePrefetcher
 from gitlabform.processors.application import ApplicationProcessors
 from gitlabform.processors.group import GroupProcessors
 from gitlabform.processors.project import ProjectProcessors
 
 
+class ProcessingResult(Enum):
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    # f.e. a project that has been transferred in the previous run
+    OMITTED = "omitted"
+
+
 class GitLabForm:
     def __init__(
         self,
@@ -56,6 +75,7 @@ class GitLabForm:
         noop=False,
         output_file=None,
         recurse_subgroups=True,
+        parallelism=1,
     ):
         if target and config_string:
             # this mode is basically only for testing
@@ -76,6 +96,17 @@ class GitLabForm:
             self.terminate_after_error = True
             self.only_sections = "all"
             self.recurse_subgroups = recurse_subgroups
+            self.parallelism = parallelism
+            self.refresh_cache = False
+            self.profile_report = None
+            self.metrics_file = None
+            self.trace_file = None
+            self.plan_file = None
+            self.apply_file = None
+            self.plan = None
+            self.full_verify = False
+            self.incremental_since = None
+            self.changed_since = None
 
             self._configure_output(tests=True)
         else:
@@ -98,6 +129,16 @@ class GitLabForm:
                 self.terminate_after_error,
                 self.only_sections,
                 self.recurse_subgroups,
+                self.parallelism,
+                self.refresh_cache,
+                self.profile_report,
+                self.metrics_file,
+                self.trace_file,
+                self.plan_file,
+                self.apply_file,
+                self.full_verify,
+                self.incremental_since,
+                self.changed_since,
             ) = self._parse_args()
 
             self._configure_output()
@@ -106,6 +147,16 @@ class GitLabForm:
             if self.just_show_version:
                 sys.exit(0)
 
+            self.plan = Plan.read(self.apply_file) if self.apply_file else None
+            if self.plan:
+                if not self.target:
+                    self.target = self.plan.target
+                elif self.target != self.plan.target:
+                    fatal(
+                        f"The plan has been made for target {self.plan.target}, not {self.target}.",
+                        exit_code=EXIT_INVALID_INPUT,
+                    )
+
             if not self.target:
                 fatal(
                     "target parameter is required.",
@@ -113,6 +164,16 @@ class GitLabForm:
                 )
 
         self.gitlab, self.configuration = self._initialize_configuration_and_gitlab()
+        self.gitlab.profiler.enabled = bool(self.profile_report)
+        # ...which also enables sending the trace to an OTLP endpoint, if it is set in the environment
+        self.gitlab.tracer.enable(file=self.trace_file)
+        self.gitlab.fingerprints.full_verify = self.full_verify
+
+        if self.plan and self.plan.gitlab_url != self.gitlab.url:
+            fatal(
+                f"The plan has been made for GitLab at {self.plan.gitlab_url}, not {self.gitlab.url}.",
+                exit_code=EXIT_INVALID_INPUT,
+            )
 
         self.application_processors = ApplicationProcessors(
             self.gitlab, self.configuration, self.strict
@@ -123,6 +184,8 @@ class GitLabForm:
         self.project_processors = ProjectProcessors(
             self.gitlab, self.configuration, self.strict
         )
+        self.groups_state_prefetcher = GroupsStatePrefetcher(self.gitlab)
+        self.projects_state_prefetcher = ProjectsStatePrefetcher(self.gitlab)
         self.groups_provider = GroupsProvider(
             self.gitlab,
             self.configuration,
@@ -135,8 +198,21 @@ class GitLabForm:
             self.recurse_subgroups,
         )
 
+        self.incremental_state = IncrementalState(
+            self.incremental_since, self.gitlab.url
+        )
+        self.configuration_diff = (
+            self._get_configuration_diff(self.changed_since)
+            if self.changed_since
+            else None
+        )
         self.groups_and_projects_filters = GroupsAndProjectsFilters(
-            self.configuration, self.group_processors, self.project_processors
+            self.configuration,
+            self.group_processors,
+            self.project_processors,
+            self.gitlab,
+            self.incremental_state,
+            self.configuration_diff,
         )
 
     @staticmethod
@@ -293,8 +369,113 @@ class GitLabForm:
             help="include all subgroups recursively. Always true for ALL, ALL_DEFINED",
         )
 
+        parser.add_argument(
+            "-p",
+            "--parallelism",
+            dest="parallelism",
+            default=1,
+            type=int,
+            help="number of groups and projects to process in parallel. Each group is still processed before"
+            " its subgroups and projects. The output of each group/project is printed at once when it is done,"
+            " so they may appear in a different order than their numbers.",
+        )
+
+        parser.add_argument(
+            "-rc",
+            "--refresh-cache",
+            dest="refresh_cache",
+            action="store_true",
+            help="ignore the existing entries in the persistent cache and the compiled config cache"
+            " (if they are configured) and get everything from GitLab again",
+        )
+
+        parser.add_argument(
+            "-pr",
+            "--profile-report",
+            dest="profile_report",
+            default=None,
+            help="name/path of a JSON file to write the info about all the requests made to GitLab to."
+            " The endpoints, sections and groups/projects that took the most time are printed at the end.",
+        )
+
+        parser.add_argument(
+            "-mf",
+            "--metrics-file",
+            dest="metrics_file",
+            default=None,
+            help="name/path of a file to write the time and numbers of requests of processing each section to,"
+            " in the OpenMetrics/Prometheus text format (f.e. for the node exporter's textfile collector)",
+        )
+
+        parser.add_argument(
+            "-tf",
+            "--trace-file",
+            dest="trace_file",
+            default=None,
+            help="name/path of a file to write the trace of the run to, in the OpenTelemetry (OTLP) JSON format."
+            " (To send it to an OTLP/HTTP endpoint instead, set the standard OTEL_EXPORTER_OTLP_ENDPOINT"
+            " or OTEL_EXPORTER_OTLP_TRACES_ENDPOINT environment variable.)",
+        )
+
+        plan_args = parser.add_mutually_exclusive_group()
+
+        plan_args.add_argument(
+            "-pl",
+            "--plan",
+            dest="plan_file",
+            default=None,
+            help="name/path of a file to write the plan to - the changes that would be made, computed without"
+            " making any of them. The plan can be applied later with --apply.",
+        )
+
+        plan_args.add_argument(
+            "-ap",
+            "--apply",
+            dest="apply_file",
+            default=None,
+            help="name/path of a file with the plan made with --plan to apply. Only the sections with planned changes"
+            " are processed, and a group/project fails if its configuration or its state in GitLab has changed"
+            " since the plan was made. The target can be omitted, then the one of the plan is used.",
+        )
+
+        parser.add_argument(
+            "-fv",
+            "--full-verify",
+            dest="full_verify",
+            action="store_true",
+            help="process all the sections, even the ones that would be skipped as having nothing changed"
+            " since the last run according to the fingerprints (if they are configured)",
+        )
+
+        parser.add_argument(
+            "-is",
+            "--incremental-since",
+            dest="incremental_since",
+            default=None,
+            help="process only the groups and projects that could have changed since the given time"
+            ' (in ISO 8601 format, like "2024-01-31T12:00:00Z") according to GitLab, or since the last run'
+            " - if a path to a state file is given instead. The state file is updated after each successful"
+            " run for ALL or ALL_DEFINED, and then also the groups and projects with changed configs are processed.",
+        )
+
+        parser.add_argument(
+            "-cs",
+            "--changed-since",
+            dest="changed_since",
+            default=None,
+            help="process only the sections of the groups and projects which effective configs are different"
+            " than in the given previous version of the config - a path to it, or a git reference (like HEAD~1)"
+            " of the commit with it in the git repository with the config file",
+        )
+
         args = parser.parse_args()
 
+        if args.noop and (args.plan_file or args.apply_file):
+            parser.error("--noop cannot be used with --plan or --apply")
+
+        if args.parallelism < 1:
+            parser.error("--parallelism has to be a positive number")
+
         if args.only_sections != "all":
             args.only_sections = args.only_sections.split(",")
 
@@ -315,6 +496,16 @@ class GitLabForm:
             args.terminate_after_error,
             args.only_sections,
             args.recurse_subsgroups,
+            args.parallelism,
+            args.refresh_cache,
+            args.profile_report,
+            args.metrics_file,
+            args.trace_file,
+            args.plan_file,
+            args.apply_file,
+            args.full_verify,
+            args.incremental_since,
+            args.changed_since,
         )
 
     def _configure_output(self, tests=False) -> None:
@@ -364,7 +555,9 @@ class GitLabForm:
             if hasattr(self, "config_string"):
                 gitlab = GitLab(config_string=self.config_string)
             else:
-                gitlab = GitLab(config_path=self.config)
+                gitlab = GitLab(
+                    config_path=self.config, refresh_cache=self.refresh_cache
+                )
             configuration = gitlab.get_configuration()
 
             configuration_transformers = ConfigurationTransformers(gitlab)
@@ -388,99 +581,355 @@ class GitLabForm:
 
         return gitlab, configuration
 
+    def _get_configuration_diff(
+        self, changed_since: str
+    ) -> Optional[ConfigurationDiff]:
+        """
+        :param changed_since: path to the previous version of the configuration or a git reference to it
+        :return: object comparing the configuration with its previous version, transformed in the same way,
+                 or None if the previous version cannot be transformed - then everything is processed
+        """
+        old_config_string = ConfigurationDiff.read_old_configuration(
+            changed_since, Configuration._get_config_path(self.config)
+        )
+        try:
+            old_configuration = Configuration(config_string=old_config_string)
+            ConfigurationTransformers(self.gitlab).transform(old_configuration)
+        except ConfigInvalidException as e:
+            fatal(
+                f"Invalid previous version of the config:\n{e.underlying}",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+        except NotFoundException as e:
+            # f.e. a user or a group from the previous version has been deleted since then
+            warning(
+                f"Cannot get the ids of the users or groups in the previous version of the config,"
+                f" so all the sections will be processed: {e}"
+            )
+            return None
+        return ConfigurationDiff(self.configuration, old_configuration)
+
     def run(self) -> None:
         """
         The main method.
         """
 
-        projects, groups = self._get_groups_and_projects(
-            self.target,
-        )
+        try:
+            with self.gitlab.tracer.span(
+                "gitlabform run", {"gitlabform.target": self.target}
+            ):
+                projects, groups = self._get_groups_and_projects(
+                    self.target,
+                )
+
+                if self.plan_file:
+                    self._prefetch_state(groups, projects)
+                    self._make_plan(groups, projects)
+                    return
+
+                effective_configuration = EffectiveConfigurationFile(self.output_file)
+
+                application_configuration = self.configuration.get("application", {})
+                if (
+                    application_configuration
+                    and self._is_planned("")
+                    and self._get_only_sections("")
+                ):
+                    self.application_processors.process_entity(
+                        "",
+                        application_configuration,
+                        dry_run=self.noop,
+                        diff_only_changed=self.diff_only_changed,
+                        effective_configuration=effective_configuration,
+                        only_sections=self._get_only_sections(""),
+                        planned_sections=self._get_planned_sections(""),
+                    )
 
-        group_number = 0
-        successful_groups = 0
-        failed_groups = {}
+                self._prefetch_state(groups, projects)
 
-        effective_configuration = EffectiveConfigurationFile(self.output_file)
+                (
+                    successful_groups,
+                    failed_groups,
+                    successful_projects,
+                    failed_projects,
+                ) = self._process_groups_and_projects(
+                    groups, projects, effective_configuration
+                )
+
+                effective_configuration.write_to_file()
 
+                if not failed_groups and not failed_projects:
+                    self._store_incremental_state()
+
+                if self.gitlab.fingerprints.enabled:
+                    info(
+                        f"Skipped {self.gitlab.fingerprints.skipped} sections with nothing changed since the last run"
+                    )
+
+                self._show_cache_statistics()
+
+                if self.profile_report:
+                    self.gitlab.profiler.write_report(self.profile_report)
+                if self.metrics_file:
+                    self.gitlab.profiler.write_metrics(self.metrics_file)
+
+                self._show_summary(
+                    groups,
+                    projects,
+                    successful_groups,
+                    successful_projects,
+                    failed_groups,
+                    failed_projects,
+                    self.gitlab.connection_statistics.get_statistics(),
+                    self.gitlab.rate_limiter.get_statistics(),
+                    self.gitlab.profiler.get_sections_metrics(),
+                )
+        finally:
+            # also when exiting because of errors
+            self.gitlab.fingerprints.write()
+            self.gitlab.tracer.export()
+
+    def _make_plan(self, groups: list, projects: list) -> None:
+        """
+        Computes the changes that processing the application, groups and projects would make - concurrently,
+        as it requires only reading their state from GitLab - and writes them as a plan to the plan file.
+
+        :param groups: list of effective groups to process
+        :param projects: list of effective projects to process
+        """
+        plan = Plan(self.target, self.gitlab.url)
+        failed = []
+
+        def plan_entity(processors, entity: str, configuration: dict) -> None:
+            try:
+                plan.add_entity(
+                    entity,
+                    processors.plan_entity(
+                        entity, configuration, self._get_only_sections(entity)
+                    ),
+                )
+            except Exception as e:
+                warning(
+                    f"Error occurred while planning {entity or 'application'}, exception:\n\n{e}"
+                )
+                debug(traceback.format_exc())
+                failed.append(entity or "application")
+
+        tasks: Dict[str, Callable[[], None]] = {}
         application_configuration = self.configuration.get("application", {})
         if application_configuration:
-            self.application_processors.process_entity(
+            tasks[""] = functools.partial(
+                plan_entity,
+                self.application_processors,
                 "",
                 application_configuration,
-                dry_run=self.noop,
-                diff_only_changed=self.diff_only_changed,
-                effective_configuration=effective_configuration,
-                only_sections=self.only_sections,
+            )
+        for group in groups[self.start_from_group - 1 :]:
+            tasks[group] = functools.partial(
+                plan_entity,
+                self.group_processors,
+                group,
+                self.configuration.get_effective_config_for_group(group),
+            )
+        for project_and_group in projects[self.start_from - 1 :]:
+            tasks[project_and_group] = functools.partial(
+                plan_entity,
+                self.project_processors,
+                project_and_group,
+                self.configuration.get_effective_config_for_project(project_and_group),
             )
 
-        for group in groups:
-            group_number += 1
+        # nothing is changed when planning, so there are no dependencies between the entities
+        with DependentTasksExecutor(self.parallelism) as executor:
+            for _ in executor.run(tasks, {}):
+                pass
 
-            if group_number < self.start_from_group:
-                self._info_group_count(
-                    "@",
-                    group_number,
-                    len(groups),
-                    yellow,
-                    f"Skipping group {group} as requested to start from {self.start_from_group}...",
-                    reset,
-                )
-                continue
+        plan.write(self.plan_file)
+        self._show_plan(plan, self.plan_file)
 
-            group_configuration = self.configuration.get_effective_config_for_group(
-                group
+        if failed:
+            fatal(
+                f"Planning failed for: {', '.join(failed)}",
+                exit_code=EXIT_PROCESSING_ERROR,
             )
 
-            effective_configuration.add_placeholder(group)
+    @staticmethod
+    def _show_plan(plan: Plan, plan_file: str) -> None:
+        """
+        Prints out the changes of the plan, for each group/project and section.
+        """
+        for entity, sections in sorted(plan.entities.items()):
+            for section, section_plan in sections.items():
+                if section_plan["changes"] is None:
+                    info(
+                        f"{entity or 'application'} - {section}: will be processed, its changes cannot be planned"
+                    )
+                for change in section_plan["changes"] or []:
+                    described_entity = ", ".join(
+                        f"{key}: {value}"
+                        for key, value in change.get("entity", {}).items()
+                    )
+                    info(
+                        f"{entity or 'application'} - {section}: {change['action']} {described_entity}".rstrip()
+                    )
+        info_1(f"Plan with {plan.get_changes_count()} changes written to: {plan_file}")
 
-            self._info_group_count(
-                "@",
-                group_number,
-                len(groups),
-                f"Processing group: {group}",
+    def _store_incremental_state(self) -> None:
+        """
+        Stores the incremental state (if it's enabled) for the next run, but only after a run that processed
+        everything - otherwise the groups and projects that were not processed would not be checked next time.
+        """
+        if not self.incremental_state.path:
+            return
+        if (
+            self.target not in ["ALL", "ALL_DEFINED"]
+            or self.noop
+            or self.only_sections != "all"
+            or self.changed_since
+            or self.start_from > 1
+            or self.start_from_group > 1
+        ):
+            verbose(
+                "Not updating the incremental state, as not everything has been requested to be processed."
             )
+            return
+        self.incremental_state.write()
 
-            try:
-                self.group_processors.process_entity(
-                    group,
-                    group_configuration,
-                    dry_run=self.noop,
-                    diff_only_changed=self.diff_only_changed,
-                    effective_configuration=effective_configuration,
-                    only_sections=self.only_sections,
-                )
+    def _get_only_sections(self, entity: str) -> Union[str, List[str]]:
+        """
+        :return: "all" or the list of the sections to process for the given group/project (or "" for
+                 the application) - the ones requested with `--only-sections`, and if `--changed-since` is used,
+                 then only the ones of them with changed configs
+        """
+        if not self.configuration_diff:
+            return self.only_sections
+        if entity:
+            # (these are computed when filtering the groups and projects to process)
+            changed_sections = self.configuration_diff.changed_sections.get(entity, [])
+        else:
+            changed_sections = (
+                self.configuration_diff.get_changed_sections_for_application()
+            )
+        return [
+            section
+            for section in changed_sections
+            if self.only_sections == "all" or section in self.only_sections
+        ]
 
-                successful_groups += 1
+    def _get_planned_sections(self, entity: str) -> Optional[Dict[str, dict]]:
+        """
+        :return: the plan for the sections of the given group/project (or "" for the application)
+                 if a plan is being applied, otherwise None
+        """
+        return self.plan.get_sections(entity) if self.plan else None
 
-            except Exception as e:
-                failed_groups[group_number] = group
+    def _is_planned(self, entity: str) -> bool:
+        """
+        :return: False if a plan is being applied and the given group/project (or "" for the application)
+                 is not in it, f.e. because it has been created after the plan was made, otherwise True
+        """
+        if self.plan and self.plan.get_sections(entity) is None:
+            warning(
+                f"Skipping {entity or 'application'} - it is not in the plan being applied."
+            )
+            return False
+        return True
 
-                trace = traceback.format_exc()
-                message = (
-                    f"Error occurred while processing group {group}, exception:\n\n{e}"
-                )
+    def _prefetch_state(self, groups: list, projects: list) -> None:
+        """
+        If enabled, gets the state of all the groups and projects to process in bulk, for the sections
+        that can be prefetched and are in their configurations.
 
-                if self.terminate_after_error:
-                    effective_configuration.write_to_file()
-                    error(message)
-                    debug(trace)
-                    sys.exit(EXIT_PROCESSING_ERROR)
-                else:
-                    warning(message)
-                    debug(trace)
-            finally:
-                debug(
-                    f"@ ({group_number}/{len(groups)}) FINISHED Processing group: {group}"
-                )
+        :param groups: list of effective groups to process
+        :param projects: list of effective projects to process
+        """
+        if not self.configuration.get("gitlab|prefetch|enabled", False):
+            return
+
+        def get_sections(entity: str, configuration: dict) -> Set[str]:
+            only_sections = self._get_only_sections(entity)
+            return {
+                section
+                for section in configuration
+                if only_sections == "all" or section in only_sections
+            }
+
+        groups_sections = {
+            group: get_sections(
+                group, self.configuration.get_effective_config_for_group(group)
+            )
+            for group in groups[self.start_from_group - 1 :]
+        }
+        projects_sections = {
+            project: get_sections(
+                project, self.configuration.get_effective_config_for_project(project)
+            )
+            for project in projects[self.start_from - 1 :]
+        }
+
+        with self.gitlab.profiler.section("prefetch"), self.gitlab.tracer.span(
+            "prefetch state"
+        ):
+            self.groups_state_prefetcher.prefetch(groups_sections, groups_sections)
+            self.projects_state_prefetcher.prefetch(projects_sections, groups_sections)
+        verbose(
+            f"Prefetched the state of groups and projects with"
+            f" {self.groups_state_prefetcher.queries + self.projects_state_prefetcher.queries} GraphQL requests"
+        )
 
-        project_number = 0
-        successful_projects = 0
-        failed_projects = {}
+    def _process_groups_and_projects(
+        self,
+        groups: list,
+        projects: list,
+        effective_configuration: EffectiveConfigurationFile,
+    ) -> Tuple[int, dict, int, dict]:
+        """
+        Processes the groups and then the projects, sequentially or in parallel, depending on the requested
+        parallelism.
+
+        In the parallel mode each group is processed only after its parent groups, and each project only after
+        the groups from its namespace, but there is no other ordering between the entities.
+
+        :param groups: list of effective groups to process
+        :param projects: list of effective projects to process
+        :param effective_configuration: the effective configurations output
+        :return: a tuple of the number of successfully processed groups, a dict with failed groups,
+                 the number of successfully processed projects and a dict with failed projects,
+                 where keys of the dicts are the entities numbers in the processing order
+        """
 
-        for project_and_group in projects:
-            project_number += 1
+        successful = {"group": 0, "project": 0}
+        failed: dict = {"group": {}, "project": {}}
+
+        # entity path -> (kind, number, process method)
+        entities_to_process: Dict[
+            str, Tuple[str, int, Callable[[], ProcessingResult]]
+        ] = {}
+
+        for group_number, group in enumerate(groups, start=1):
+            if group_number < self.start_from_group:
+                self._info_group_count(
+                    "@",
+                    group_number,
+                    len(groups),
+                    yellow,
+                    f"Skipping group {group} as requested to start from {self.start_from_group}...",
+                    reset,
+                )
+            else:
+                entities_to_process[group] = (
+                    "group",
+                    group_number,
+                    functools.partial(
+                        self._process_group,
+                        group_number,
+                        len(groups),
+                        group,
+                        effective_configuration,
+                    ),
+                )
 
+        for project_number, project_and_group in enumerate(projects, start=1):
             if project_number < self.start_from:
                 self._info_project_count(
                     "*",
@@ -490,69 +939,180 @@ class GitLabForm:
                     f"Skipping project {project_and_group} as requested to start from {self.start_from}...",
                     reset,
                 )
-                continue
+            else:
+                entities_to_process[project_and_group] = (
+                    "project",
+                    project_number,
+                    functools.partial(
+                        self._process_project,
+                        project_number,
+                        len(projects),
+                        project_and_group,
+                        effective_configuration,
+                    ),
+                )
+
+        def handle_result(entity: str, result: ProcessingResult) -> None:
+            kind, number, _ = entities_to_process[entity]
+            if result == ProcessingResult.SUCCEEDED:
+                successful[kind] += 1
+            elif result == ProcessingResult.FAILED:
+                failed[kind][number] = entity
+                if self.terminate_after_error:
+                    effective_configuration.write_to_file()
+                    sys.exit(EXIT_PROCESSING_ERROR)
+
+        if self.parallelism == 1:
+            for entity, (_, _, process) in entities_to_process.items():
+                effective_configuration.add_placeholder(entity)
+                handle_result(entity, process())
+        else:
+            output_buffer = EntityOutputBuffer()
+
+            def buffered(process: Callable[[], ProcessingResult]) -> ProcessingResult:
+                with output_buffer.buffered():
+                    return process()
 
-            project_configuration = self.configuration.get_effective_config_for_project(
-                project_and_group
+            # placeholders are added upfront to keep the effective configs in the processing order
+            for entity in entities_to_process:
+                effective_configuration.add_placeholder(entity)
+
+            tasks = {
+                entity: functools.partial(buffered, process)
+                for entity, (_, _, process) in entities_to_process.items()
+            }
+            dependencies = get_namespace_dependencies(groups, projects)
+
+            with output_buffer.installed():
+                with DependentTasksExecutor(self.parallelism) as executor:
+                    for entity, result in executor.run(tasks, dependencies):
+                        handle_result(entity, result)
+
+        return (
+            successful["group"],
+            failed["group"],
+            successful["project"],
+            failed["project"],
+        )
+
+    def _process_group(
+        self,
+        group_number: int,
+        groups_count: int,
+        group: str,
+        effective_configuration: EffectiveConfigurationFile,
+    ) -> ProcessingResult:
+        """
+        Processes a single group and prints out the errors, if there are any.
+
+        :return: the result of processing the group
+        """
+
+        group_configuration = self.configuration.get_effective_config_for_group(group)
+
+        self._info_group_count(
+            "@",
+            group_number,
+            groups_count,
+            f"Processing group: {group}",
+        )
+
+        if not self._is_planned(group):
+            return ProcessingResult.OMITTED
+
+        try:
+            self.group_processors.process_entity(
+                group,
+                group_configuration,
+                dry_run=self.noop,
+                diff_only_changed=self.diff_only_changed,
+                effective_configuration=effective_configuration,
+                only_sections=self._get_only_sections(group),
+                planned_sections=self._get_planned_sections(group),
             )
 
-            effective_configuration.add_placeholder(project_and_group)
+            return ProcessingResult.SUCCEEDED
 
-            self._info_project_count(
-                "*",
-                project_number,
-                len(projects),
-                f"Processing project: {project_and_group}",
+        except Exception as e:
+            trace = traceback.format_exc()
+            message = (
+                f"Error occurred while processing group {group}, exception:\n\n{e}"
             )
 
-            try:
-                self.project_processors.process_entity(
-                    project_and_group,
-                    project_configuration,
-                    dry_run=self.noop,
-                    diff_only_changed=self.diff_only_changed,
-                    effective_configuration=effective_configuration,
-                    only_sections=self.only_sections,
-                )
+            if self.terminate_after_error:
+                error(message)
+            else:
+                warning(message)
+            debug(trace)
 
-                successful_projects += 1
+            return ProcessingResult.FAILED
+        finally:
+            debug(
+                f"@ ({group_number}/{groups_count}) FINISHED Processing group: {group}"
+            )
 
-            except Exception as e:
-                if "Non GET methods are not allowed for moved projects" in str(e):
-                    info(
-                        "Project has been transferred, no need to process original location"
-                    )
-                    continue
+    def _process_project(
+        self,
+        project_number: int,
+        projects_count: int,
+        project_and_group: str,
+        effective_configuration: EffectiveConfigurationFile,
+    ) -> ProcessingResult:
+        """
+        Processes a single project and prints out the errors, if there are any.
 
-                failed_projects[project_number] = project_and_group
+        :return: the result of processing the project
+        """
 
-                trace = traceback.format_exc()
-                message = f"Error occurred while processing project {project_and_group}, exception:\n\n{e}"
+        project_configuration = self.configuration.get_effective_config_for_project(
+            project_and_group
+        )
 
-                if self.terminate_after_error:
-                    effective_configuration.write_to_file()
-                    error(message)
-                    debug(trace)
-                    sys.exit(EXIT_PROCESSING_ERROR)
-                else:
-                    warning(message)
-                    debug(trace)
-            finally:
-                debug(
-                    f"* ({project_number}/{len(projects)})"
-                    f" FINISHED Processing project: {project_and_group}",
+        self._info_project_count(
+            "*",
+            project_number,
+            projects_count,
+            f"Processing project: {project_and_group}",
+        )
+
+        if not self._is_planned(project_and_group):
+            return ProcessingResult.OMITTED
+
+        try:
+            self.project_processors.process_entity(
+                project_and_group,
+                project_configuration,
+                dry_run=self.noop,
+                diff_only_changed=self.diff_only_changed,
+                effective_configuration=effective_configuration,
+                only_sections=self._get_only_sections(project_and_group),
+                planned_sections=self._get_planned_sections(project_and_group),
+            )
+
+            return ProcessingResult.SUCCEEDED
+
+        except Exception as e:
+            if "Non GET methods are not allowed for moved projects" in str(e):
+                info(
+                    "Project has been transferred, no need to process original location"
                 )
+                return ProcessingResult.OMITTED
 
-        effective_configuration.write_to_file()
+            trace = traceback.format_exc()
+            message = f"Error occurred while processing project {project_and_group}, exception:\n\n{e}"
 
-        self._show_summary(
-            groups,
-            projects,
-            successful_groups,
-            successful_projects,
-            failed_groups,
-            failed_projects,
-        )
+            if self.terminate_after_error:
+                error(message)
+            else:
+                warning(message)
+            debug(trace)
+
+            return ProcessingResult.FAILED
+        finally:
+            debug(
+                f"* ({project_number}/{projects_count})"
+                f" FINISHED Processing project: {project_and_group}",
+            )
 
     @classmethod
     def _show_version(cls, skip_version_check: bool) -> None:
@@ -680,6 +1240,17 @@ class GitLabForm:
 
         verbose(entities_verbose)
 
+    def _show_cache_statistics(self) -> None:
+        """
+        Prints out the hit, miss and eviction counters of each of the cache namespaces, in verbose mode.
+        """
+
+        for namespace, statistics in self.gitlab.cache.get_statistics().items():
+            counters = ", ".join(
+                f"{value} {name}" for name, value in statistics.items()
+            )
+            verbose(f"Cache '{namespace}': {counters}")
+
     @classmethod
     def _show_summary(
         cls,
@@ -689,6 +1260,9 @@ class GitLabForm:
         successful_projects: int,
         failed_groups: dict,
         failed_projects: dict,
+        connection_statistics: Optional[dict] = None,
+        rate_limiter_statistics: Optional[dict] = None,
+        sections_metrics: Optional[list] = None,
     ):
         """
         Prints out the summary after processing has ended with the info of what was done and what failed.
@@ -699,15 +1273,61 @@ class GitLabForm:
         :param successful_projects: number of successfully processed projects
         :param failed_groups: a dict with failed groups, where keys are their numbers in the processing order
         :param failed_projects: a dict with failed projects, where keys are their numbers in the processing order
+        :param connection_statistics: a dict with the numbers of HTTP requests made and connections used for them
+        :param rate_limiter_statistics: a dict with the rate of the requests and how much were they throttled
+        :param sections_metrics: a list of dicts with the time and numbers of requests of processing each section
         """
 
+        if sections_metrics:
+            info_1("Sections processed:")
+            # cli_ui wants each cell to be a sequence of tokens
+            info_table(
+                [
+                    [
+                        (metric["section"],),
+                        (str(metric["entities"]),),
+                        (f"{metric['time']:.2f}",),
+                        (f"{metric['p50']:.2f}",),
+                        (f"{metric['p95']:.2f}",),
+                        (str(metric["gets"]),),
+                        (str(metric["writes"]),),
+                    ]
+                    for metric in sections_metrics
+                ],
+                headers=[
+                    "section",
+                    "entities",
+                    "time [s]",
+                    "p50 [s]",
+                    "p95 [s]",
+                    "GETs",
+                    "writes",
+                ],
+            )
+
         if len(effective_groups) > 0 or len(effective_projects) > 0:
             info_1(f"# of groups processed successfully: {successful_groups}")
             info_1(f"# of projects processed successfully: {successful_projects}")
 
+        if connection_statistics and connection_statistics["requests"] > 0:
+            info_1(
+                f"# of HTTP requests made: {connection_statistics['requests']}"
+                f" (using {connection_statistics['new connections']} new connections,"
+                f" {connection_statistics['reused connections']} times reusing them,"
+                f" {connection_statistics['discarded connections']} connections discarded"
+                f" because of a full pool)"
+            )
+        if rate_limiter_statistics and rate_limiter_statistics["requests"] > 0:
+            info_1(
+                f"Requests per second: {rate_limiter_statistics['requests per second']}"
+                f" (throttled for {rate_limiter_statistics['throttled seconds']}s,"
+                f" got {rate_limiter_statistics['too many requests responses']}"
+                f" 'Too Many Requests' responses)"
+            )
+
         if len(failed_groups) > 0:
             info_1(red, f"# of groups failed: {len(failed_groups)}", reset)
-            for group_number in failed_groups.keys():
+            for group_number in sorted(failed_groups.keys()):
                 # fmt: off
                 info_1(red, f"Failed group {group_number}: {failed_groups[group_number]}", reset)
                 # fmt: on
@@ -715,7 +1335,7 @@ class GitLabForm:
             # fmt: off
             info_1(red, f"# of projects failed: {len(failed_projects)}", reset)
             # fmt: on
-            for project_number in failed_projects.keys():
+            for project_number in sorted(failed_projects.keys()):
                 # fmt: off
                 info_1(red, f"Failed project {project_number}: {failed_projects[project_number]}", reset)
                 # fmt: on
@@ -0,0 +1,507 @@
+import enum
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from logging import debug
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+from cli_ui import fatal
+from gitlabform.output import debug as verbose
+
+from gitlabform.constants import EXIT_INVALID_INPUT
+
+
+@enum.unique
+class EvictionPolicy(enum.Enum):
+    # evict the least recently used entry
+    LRU = "lru"
+    # evict the oldest entry, regardless of how often it is used
+    FIFO = "fifo"
+
+
+class CacheNamespace:
+    """
+    A bounded, thread-safe cache for a single kind of entities (f.e. users) that counts its hits, misses
+    and evictions.
+
+    The entries are stored under keys like (method_name, (arg1, arg2, ...)), where the first argument
+    is the entity that the entry is about (f.e. a username), so that it can be invalidated.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: Optional[int],
+        policy: EvictionPolicy = EvictionPolicy.LRU,
+    ):
+        """
+        :param name: name of the namespace, f.e. "users"
+        :param maxsize: max number of entries, None for unlimited, 0 to disable caching
+        :param policy: what entry to evict when the cache is full
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        :return: tuple of a flag if the entry has been found and its value
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                if self.policy == EvictionPolicy.LRU:
+                    self._entries.move_to_end(key)
+                return True, self._entries[key]
+            else:
+                self.misses += 1
+                return False, None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def invalidate(self, entity: Optional[Hashable] = None) -> None:
+        """
+        :param entity: the entity to remove all the entries about, f.e. "group/project".
+                       If not provided then all the entries are removed.
+        """
+        with self._lock:
+            if entity is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[1][:1] == (entity,)]:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EntityCache:
+    """
+    A run-scoped cache of the entities that GitLabForm gets from GitLab (users, groups, projects, ...)
+    and of the effective configurations computed for groups and projects, split into namespaces.
+
+    Each namespace can be configured separately in the config, f.e.:
+
+    gitlab:
+      cache:
+        projects:
+          maxsize: 5000
+          policy: fifo
+
+    ...and has its own hit, miss and eviction counters.
+    """
+
+    # namespace -> default max size (None = unlimited)
+    DEFAULT_MAXSIZES: Dict[str, Optional[int]] = {
+        "users": None,
+        "groups": 10000,
+        "projects": 1000,
+        "member_roles": None,
+        "effective_configs": None,
+    }
+
+    def __init__(self) -> None:
+        self.namespaces: Dict[str, CacheNamespace] = {
+            name: CacheNamespace(name, maxsize)
+            for name, maxsize in self.DEFAULT_MAXSIZES.items()
+        }
+        # disabled until configured
+        self.persistent = PersistentCache()
+        # empty unless the state is prefetched
+        self.prefetched = PrefetchedState()
+
+    def configure(self, cache_configuration: dict) -> None:
+        """
+        :param cache_configuration: the "gitlab|cache" part of the configuration
+        """
+        for name, namespace_configuration in cache_configuration.items():
+            if name not in self.namespaces:
+                fatal(
+                    f"Unknown cache namespace '{name}', the valid ones are: {', '.join(self.namespaces)}",
+                    exit_code=EXIT_INVALID_INPUT,
+                )
+            namespace = self.namespaces[name]
+            namespace_configuration = namespace_configuration or {}
+            if "maxsize" in namespace_configuration:
+                namespace.maxsize = namespace_configuration["maxsize"]
+            if "policy" in namespace_configuration:
+                try:
+                    namespace.policy = EvictionPolicy(
+                        str(namespace_configuration["policy"]).lower()
+                    )
+                except ValueError:
+                    fatal(
+                        f"Invalid eviction policy '{namespace_configuration['policy']}' for the cache namespace"
+                        f" '{name}', the valid ones are: {', '.join(p.value for p in EvictionPolicy)}",
+                        exit_code=EXIT_INVALID_INPUT,
+                    )
+
+    def invalidate(self, namespace: str, entity: Optional[Hashable] = None) -> None:
+        """
+        Removes the cached entries about the given entity, f.e. after GitLabForm changed it
+        in a way that makes them outdated (like transferring a project).
+
+        :param namespace: namespace name, f.e. "projects"
+        :param entity: the entity, f.e. "group/project". If not provided then the whole namespace is cleared.
+        """
+        self.namespaces[namespace].invalidate(entity)
+
+    def get_statistics(self) -> Dict[str, Dict[str, int]]:
+        statistics = {
+            name: {
+                "entries": len(namespace),
+                "hits": namespace.hits,
+                "misses": namespace.misses,
+                "evictions": namespace.evictions,
+            }
+            for name, namespace in self.namespaces.items()
+        }
+        if self.persistent.enabled:
+            statistics["persistent_lookups"] = {
+                "hits": self.persistent.hits,
+                "misses": self.persistent.misses,
+                "stale": self.persistent.stale,
+            }
+        if self.prefetched.stored:
+            statistics["prefetched_state"] = {
+                "entries": len(self.prefetched),
+                "hits": self.prefetched.hits,
+                "misses": self.prefetched.misses,
+            }
+        if self.persistent.conditional_requests:
+            requests_count = (
+                self.persistent.response_hits + self.persistent.response_misses
+            )
+            statistics["persistent_responses"] = {
+                "not modified": self.persistent.response_hits,
+                "modified": self.persistent.response_misses,
+                "% hit rate": (
+                    round(100 * self.persistent.response_hits / requests_count)
+                    if requests_count
+                    else 0
+                ),
+            }
+        return statistics
+
+
+class PrefetchedState:
+    """
+    A run-scoped store of the state of groups and projects in GitLab (f.e. group members) that has been
+    fetched in bulk before processing them, for the processors to use instead of getting it one by one.
+
+    The entries are stored in the format of the REST API responses, under the section name and the lowercased
+    full path of the group or project. Each entry can be taken only once, as after that the processor can
+    change the state in GitLab, so the next time it has to be get from GitLab again.
+    """
+
+    def __init__(self) -> None:
+        self.stored = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def put(self, section: str, entity: str, state: Any) -> None:
+        """
+        :param section: section name, f.e. "group_members"
+        :param entity: full path of a group or project, case-insensitive
+        :param state: the state of this section, as returned by the REST API
+        """
+        with self._lock:
+            self._entries[(section, entity.lower())] = state
+            self.stored += 1
+
+    def take(self, section: str, entity: str) -> Optional[Any]:
+        """
+        :return: the stored state, which is removed from the store, or None if there is none
+        """
+        with self._lock:
+            state = self._entries.pop((section, entity.lower()), None)
+            if state is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return state
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PersistentCache:
+    """
+    An optional on-disk (SQLite) cache that survives between the runs, for the data that rarely changes in GitLab,
+    like the ids of users, groups and projects with given usernames/paths. Its entries are stored per GitLab
+    instance URL and expire after a configured time.
+
+    When it is not enabled (there is no `path`) it never finds anything and doesn't store anything.
+    """
+
+    # 1 day
+    DEFAULT_TTL = 24 * 60 * 60
+
+    # the response headers that we need to restore from the stored responses (mostly for pagination)
+    STORED_HEADERS = ["content-type", "link", "x-next-page", "x-page", "x-total-pages"]
+
+    # kind of the stored ids -> the attribute of the entity with its username/path that the ids are stored for
+    KEY_ATTRIBUTES = {
+        "users": "username",
+        "groups": "full_path",
+        "projects": "path_with_namespace",
+    }
+
+    # the fields of the request data with the ids of the given kind
+    ID_FIELDS = {"user_id": "users", "group_id": "groups", "project_id": "projects"}
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        gitlab_url: str = "",
+        ttl: int = DEFAULT_TTL,
+        refresh: bool = False,
+        conditional_requests: bool = False,
+    ):
+        """
+        :param path: path of the SQLite database file, None to disable this cache
+        :param gitlab_url: the URL of the GitLab instance that the entries are about
+        :param ttl: time after which the entries expire, in seconds
+        :param refresh: if True then the existing entries are ignored (but the new ones are stored)
+        :param conditional_requests: if True then the GET responses with ETags are stored too, to make
+                                     conditional requests for them in the next runs
+        """
+        self.enabled = bool(path)
+        self.gitlab_url = gitlab_url
+        self.ttl = ttl
+        self.refresh = refresh
+        self.conditional_requests = bool(path) and conditional_requests
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.response_hits = 0
+        self.response_misses = 0
+        # (kind, id) -> key, of the stored ids returned in this run, which may be outdated
+        self.unconfirmed_ids: Dict[Tuple[str, int], str] = {}
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+        if path:
+            path = os.path.expanduser(path)
+            directory = os.path.dirname(path)
+            try:
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # the connection is used from many threads, but always under the lock
+                self._connection = sqlite3.connect(
+                    path, check_same_thread=False, isolation_level=None
+                )
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS lookups ("
+                    " gitlab_url TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL,"
+                    " id INTEGER NOT NULL, stored_at REAL NOT NULL,"
+                    " PRIMARY KEY (gitlab_url, kind, key))"
+                )
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    " url TEXT NOT NULL PRIMARY KEY, etag TEXT NOT NULL,"
+                    " headers TEXT NOT NULL, body BLOB NOT NULL)"
+                )
+                debug(f"Using persistent cache in {path}")
+            except (OSError, sqlite3.Error) as e:
+                fatal(
+                    f"Error when trying to open the persistent cache file {path}: {e}",
+                    exit_code=EXIT_INVALID_INPUT,
+                )
+
+    def get_id(self, kind: str, key: str) -> Optional[int]:
+        """
+        :param kind: "users", "groups" or "projects"
+        :param key: username or full path of a group/project, case-insensitive
+        :return: the stored id or None if there is no (fresh) entry
+        """
+        if not self._connection or self.refresh:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id FROM lookups WHERE gitlab_url = ? AND kind = ? AND key = ? AND stored_at >= ?",
+                (self.gitlab_url, kind, key.lower(), time.time() - self.ttl),
+            ).fetchone()
+        if row:
+            self.hits += 1
+            return int(row[0])
+        else:
+            self.misses += 1
+            return None
+
+    def put_id(self, kind: str, key: str, entity_id: int) -> None:
+        if not self._connection:
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO lookups (gitlab_url, kind, key, id, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (self.gitlab_url, kind, key.lower(), int(entity_id), time.time()),
+            )
+
+    def delete_id(self, kind: str, key: str) -> None:
+        """
+        Removes an entry that turned out to be outdated (f.e. the id points to a deleted user).
+        """
+        if not self._connection:
+            return
+        self.stale += 1
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM lookups WHERE gitlab_url = ? AND kind = ? AND key = ?",
+                (self.gitlab_url, kind, key.lower()),
+            )
+
+    def get_response(self, url: str) -> Optional[Tuple[str, Dict[str, str], bytes]]:
+        """
+        :param url: full URL of a GET request
+        :return: tuple of the ETag, the headers and the body of the stored response, or None if there is none
+        """
+        if not self._connection or self.refresh:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, headers, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row:
+            return row[0], json.loads(row[1]), bytes(row[2])
+        return None
+
+    def put_response(
+        self, url: str, etag: str, headers: Mapping[str, str], body: bytes
+    ) -> None:
+        if not self._connection:
+            return
+        headers_to_store = {
+            header: headers[header]
+            for header in self.STORED_HEADERS
+            if header in headers
+        }
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, headers, body) VALUES (?, ?, ?, ?)",
+                (url, etag, json.dumps(headers_to_store), body),
+            )
+
+    def count_response(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.response_hits += 1
+            else:
+                self.response_misses += 1
+
+    def get_or_resolve_id(self, kind: str, key: str, resolve: Callable[[], int]) -> int:
+        """
+        The stored ids are returned without checking them, as it would cost as much as resolving them again.
+        If a request made with one of them shows that it's outdated, then it's removed with `drop_outdated_ids()`.
+
+        :param resolve: function that gets the id from GitLab, used if there is no entry for it
+        :return: the stored id or the one returned by `resolve`, which is then stored
+        """
+        stored_id = self.get_id(kind, key)
+        if stored_id is not None:
+            with self._lock:
+                self.unconfirmed_ids[(kind, stored_id)] = key
+            return stored_id
+        resolved_id = resolve()
+        self.put_id(kind, key, resolved_id)
+        return resolved_id
+
+    def drop_outdated_ids(
+        self,
+        path: str,
+        data: Optional[Any] = None,
+        entity: Optional[dict] = None,
+    ) -> List[Tuple[str, int, str]]:
+        """
+        Removes the entries of the stored ids returned in this run which turned out to be outdated (f.e. because
+        their group has been deleted, or renamed and another one created in its place), because a request
+        made with them:
+        * failed with 404 - for the ids in its path (like "groups/123/members") or in its data
+          (like {"group_id": 123}),
+        * or returned an entity with another username/path - for the "users/123", "groups/123" and "projects/123"
+          requests, which return the `entity`.
+
+        :return: (kind, id, key) of the removed entries, so that the ids can be resolved again
+        """
+        if not self.unconfirmed_ids:
+            return []
+        used_ids: List[Tuple[str, int]] = []
+        segments = path.split("?")[0].strip("/").split("/")
+        for previous_segment, segment in zip(segments, segments[1:]):
+            if previous_segment in self.KEY_ATTRIBUTES and segment.isdigit():
+                used_ids.append((previous_segment, int(segment)))
+        if isinstance(data, dict):
+            for field, kind in self.ID_FIELDS.items():
+                if str(data.get(field, "")).isdigit():
+                    used_ids.append((kind, int(data[field])))
+
+        dropped_ids = []
+        for kind, entity_id in used_ids:
+            with self._lock:
+                key = self.unconfirmed_ids.get((kind, entity_id))
+                if key is None:
+                    continue
+                if entity is not None:
+                    if len(segments) != 2:
+                        continue
+                    if (
+                        str(entity.get(self.KEY_ATTRIBUTES[kind])).lower()
+                        == key.lower()
+                    ):
+                        # ...so it's still valid
+                        del self.unconfirmed_ids[(kind, entity_id)]
+                        continue
+                del self.unconfirmed_ids[(kind, entity_id)]
+            verbose(f"Persistently cached id of {kind} '{key}' is outdated")
+            self.delete_id(kind, key)
+            dropped_ids.append((kind, entity_id, key))
+        return dropped_ids
+
+
+def cached(namespace: str) -> Callable:
+    """
+    Caches the results of a method in the given namespace of the EntityCache that is the `cache` attribute
+    of the object that the method is called on. Like functools.lru_cache() the exceptions are not cached.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            # bind the args so that f.e. get("foo") and get(name="foo") use the same cache entry
+            bound_args = signature.bind(self, *args, **kwargs)
+            bound_args.apply_defaults()
+            key = (method.__name__, tuple(bound_args.arguments.values())[1:])
+
+            cache_namespace = self.cache.namespaces[namespace]
+            found, value = cache_namespace.get(key)
+            if not found:
+                value = method(self, *args, **kwargs)
+                cache_namespace.put(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
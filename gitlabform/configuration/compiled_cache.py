@@ -0,0 +1,104 @@
+import hashlib
+import os
+import pickle
+import time
+from importlib.metadata import version as package_version
+from logging import debug
+from typing import Optional
+
+from cli_ui import warning
+from gitlabform.output import debug as verbose
+
+
+class CompiledConfigCache:
+    """
+    An optional on-disk cache of the configuration already transformed by the configuration transformers
+    and converted to simple types, so that the next runs with the same configuration don't have to parse it
+    with the round-trip YAML parser and transform it again (which also makes the requests for the ids of the users
+    and groups in it).
+
+    The entries are stored as pickle files in a directory, one per a hash of the configuration contents,
+    the GitLab URL and the GitLabForm version, and expire after a configured time, as the user and group ids
+    in them may change in GitLab.
+
+    The "gitlab" section of the configuration, with the GitLab token, is not stored - it has to be read from
+    the configuration each time. The other secrets in the configuration, like the CI/CD variables values,
+    are stored, so the directory and the files are created accessible only to the current user.
+
+    The files are read without any validation, so the directory must not be writable by anyone
+    who cannot already change the configuration.
+    """
+
+    # 1 day
+    DEFAULT_TTL = 24 * 60 * 60
+
+    def __init__(
+        self,
+        path: str,
+        config_contents: str,
+        gitlab_url: Optional[str],
+        ttl: int = DEFAULT_TTL,
+        refresh: bool = False,
+    ):
+        """
+        :param path: path of the directory with the cached configurations
+        :param config_contents: the configuration, as read from the file (or given as the string)
+        :param gitlab_url: the URL of the GitLab instance that the configuration will be transformed for
+        :param ttl: time after which the entries expire, in seconds
+        :param refresh: if True then the existing entry is ignored (but the new one is stored)
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.refresh = refresh
+        key = hashlib.sha256(
+            "\0".join(
+                [config_contents, gitlab_url or "", package_version("gitlabform")]
+            ).encode()
+        ).hexdigest()
+        self.file = os.path.join(self.path, f"{key}.pickle")
+
+    def get(self) -> Optional[dict]:
+        """
+        :return: the configuration transformed before, without its "gitlab" section, or None if it is not cached
+                 (or the entry has expired)
+        """
+        if self.refresh or not self._is_fresh(self.file):
+            return None
+        try:
+            with open(self.file, "rb") as file:
+                config = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            warning(f"Ignoring the compiled config cache entry {self.file}: {e}")
+            return None
+        verbose(f"Using the compiled config from the cache: {self.file}")
+        return config
+
+    def put(self, config: dict) -> None:
+        """
+        Stores the transformed configuration, without its "gitlab" section, and removes the expired entries.
+        """
+        config = {key: value for key, value in config.items() if key != "gitlab"}
+        try:
+            os.makedirs(self.path, mode=0o700, exist_ok=True)
+            # write and rename, so that the concurrent runs never read a partially written entry
+            file_descriptor = os.open(
+                f"{self.file}.tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+            )
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(config, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{self.file}.tmp", self.file)
+            for entry in os.listdir(self.path):
+                entry_file = os.path.join(self.path, entry)
+                if entry.endswith(".pickle") and not self._is_fresh(entry_file):
+                    os.remove(entry_file)
+        except OSError as e:
+            # the cache is just an optimization, so the run can continue without it
+            warning(f"Error when trying to store the compiled config cache entry: {e}")
+            return
+        debug(f"Stored the compiled config in the cache: {self.file}")
+
+    def _is_fresh(self, file: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(file) < self.ttl
+        except OSError:
+            return False
@@ -1,32 +1,58 @@
-from typing import Any
+from typing import Any, Optional
 
 import os
 import logging
 import textwrap
+import warnings
 from abc import ABC
-from copy import deepcopy
 from logging import debug
 from pathlib import Path
+from ruamel.yaml import YAML, YAMLError
+from ruamel.yaml.resolver import VersionedResolver
 from ruamel.yaml.scalarstring import ScalarString
 from types import SimpleNamespace
 
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 from cli_ui import fatal
-from mergedeep import merge
 from yamlpath.common import Parsers
 from yamlpath.wrappers import ConsolePrinter
 
+from gitlabform.cache import EntityCache
+from gitlabform.configuration.compiled_cache import CompiledConfigCache
+from gitlabform.configuration.skip_lists import SkipList
 from gitlabform.constants import EXIT_INVALID_INPUT
 from ruamel.yaml.comments import CommentedMap
 
 
+class _Yaml11Resolver(VersionedResolver):
+    """
+    Always resolves the plain scalars like YAML 1.1 does (see ConfigurationCore._parse_yaml()), as setting the version
+    of the safe loader doesn't work for the documents with an explicit start ("---").
+    """
+
+    @property
+    def processing_version(self) -> Any:
+        return (1, 1)
+
+
 class ConfigurationCore(ABC):
     """
     The functionality shared by various types of config (common, groups, projects)
     is implemented here.
     """
 
-    def __init__(self, config_path=None, config_string=None):
+    def __init__(self, config_path=None, config_string=None, refresh_cache=False):
+        # a run-scoped cache, shared with the GitLab API clients that use this configuration
+        self.cache = EntityCache()
+        # lowercase keys of projects_and_groups -> their configs, see _get_projects_and_groups_config()
+        self._projects_and_groups_index = {}
+        self._projects_and_groups_indexed = None
+        self._skip_lists = {}
+        # set if the compiled config cache is enabled, see _get_compiled_config()
+        self.compiled_config_cache = None
+        # True if the config has been transformed already, f.e. when read from the compiled config cache
+        self.transformed = False
+
         if config_path and config_string:
             fatal(
                 "Please initialize with either config_path or config_string, not both.",
@@ -34,11 +60,20 @@ class ConfigurationCore(ABC):
             )
         try:
             if config_string:
-                self.config = self._parse_yaml(config_string, config_string=True)
+                verbose("Reading config from the provided string.")
+                self.config = self._read_config(
+                    textwrap.dedent(config_string), refresh_cache
+                )
+                if self.config is None:
+                    self.config = self._parse_yaml(config_string, config_string=True)
                 self.config_dir = "."
             else:  # maybe config_path
                 config_path = self._get_config_path(config_path)
-                self.config = self._parse_yaml(config_path, config_string=False)
+                verbose(f"Reading config from file: {config_path}")
+                with open(config_path) as config_file:
+                    self.config = self._read_config(config_file.read(), refresh_cache)
+                if self.config is None:
+                    self.config = self._parse_yaml(config_path, config_string=False)
                 self.config_dir = os.path.dirname(config_path)
 
                 # below checks are only needed in the non-test mode, when the config is read from file
@@ -87,6 +122,79 @@ class ConfigurationCore(ABC):
 
         return config_path
 
+    def _read_config(self, contents: str, refresh_cache: bool) -> Optional[dict]:
+        """
+        :param contents: the configuration as read from the file or the given string
+        :return: the configuration from the compiled config cache, if it is enabled and has it, otherwise
+                 the configuration parsed with the safe loader, or None if it cannot be parsed this way -
+                 then it has to be parsed with the round-trip loader
+        """
+        simple_config = self._parse_yaml_with_safe_loader(contents)
+        if simple_config is None:
+            return None
+        compiled_config = self._get_compiled_config(
+            contents, simple_config, refresh_cache
+        )
+        return compiled_config if compiled_config is not None else simple_config
+
+    @staticmethod
+    def _parse_yaml_with_safe_loader(contents: str) -> Optional[dict]:
+        """
+        The round-trip features of the regular parsing (keeping the comments, quotes, anchors etc.) are not needed
+        to apply the configuration, so it's parsed with the safe loader, which is much faster (it uses the C parser,
+        if ruamel.yaml.clib is installed) and returns the simple types.
+
+        :return: the configuration, or None if it cannot be parsed this way (f.e. it uses custom tags
+                 or it's invalid - then the errors are reported by the regular parsing)
+        """
+        if "%YAML" in contents:
+            # ...as the YAML version in the directive would be ignored, see _Yaml11Resolver
+            return None
+        yaml = YAML(typ="safe")
+        # see _parse_yaml()
+        yaml.Resolver = _Yaml11Resolver
+        try:
+            with warnings.catch_warnings():
+                # ...like in the regular parsing
+                warnings.filterwarnings("error")
+                config = yaml.load(contents)
+        except (YAMLError, Warning):
+            return None
+        if not isinstance(config, dict):
+            return None
+        debug("Config parsed successfully as YAML.")
+        return config
+
+    def _get_compiled_config(
+        self, contents: str, simple_config: dict, refresh_cache: bool
+    ) -> Optional[dict]:
+        """
+        :param contents: the configuration as read from the file or the given string
+        :param simple_config: the configuration parsed with the safe loader
+        :return: the configuration from the compiled config cache, if it is enabled and has it,
+                 otherwise None - then the configuration has to be transformed as usual
+        """
+        gitlab_config = simple_config.get("gitlab")
+        if not isinstance(gitlab_config, dict):
+            return None
+        cache_config = gitlab_config.get("compiled_config_cache")
+        if not isinstance(cache_config, dict) or not cache_config.get("path"):
+            return None
+
+        self.compiled_config_cache = CompiledConfigCache(
+            path=cache_config["path"],
+            config_contents=contents,
+            gitlab_url=gitlab_config.get("url", os.getenv("GITLAB_URL")),
+            ttl=cache_config.get("ttl", CompiledConfigCache.DEFAULT_TTL),
+            refresh=refresh_cache,
+        )
+        compiled_config = self.compiled_config_cache.get()
+        if compiled_config is None:
+            return None
+        self.transformed = True
+        # ...as it is not stored in the cache, because of the token
+        return {"gitlab": gitlab_config, **compiled_config}
+
     @staticmethod
     def _parse_yaml(source: str, config_string: bool):
         logging_args = SimpleNamespace(quiet=False, verbose=False, debug=False)
@@ -100,13 +208,11 @@ class ConfigurationCore(ABC):
 
         if config_string:
             config = textwrap.dedent(source)
-            verbose("Reading config from the provided string.")
             (yaml_data, doc_loaded) = Parsers.get_yaml_data(
                 yaml, log, config, literal=True
             )
         else:
             config_path = source
-            verbose(f"Reading config from file: {config_path}")
             (yaml_data, doc_loaded) = Parsers.get_yaml_data(yaml, log, config_path)
 
         if doc_loaded:
@@ -180,70 +286,68 @@ class ConfigurationCore(ABC):
         """
         :return: merge more general config with more specific configs.
                  More specific config values take precedence over more general ones.
-        """
 
-        more_general_config = deepcopy(more_general_config)
-        more_specific_config = deepcopy(more_specific_config)
+                 The merged config shares all the values that are not merged, like whole sections
+                 defined only on one level, with the configs it has been made of - only the dicts
+                 on the paths where both configs have values are new. So none of these configs
+                 can be modified in place; the processors get copies of their sections to modify
+                 (see configuration_to_safe_dict).
+        """
 
-        merged_dict = merge({}, more_general_config, more_specific_config)
+        def merge(general_config: dict, specific_config: dict, level: int = 0) -> dict:
+            # the inheritance break flag is supported only inside the sections
+            can_break_inheritance = level > 0
+            if can_break_inheritance and "inherit" in specific_config:
+                if specific_config["inherit"]:
+                    fatal(
+                        f"Cannot set the inheritance break flag with true\n",
+                        exit_code=EXIT_INVALID_INPUT,
+                    )
+                general_config = {}
 
-        def break_inheritance(specific_config, parent_key=""):
+            merged_config = dict(general_config)
             for key, value in specific_config.items():
-                if "inherit" == key:
-                    if not value:
-                        replace_config_sections(
-                            merged_dict, parent_key, specific_config
-                        )
-                        break
-                    elif value:
-                        fatal(
-                            f"Cannot set the inheritance break flag with true\n",
-                            exit_code=EXIT_INVALID_INPUT,
-                        )
-                elif type(value) in [CommentedMap, dict]:
-                    break_inheritance(value, key)
-
-        def replace_config_sections(merged_config, specific_key, specific_config):
-            for key, value in merged_config.items():
-                if specific_key == key:
-                    del specific_config["inherit"]
-                    merged_config[key] = specific_config
-                    break
-                elif type(value) in [CommentedMap, dict]:
-                    replace_config_sections(value, specific_key, specific_config)
-
-        break_inheritance(more_specific_config)
-
-        return dict(merged_dict)
+                if can_break_inheritance and "inherit" == key:
+                    continue
+                if isinstance(value, dict):
+                    general_value = merged_config.get(key)
+                    merged_config[key] = merge(
+                        general_value if isinstance(general_value, dict) else {},
+                        value,
+                        level + 1,
+                    )
+                else:
+                    merged_config[key] = value
+            return merged_config
 
-    @staticmethod
-    def _get_case_insensitively(a_dict: dict, a_key: str):
-        for dict_key in a_dict.keys():
-            if dict_key.lower() == a_key.lower():
-                return a_dict[dict_key]
-        return {}
+        return merge(more_general_config, more_specific_config)
 
-    @staticmethod
-    def _is_skipped_case_insensitively(an_array: list, item: str) -> bool:
+    def _get_projects_and_groups_config(self, key: str) -> dict:
         """
-        :return: if item is defined in the list to be skipped
+        :param key: "group/*", "group/subgroup/*" or "group/project", ignoring the case
+        :return: configuration under this key in projects_and_groups or empty dict if not defined
         """
-        item = item.lower()
-
-        for list_element in an_array:
-            list_element = list_element.lower()
-
-            if list_element == item:
-                return True
-
-            if (
-                list_element.endswith("/*")
-                and item.startswith(list_element[:-2])
-                and len(item) >= len(list_element[:-2])
-            ):
-                return True
-
-        return False
+        projects_and_groups = self.get("projects_and_groups")
+        if self._projects_and_groups_indexed is not projects_and_groups:
+            # this is (re)built in a single pass on the first lookup after the config has been read
+            # or replaced by the transformers, so that the lookups don't have to scan all the keys
+            self._projects_and_groups_index = {
+                config_key.lower(): config
+                for config_key, config in projects_and_groups.items()
+            }
+            self._projects_and_groups_indexed = projects_and_groups
+        return self._projects_and_groups_index.get(key.lower(), {})
+
+    def _get_skip_list(self, path: str) -> SkipList:
+        """
+        :param path: "skip_groups" or "skip_projects"
+        :return: the list under this key compiled for matching, (re)built on the first use after the config
+                 has been read or replaced by the transformers
+        """
+        entries = self.get(path, [])
+        if path not in self._skip_lists or self._skip_lists[path][0] is not entries:
+            self._skip_lists[path] = (entries, SkipList(entries))
+        return self._skip_lists[path][1]
 
     def _find_almost_duplicates(self):
         # in GitLab groups and projects names are de facto case insensitive:
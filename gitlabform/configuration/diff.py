@@ -0,0 +1,106 @@
+import os
+import subprocess
+from typing import Dict, List
+
+from cli_ui import fatal
+
+from gitlabform.configuration import Configuration
+from gitlabform.constants import EXIT_INVALID_INPUT
+
+
+class ConfigurationDiff:
+    """
+    Compares the effective configs of the groups and projects in the current configuration with the ones
+    in a previous version of it, to process only the sections that have changed (`--changed-since`).
+
+    Only the sections that are in the current effective config and are different from the previous one
+    are processed. The sections that have been removed are not, as removing a section from the configuration
+    does not revert anything in GitLab.
+
+    Note that the contents of the files that the configuration refers to, f.e. in the "files" section,
+    are not compared.
+    """
+
+    def __init__(self, configuration: Configuration, old_configuration: Configuration):
+        """
+        :param configuration: the current configuration
+        :param old_configuration: the previous version of the configuration, transformed the same way
+        """
+        self.configuration = configuration
+        self.old_configuration = old_configuration
+        # group/project (or "" for the application) -> the sections that have changed in its effective config
+        self.changed_sections: Dict[str, List[str]] = {}
+
+    def get_changed_sections_for_application(self) -> List[str]:
+        if "" not in self.changed_sections:
+            self.changed_sections[""] = self._get_changed_sections(
+                self.configuration.get("application", {}),
+                self.old_configuration.get("application", {}),
+            )
+        return self.changed_sections[""]
+
+    def get_changed_sections_for_group(self, group: str) -> List[str]:
+        if group not in self.changed_sections:
+            self.changed_sections[group] = self._get_changed_sections(
+                self.configuration.get_effective_config_for_group(group),
+                self.old_configuration.get_effective_config_for_group(group),
+            )
+        return self.changed_sections[group]
+
+    def get_changed_sections_for_project(self, project: str) -> List[str]:
+        if project not in self.changed_sections:
+            self.changed_sections[project] = self._get_changed_sections(
+                self.configuration.get_effective_config_for_project(project),
+                self.old_configuration.get_effective_config_for_project(project),
+            )
+        return self.changed_sections[project]
+
+    @staticmethod
+    def _get_changed_sections(effective_config: dict, old_effective_config: dict):
+        return [
+            section
+            for section, section_config in effective_config.items()
+            if old_effective_config.get(section) != section_config
+        ]
+
+    @staticmethod
+    def read_old_configuration(changed_since: str, config_path: str) -> str:
+        """
+        :param changed_since: path to the previous version of the configuration file, or a git reference
+                              (like "HEAD~1" or "origin/main") of the commit with it in the git repository
+                              of the current configuration file
+        :param config_path: path to the current configuration file
+        :return: the previous version of the configuration file contents
+        """
+        if os.path.isfile(changed_since):
+            try:
+                with open(changed_since) as file:
+                    return file.read()
+            except OSError as e:
+                fatal(
+                    f"Error when trying to read the previous configuration from {changed_since}: {e}",
+                    exit_code=EXIT_INVALID_INPUT,
+                )
+
+        # "<ref>:./<path>" is relative to the current working directory, so it works for the config files
+        # in any directory of the repository
+        try:
+            result = subprocess.run(
+                [
+                    "git",
+                    "show",
+                    f"{changed_since}:./{os.path.basename(config_path)}",
+                ],
+                cwd=os.path.dirname(os.path.abspath(config_path)),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            error = getattr(e, "stderr", None) or e
+            fatal(
+                f"{changed_since} is neither a file nor a git reference to get the previous version"
+                f" of {config_path} from: {error}",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+        return result.stdout
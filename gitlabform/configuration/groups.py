@@ -1,8 +1,8 @@
 from abc import ABC
 
-import functools
 from logging import debug
 
+from gitlabform.cache import cached
 from gitlabform.configuration import ConfigurationCommon
 from gitlabform.util import to_str
 
@@ -33,9 +33,9 @@ class ConfigurationGroups(ConfigurationCommon, ABC):
         :return: if group is defined in the key with groups to skip,
                  ignoring the case
         """
-        return self._is_skipped_case_insensitively(self.get("skip_groups", []), group)
+        return self._get_skip_list("skip_groups").is_skipped(group)
 
-    @functools.lru_cache()
+    @cached("effective_configs")
     def get_effective_config_for_group(self, group) -> dict:
         """
         :param group: "group_name"
@@ -62,13 +62,15 @@ class ConfigurationGroups(ConfigurationCommon, ABC):
 
         return effective_config_for_group
 
+    @cached("effective_configs")
     def _get_effective_subgroup_config(self, subgroup):
         #
-        # Goes through a subgroups hierarchy, from top to bottom
+        # Goes through a subgroups hierarchy, from bottom to top
         #
-        # "x/y/x" -> ["x", "x/y", "x/y/z"]
+        # "x/y/z" -> "x/y" -> "x"
         #
-        # ...and for each element after 1st generate effective config from previous effective one merged with current:
+        # ...and generates the effective config of each element after 1st from the effective config
+        # of its parent merged with its own config:
         #
         #              |     v       |
         #              \---> a       |
@@ -77,44 +79,32 @@ class ConfigurationGroups(ConfigurationCommon, ABC):
         #
         # ...where a = merged_config("x", "x/y") and b = merged_config(a, "x/y/z")
         #
+        # The effective configs of the parents are cached, so they are generated only once
+        # for all their subgroups and projects.
+        #
+
+        parent, _ = subgroup.rsplit("/", 1)
+        if "/" in parent:
+            effective_config = self._get_effective_subgroup_config(parent)
+        else:
+            effective_config = self._get_group_config(parent)
+            debug("First level config for '%s': %s", parent, to_str(effective_config))
+
+        subgroup_config = self._get_group_config(subgroup)
+        debug("Config for '%s': %s", subgroup, to_str(subgroup_config))
 
-        effective_config = {}
-        elements = subgroup.split("/")
-        last_element = None
-        for element in elements:
-            if not last_element:
-                effective_config = self._get_group_config(element)
-                debug(
-                    "First level config for '%s': %s", element, to_str(effective_config)
-                )
-                last_element = element
-            else:
-                next_level_subgroup = last_element + "/" + element
-                next_level_subgroup_config = self._get_group_config(next_level_subgroup)
-                debug(
-                    "Config for '%s': %s",
-                    next_level_subgroup,
-                    to_str(next_level_subgroup_config),
-                )
-
-                if effective_config:
-                    self._validate_break_inheritance_flag(effective_config, subgroup)
-                elif not effective_config and next_level_subgroup_config:
-                    self._validate_break_inheritance_flag(
-                        next_level_subgroup_config, next_level_subgroup
-                    )
-
-                effective_config = self._merge_configs(
-                    effective_config,
-                    next_level_subgroup_config,
-                )
-                debug(
-                    "Merged previous level config for '%s' with config for '%s': %s",
-                    last_element,
-                    next_level_subgroup,
-                    to_str(effective_config),
-                )
-                last_element = last_element + "/" + element
+        if effective_config:
+            self._validate_break_inheritance_flag(effective_config, subgroup)
+        elif not effective_config and subgroup_config:
+            self._validate_break_inheritance_flag(subgroup_config, subgroup)
+
+        effective_config = self._merge_configs(effective_config, subgroup_config)
+        debug(
+            "Merged previous level config for '%s' with config for '%s': %s",
+            parent,
+            subgroup,
+            to_str(effective_config),
+        )
 
         return effective_config
 
@@ -124,6 +114,4 @@ class ConfigurationGroups(ConfigurationCommon, ABC):
         :return: configuration for this group/subgroup or empty dict if not defined,
                  ignoring the case
         """
-        return self._get_case_insensitively(
-            self.get("projects_and_groups"), f"{group}/*"
-        )
+        return self._get_projects_and_groups_config(f"{group}/*")
@@ -1,8 +1,8 @@
 from abc import ABC
 
-import functools
 from logging import debug
 
+from gitlabform.cache import cached
 from gitlabform.configuration import ConfigurationGroups
 from gitlabform.util import to_str
 
@@ -31,11 +31,18 @@ class ConfigurationProjects(ConfigurationGroups, ABC):
         :return: if project is defined in the key with projects to skip,
                  ignoring the case
         """
-        return self._is_skipped_case_insensitively(
-            self.get("skip_projects", []), project
+        return self._get_skip_list("skip_projects").is_skipped(project)
+
+    def are_all_projects_in_group_skipped(self, group) -> bool:
+        """
+        :return: if all the projects in the group and its subgroups are defined in the key with projects
+                 to skip, using a wildcard, ignoring the case
+        """
+        return self._get_skip_list("skip_projects").is_skipped_with_everything_under(
+            group
         )
 
-    @functools.lru_cache()
+    @cached("effective_configs")
     def get_effective_config_for_project(self, group_and_project) -> dict:
         """
         :param group_and_project: "project_group/project_name"
@@ -72,6 +79,4 @@ class ConfigurationProjects(ConfigurationGroups, ABC):
         :return: configuration for this project or empty dict if not defined,
                  ignoring the case
         """
-        return self._get_case_insensitively(
-            self.get("projects_and_groups"), group_and_project
-        )
+        return self._get_projects_and_groups_config(group_and_project)
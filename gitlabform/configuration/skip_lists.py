@@ -0,0 +1,51 @@
+from typing import Dict, Iterable, Set
+
+
+class SkipList:
+    """
+    The "skip_groups" or "skip_projects" list compiled into a set of the lowercase paths and a prefix tree
+    of the lowercase characters of the wildcard entries, so that checking if a group or project is skipped
+    takes as many steps as there are characters in its path, not as many as there are entries in the list.
+
+    The entries can be paths, like "group/project" (matching only it), or paths with a wildcard, like "group/*",
+    matching any path that starts with "group" - so the "group" itself and everything under it, but also
+    f.e. "group-2" and everything under it. All the matching ignores the case.
+    """
+
+    # the mark in the tree nodes for the wildcard entries ending on them, which is never a path character
+    WILDCARD = ""
+
+    def __init__(self, entries: Iterable[str]):
+        self.exact: Set[str] = set()
+        self.root: Dict[str, dict] = {}
+        for entry in entries:
+            entry = entry.lower()
+            if entry.endswith("/*"):
+                node = self.root
+                for character in entry[:-2]:
+                    node = node.setdefault(character, {})
+                node[self.WILDCARD] = {}
+            else:
+                self.exact.add(entry)
+
+    def is_skipped(self, path: str) -> bool:
+        """
+        :return: if the given group or project is skipped, ignoring the case
+        """
+        return path.lower() in self.exact or self.is_skipped_with_everything_under(path)
+
+    def is_skipped_with_everything_under(self, path: str) -> bool:
+        """
+        :return: if the given group and all the groups and projects under it are skipped, ignoring the case
+        """
+        node = self.root
+        if self.WILDCARD in node:
+            return True
+        for character in path.lower():
+            child = node.get(character)
+            if child is None:
+                return False
+            if self.WILDCARD in child:
+                return True
+            node = child
+        return False
@@ -1,14 +1,18 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
 from logging import debug
 from abc import ABC, abstractmethod
 from ez_yaml import ez_yaml
-from ruamel.yaml import YAML
-from types import SimpleNamespace
+from ruamel.yaml.scalarbool import ScalarBoolean
+from typing import DefaultDict, FrozenSet, List, Tuple, Union
 
-from cli_ui import fatal, warning, debug as verbose
+from cli_ui import fatal, warning
+from gitlabform.output import debug as verbose
 from ruamel.yaml.comments import CommentedMap
-from yamlpath import Processor
-from yamlpath.exceptions import YAMLPathException
-from yamlpath.wrappers import ConsolePrinter
+from yamlpath.common import Searches
+from yamlpath.enums import PathSearchMethods
+from yamlpath.patches.timestamp import AnchoredDate
 
 from gitlabform.constants import EXIT_INVALID_INPUT, APPROVAL_RULE_NAME
 from gitlabform.configuration import Configuration
@@ -22,6 +26,14 @@ from gitlabform.gitlab import GitLab
 #
 # For example, we want to operate on usernames in the configuration while GitLab sometimes operates
 # on user ids. Therefore, one of the transformers changes "user_id: <number>" into "user: <username>".
+#
+# All the transformers are run in a single walk through the configuration (see ConfigurationWalker),
+# each one declaring the names of the keys that it transforms and matching the paths to them.
+
+# a key in a dict or an index in a list
+Key = Union[str, int]
+# the keys and indexes from the root of the configuration to a given element of it
+Path = Tuple[Key, ...]
 
 
 class ConfigurationTransformers:
@@ -34,31 +46,97 @@ class ConfigurationTransformers:
         self.implicit_name_transformer = ImplicitNameTransformer(gitlab)
         self.access_level_transformer = AccessLevelsTransformer(gitlab)
 
+        self.walker = ConfigurationWalker(
+            [
+                # this needs to run before user and group transformer as it may contain users and group
+                # names to convert to ids - and it does, as it transforms the keys of the projects and groups,
+                # so the walker gets to the users and groups in its output later
+                self.merge_request_approvals_transformer,
+                self.user_transformer,
+                self.group_transformer,
+                self.implicit_name_transformer,
+                self.access_level_transformer,
+            ]
+        )
+
     def transform(self, configuration: Configuration) -> None:
-        config_before = ez_yaml.to_string(obj=configuration.config, options={})
-        debug(f"Config BEFORE transformations:\n{config_before}")
+        if configuration.transformed:
+            verbose("Configuration has been transformed already.")
+            return
+
+        # dumping the whole config may take a lot of time, so do it only if it will be logged
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            config_before = ez_yaml.to_string(obj=configuration.config, options={})
+            debug(f"Config BEFORE transformations:\n{config_before}")
+
+        verbose("Transforming the configuration")
+        self.walker.walk(configuration.config)
+        ConfigurationTransformer.convert_to_simple_types(configuration)
+        configuration.transformed = True
 
-        # this needs to run before user and group transformer as it may contain users and group
-        # names to convert to ids
-        self.merge_request_approvals_transformer.transform(configuration)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            config_after = ez_yaml.to_string(obj=configuration.config, options={})
+            debug(f"Config AFTER transformations:\n{config_after}")
 
-        self.user_transformer.transform(configuration)
-        self.group_transformer.transform(configuration)
-        self.implicit_name_transformer.transform(configuration)
-        self.access_level_transformer.transform(configuration, last=True)
+        if configuration.compiled_config_cache:
+            configuration.compiled_config_cache.put(configuration.config)
 
-        config_after = ez_yaml.to_string(obj=configuration.config, options={})
-        debug(f"Config AFTER transformations:\n{config_after}")
+
+class ConfigurationWalker:
+    """
+    Walks through the whole configuration once, depth-first and in the order of the keys, and for each key
+    in each dict calls the transformers registered for its name, which match the path to it.
+
+    The transformers are called for all the keys of a dict, in the order they have been registered in, before
+    the walker goes into their values, so the values (and keys) added or changed by the transformers are walked
+    through too - which allows a transformer to prepare the input of another one.
+    """
+
+    def __init__(self, transformers: List["ConfigurationTransformer"]):
+        self.transformers_by_key: DefaultDict[str, List[ConfigurationTransformer]] = (
+            defaultdict(list)
+        )
+        for transformer in transformers:
+            for key in transformer.keys:
+                self.transformers_by_key[key].append(transformer)
+
+    def walk(self, node, path: Path = ()) -> None:
+        if isinstance(node, dict):
+            for key in list(node.keys()):
+                for transformer in self.transformers_by_key.get(key, []):
+                    # ...as it may have been removed by the previous transformer
+                    if key in node and transformer.matches(path + (key,)):
+                        transformer.transform_key(path + (key,), node, key)
+            for key, value in list(node.items()):
+                self.walk(value, path + (key,))
+        elif isinstance(node, list):
+            for index, item in enumerate(node):
+                self.walk(item, path + (index,))
 
 
 class ConfigurationTransformer(ABC):
+    # the names of the keys that this transformer changes (or the values of or under which it changes)
+    keys: FrozenSet[str] = frozenset()
+
     def transform(self, configuration: Configuration, last: bool = False) -> None:
-        self._do_transform(configuration)
+        ConfigurationWalker([self]).walk(configuration.config)
         if last:
             self.convert_to_simple_types(configuration)
 
+    def matches(self, path: Path) -> bool:
+        """
+        :param path: path to one of the keys of this transformer
+        :return: if the key under this path should be transformed, the default is everywhere
+        """
+        return True
+
     @abstractmethod
-    def _do_transform(self, configuration: Configuration) -> None:
+    def transform_key(self, path: Path, parent: dict, key: Key) -> None:
+        """
+        :param path: path to the key to transform
+        :param parent: the dict with the key, to transform in place
+        :param key: the key to transform
+        """
         pass
 
     @staticmethod
@@ -66,90 +144,113 @@ class ConfigurationTransformer(ABC):
         # we needed complex ruamel.yaml's types like ordereddict and CommentedSeq
         # for transformations, but at the end convert them to simple dict and lists
         # for easier to understand debug output and tests
-
-        config_yaml_string = ez_yaml.to_string(obj=configuration.config, options={})
-        simple_yaml_loader = YAML(typ="safe", pure=True)
-        configuration.config = simple_yaml_loader.load(config_yaml_string)
+        # (this is done directly, not by dumping the config to YAML and loading it back, as it's much faster)
+
+        def to_simple_types(value):
+            if isinstance(value, dict):
+                return {
+                    to_simple_types(key): to_simple_types(item)
+                    for key, item in value.items()
+                }
+            elif isinstance(value, list):
+                return [to_simple_types(item) for item in value]
+            elif isinstance(value, tuple):
+                return tuple(to_simple_types(item) for item in value)
+            elif isinstance(value, str):
+                return str(value)
+            elif isinstance(value, ScalarBoolean):
+                return bool(value)
+            elif isinstance(value, bool):
+                return value
+            elif isinstance(value, int):
+                return int(value)
+            elif isinstance(value, float):
+                return float(value)
+            elif isinstance(value, AnchoredDate):
+                return value.date()
+            elif isinstance(value, datetime):
+                return datetime.combine(value.date(), value.timetz())
+            else:
+                return value
+
+        configuration.config = to_simple_types(configuration.config)
+
+
+def _is_deploy_access_level(path: Path) -> bool:
+    """
+    :param path: path to a key
+    :return: if it is a key of one of the deploy_access_levels of the protected environments, so in
+             projects_and_groups.*.protected_environments.*.deploy_access_levels(.*)
+    """
+    # without the index of the deploy access level, if they are in a list
+    if len(path) == 7 and isinstance(path[5], int):
+        path = path[:5] + path[6:]
+    return (
+        len(path) == 6
+        and path[0] == "projects_and_groups"
+        and path[2] == "protected_environments"
+        and path[4] == "deploy_access_levels"
+    )
+
+
+def _is_in_merge_requests_approval_rule(path: Path) -> bool:
+    """
+    :param path: path to a key
+    :return: if it is a key of one of the merge requests approval rules, anywhere, so in
+             **.merge_requests_approval_rules.*
+    """
+    return len(path) >= 3 and path[-3] == "merge_requests_approval_rules"
 
 
 class UserTransformer(ConfigurationTransformer):
+    keys = frozenset(["user", "users"])
+
     def __init__(self, gitlab: GitLab):
         self.gitlab = gitlab
 
-    def _do_transform(self, configuration: Configuration) -> None:
-        logging_args = SimpleNamespace(quiet=False, verbose=False, debug=False)
-        log = ConsolePrinter(logging_args)
-        processor = Processor(log, configuration.config)
-        verbose("Getting user ids for users defined in protect_environments config")
-        try:
-            for node_coordinate in processor.get_nodes(
-                "projects_and_groups.*.protected_environments.*.deploy_access_levels.user",
-                mustexist=True,
-            ):
-                user = node_coordinate.parent.pop("user")
+    def matches(self, path: Path) -> bool:
+        if path[-1] == "user":
+            return _is_deploy_access_level(path)
+        else:
+            return _is_in_merge_requests_approval_rule(path)
 
-                node_coordinate.parent["user_id"] = self.gitlab._get_user_id(user)
-        except YAMLPathException as e:
-            # this just means that we haven't found any keys in YAML
-            # under the given path
-            pass
+    def transform_key(self, path: Path, parent: dict, key: Key) -> None:
+        if key == "user":
+            user = parent.pop("user")
 
-        verbose(
-            "Getting user ids for users defined in merge_requests_approval_rules config"
-        )
-        try:
-            for node_coordinate in processor.get_nodes(
-                "**.merge_requests_approval_rules.*.users",
-                mustexist=True,
-            ):
-                user_ids = []
-                users = node_coordinate.parent.pop("users")
-                for user in users:
-                    user_id = self.gitlab._get_user_id(user)
-                    user_ids.append(user_id)
-                node_coordinate.parent["user_ids"] = user_ids
-        except YAMLPathException as e:
-            # this just means that we haven't found any keys in YAML
-            # under the given path
-            pass
+            parent["user_id"] = self.gitlab._get_user_id(user)
+        else:
+            user_ids = []
+            users = parent.pop("users")
+            for user in users:
+                user_id = self.gitlab._get_user_id(user)
+                user_ids.append(user_id)
+            parent["user_ids"] = user_ids
 
 
 class GroupTransformer(ConfigurationTransformer):
+    keys = frozenset(["group", "groups"])
+
     def __init__(self, gitlab: GitLab):
         self.gitlab = gitlab
 
-    def _do_transform(self, configuration: Configuration) -> None:
-        logging_args = SimpleNamespace(quiet=False, verbose=False, debug=False)
-        processor = Processor(ConsolePrinter(logging_args), configuration.config)
-
-        try:
-            for node_coordinate in processor.get_nodes(
-                "projects_and_groups.*.protected_environments.*.deploy_access_levels.group",
-                mustexist=True,
-            ):
-                group = node_coordinate.parent.pop("group")
-                node_coordinate.parent["group_id"] = self.gitlab._get_group_id(group)
-
-        except YAMLPathException as e:
-            # this just means that we haven't found any keys in YAML
-            # under the given path
-            pass
-
-        try:
-            for node_coordinate in processor.get_nodes(
-                "**.merge_requests_approval_rules.*.groups",
-                mustexist=True,
-            ):
-                group_ids = []
-                groups = node_coordinate.parent.pop("groups")
-                for group in groups:
-                    group_id = self.gitlab._get_group_id(group)
-                    group_ids.append(group_id)
-                node_coordinate.parent["group_ids"] = group_ids
-        except YAMLPathException:
-            # this just means that we haven't found any keys in YAML
-            # under the given path
-            pass
+    def matches(self, path: Path) -> bool:
+        if path[-1] == "group":
+            return _is_deploy_access_level(path)
+        else:
+            return _is_in_merge_requests_approval_rule(path)
+
+    def transform_key(self, path: Path, parent: dict, key: Key) -> None:
+        if key == "group":
+            group = parent.pop("group")
+            parent["group_id"] = self.gitlab._get_group_id(group)
+        else:
+            group_ids = []
+            groups = parent.pop("groups")
+            for group in groups:
+                group_id = self.gitlab._get_group_id(group)
+                group_ids.append(group_id)
+            parent["group_ids"] = group_ids
 
 
 class ImplicitNameTransformer(ConfigurationTransformer):
@@ -168,29 +269,26 @@ class ImplicitNameTransformer(ConfigurationTransformer):
        smth_else: <...>
     """
 
+    keys = frozenset(["protected_environments"])
+
     def __init__(self, gitlab: GitLab):
         # this transformer doesn't need to call gitlab
         pass
 
-    def _do_transform(self, configuration: Configuration) -> None:
-        logging_args = SimpleNamespace(quiet=False, verbose=False, debug=False)
-        processor = Processor(ConsolePrinter(logging_args), configuration.config)
+    def matches(self, path: Path) -> bool:
+        # projects_and_groups.*.protected_environments
+        return len(path) == 3 and path[0] == "projects_and_groups"
 
-        try:
-            for node_coordinate in processor.get_nodes(
-                "projects_and_groups.*.protected_environments.*",
-                mustexist=True,
-            ):
-                if type(node_coordinate.node) not in [CommentedMap, dict]:
-                    continue
+    def transform_key(self, path: Path, parent: dict, key: Key) -> None:
+        protected_environments = parent[key]
+        if type(protected_environments) not in [CommentedMap, dict]:
+            return
 
-                node_coordinate.parent[node_coordinate.parentref][
-                    "name"
-                ] = node_coordinate.parentref
-        except YAMLPathException:
-            # this just means that we haven't found any keys in YAML
-            # under the given path
-            pass
+        for name, protected_environment in protected_environments.items():
+            if type(protected_environment) not in [CommentedMap, dict]:
+                continue
+
+            protected_environment["name"] = name
 
 
 class AccessLevelsTransformer(ConfigurationTransformer):
@@ -200,77 +298,54 @@ class AccessLevelsTransformer(ConfigurationTransformer):
     the appropriate numbers.
     """
 
-    def __init__(self, gitlab: GitLab):
-        # this transformer doesn't need to call gitlab
-        pass
-
-    def _do_transform(self, configuration: Configuration):
-        logging_args = SimpleNamespace(quiet=False, verbose=False, debug=False)
-        processor = Processor(ConsolePrinter(logging_args), configuration.config)
-
-        # [.!<100] effectively means that the value is non-numerical
-        paths_to_hashes = [
-            # # branches, old syntax
-            "**.push_access_level[.!<100]",
-            "**.merge_access_level[.!<100]",
-            "**.unprotect_access_level[.!<100]",
-            # members & group members
-            "**.access_level[.!<100]",
-            "**.group_access[.!<100]",
+    keys = frozenset(
+        [
+            # branches, old syntax
+            "push_access_level",
+            "merge_access_level",
+            "unprotect_access_level",
+            # members & group members,
+            # and also branches, new GitLab Premium syntax - in allowed_to_push, allowed_to_merge
+            # and allowed_to_unprotect arrays
+            "access_level",
+            "group_access",
             # old syntax
-            "**.group_access_level[.!<100]",
+            "group_access_level",
             # tags
-            "**.create_access_level[.!<100]",
+            "create_access_level",
         ]
+    )
 
-        for path in paths_to_hashes:
-            try:
-                for node_coordinate in processor.get_nodes(path, mustexist=True):
-                    try:
-                        access_level_string = str(node_coordinate.node)
-                        node_coordinate.parent[node_coordinate.parentref] = (
-                            AccessLevel.get_value(access_level_string)
-                        )
-                    except KeyError:
-                        fatal(
-                            f"Configuration string '{access_level_string}' is not one of the valid access levels:"
-                            f" {', '.join(AccessLevel.get_canonical_names())}",
-                            exit_code=EXIT_INVALID_INPUT,
-                        )
-            except YAMLPathException:
-                # this just means that we haven't found any keys in YAML
-                # under the given path
-                pass
-
-        # these are different from the above, as they are elements of arrays,
-        # so we need different search query and an extra condition for
-        # transformation
-        paths_to_arrays = [
-            # # branches, new GitLab Premium syntax
-            "**.allowed_to_push.*.[access_level!<100]",
-            "**.allowed_to_merge.*.[access_level!<100]",
-            "**.allowed_to_unprotect.*.[access_level!<100]",
-        ]
+    def __init__(self, gitlab: GitLab):
+        # this transformer doesn't need to call gitlab
+        pass
 
-        for path in paths_to_arrays:
+    def transform_key(self, path: Path, parent: dict, key: Key) -> None:
+        # the values that are not "less than 100" are transformed, so effectively the non-numerical ones
+        # (the same way as "[.!<100]" YAML path search)
+        if Searches.search_matches(PathSearchMethods.LESS_THAN, "100", parent[key]):
+            return
+        self._transform_value(parent, key)
+
+    def _transform_value(self, parent, key: Key) -> None:
+        value = parent[key]
+        # for a dict or a list, all the values in them are transformed
+        if isinstance(value, dict):
+            for value_key in list(value.keys()):
+                self._transform_value(value, value_key)
+        elif isinstance(value, list):
+            for index in range(len(value)):
+                self._transform_value(value, index)
+        else:
             try:
-                for node_coordinate in processor.get_nodes(path, mustexist=True):
-                    if node_coordinate.parentref == "access_level":
-                        try:
-                            access_level_string = str(node_coordinate.node)
-                            node_coordinate.parent[node_coordinate.parentref] = (
-                                AccessLevel.get_value(access_level_string)
-                            )
-                        except KeyError:
-                            fatal(
-                                f"Configuration string '{access_level_string}' is not one of the valid access levels:"
-                                f" {', '.join(AccessLevel.get_canonical_names())}",
-                                exit_code=EXIT_INVALID_INPUT,
-                            )
-            except YAMLPathException:
-                # this just means that we haven't found any keys in YAML
-                # under the given path
-                pass
+                access_level_string = str(value)
+                parent[key] = AccessLevel.get_value(access_level_string)
+            except KeyError:
+                fatal(
+                    f"Configuration string '{access_level_string}' is not one of the valid access levels:"
+                    f" {', '.join(AccessLevel.get_canonical_names())}",
+                    exit_code=EXIT_INVALID_INPUT,
+                )
 
 
 #
@@ -279,96 +354,87 @@ class AccessLevelsTransformer(ConfigurationTransformer):
 
 
 class MergeRequestApprovalsTransformer(ConfigurationTransformer):
+    keys = frozenset(["merge_requests"])
+
     def __init__(self, gitlab: GitLab):
         # this transformer doesn't need to call gitlab
         pass
 
-    def _do_transform(self, configuration: Configuration) -> None:
-        logging_args = SimpleNamespace(quiet=False, verbose=False, debug=False)
-        processor = Processor(ConsolePrinter(logging_args), configuration.config)
-
-        try:
-            for node_coordinate in processor.get_nodes(
-                "projects_and_groups.*.merge_requests",
-                mustexist=True,
+    def matches(self, path: Path) -> bool:
+        # projects_and_groups.*.merge_requests
+        return len(path) == 3 and path[0] == "projects_and_groups"
+
+    def transform_key(self, path: Path, parent: dict, key: Key) -> None:
+        old_syntax_found = False
+
+        where_to_add_new_syntax = parent
+
+        old_syntax = parent[key]
+
+        approvals_required_guessed = True
+        approvals_required = 2
+
+        # approvals configurations
+        if "approvals" in old_syntax:
+            old_syntax_found = True
+
+            if "approvals_before_merge" in old_syntax["approvals"]:
+                # this setting is now moved inside the approval rules, so remove it from here
+                # but store it for adding there
+                approvals_required = old_syntax["approvals"]["approvals_before_merge"]
+                approvals_required_guessed = False
+                old_syntax["approvals"].pop("approvals_before_merge")
+
+            if old_syntax["approvals"]:
+                # add the settings, if there are left any after removing 'approvals_before_merge'
+                where_to_add_new_syntax["merge_requests_approvals"] = old_syntax[
+                    "approvals"
+                ]
+
+        # approval rules
+        if (
+            "approvers" in old_syntax
+            or "approver_groups" in old_syntax
+            or not approvals_required_guessed
+        ):
+            old_syntax_found = True
+
+            where_to_add_new_syntax["merge_requests_approval_rules"] = {
+                "legacy": {
+                    "approvals_required": approvals_required,
+                    "name": APPROVAL_RULE_NAME,
+                }
+            }
+
+            if "approvers" in old_syntax:
+                where_to_add_new_syntax["merge_requests_approval_rules"]["legacy"][
+                    "users"
+                ] = old_syntax["approvers"]
+            if "approver_groups" in old_syntax:
+                where_to_add_new_syntax["merge_requests_approval_rules"]["legacy"][
+                    "groups"
+                ] = old_syntax["approver_groups"]
+
+            if (
+                "remove_other_approval_rules" in old_syntax
+                and old_syntax["remove_other_approval_rules"]
             ):
-                old_syntax_found = False
-
-                where_to_add_new_syntax = node_coordinate.parent
-
-                old_syntax = node_coordinate.node
-
-                approvals_required_guessed = True
-                approvals_required = 2
-
-                # approvals configurations
-                if "approvals" in old_syntax:
-                    old_syntax_found = True
-
-                    if "approvals_before_merge" in old_syntax["approvals"]:
-                        # this setting is now moved inside the approval rules, so remove it from here
-                        # but store it for adding there
-                        approvals_required = old_syntax["approvals"][
-                            "approvals_before_merge"
-                        ]
-                        approvals_required_guessed = False
-                        old_syntax["approvals"].pop("approvals_before_merge")
-
-                    if old_syntax["approvals"]:
-                        # add the settings, if there are left any after removing 'approvals_before_merge'
-                        where_to_add_new_syntax["merge_requests_approvals"] = (
-                            old_syntax["approvals"]
-                        )
-
-                # approval rules
-                if (
-                    "approvers" in old_syntax
-                    or "approver_groups" in old_syntax
-                    or not approvals_required_guessed
-                ):
-                    old_syntax_found = True
-
-                    where_to_add_new_syntax["merge_requests_approval_rules"] = {
-                        "legacy": {
-                            "approvals_required": approvals_required,
-                            "name": APPROVAL_RULE_NAME,
-                        }
-                    }
-
-                    if "approvers" in old_syntax:
-                        where_to_add_new_syntax["merge_requests_approval_rules"][
-                            "legacy"
-                        ]["users"] = old_syntax["approvers"]
-                    if "approver_groups" in old_syntax:
-                        where_to_add_new_syntax["merge_requests_approval_rules"][
-                            "legacy"
-                        ]["groups"] = old_syntax["approver_groups"]
-
-                    if (
-                        "remove_other_approval_rules" in old_syntax
-                        and old_syntax["remove_other_approval_rules"]
-                    ):
-                        old_syntax_found = True
-                        where_to_add_new_syntax["merge_requests_approval_rules"][
-                            "enforce"
-                        ] = True
-
-                if old_syntax_found:
-                    where_to_add_new_syntax.pop("merge_requests")
-
-                    warning(
-                        "The 'merge_requests' configuration section syntax works but is deprecated and will be removed "
-                        "in the next major version of GitLabForm. "
-                        "Please migrate to the new syntax using the 'merge_requests_approvals' "
-                        "and the 'merge_requests_approval_rules' sections."
-                    )
-                if approvals_required_guessed:
-                    warning(
-                        "'approvals_before_merge' not found in the old 'merge_requests' configuration section",
-                        "- assuming that it is set to 2.",
-                    )
-
-        except YAMLPathException:
-            # this just means that we haven't found any keys in YAML
-            # under the given path
-            pass
+                old_syntax_found = True
+                where_to_add_new_syntax["merge_requests_approval_rules"][
+                    "enforce"
+                ] = True
+
+        if old_syntax_found:
+            where_to_add_new_syntax.pop("merge_requests")
+
+            warning(
+                "The 'merge_requests' configuration section syntax works but is deprecated and will be removed "
+                "in the next major version of GitLabForm. "
+                "Please migrate to the new syntax using the 'merge_requests_approvals' "
+                "and the 'merge_requests_approval_rules' sections."
+            )
+        if approvals_required_guessed:
+            warning(
+                "'approvals_before_merge' not found in the old 'merge_requests' configuration section",
+                "- assuming that it is set to 2.",
+            )
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+from importlib.metadata import version as package_version
+from logging import debug
+from typing import Dict, Optional
+
+from cli_ui import fatal
+
+from gitlabform.constants import EXIT_INVALID_INPUT, EXIT_PROCESSING_ERROR
+
+
+class SectionsFingerprints:
+    """
+    An optional file with the fingerprints of the sections processed in the previous runs, for each group/project,
+    to skip processing the sections that most likely have nothing to change.
+
+    A fingerprint of a section consists of a hash of its effective configuration and a "remote fingerprint" -
+    a fingerprint of the state of the section in GitLab that is cheap to get, like the ETag of the list of its
+    entities (see AbstractProcessor.get_remote_fingerprint()). If both are the same as after the last successful
+    processing of the section, then the section is skipped. The sections without a remote fingerprint are always
+    processed. Processing a group/project stores the fingerprints of its sections with the remote fingerprints
+    get after processing them, so that our own changes don't make the next run process them again.
+
+    The full processing (with `full_verify`) should still be done periodically, f.e. for the changes in GitLab
+    that the sections' processing depends on but that are outside of their lists.
+
+    When it is not enabled (there is no `path`) it never skips anything and doesn't store anything.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: Optional[str] = None, gitlab_url: str = ""):
+        """
+        :param path: path of the JSON file with the fingerprints, None to disable them
+        :param gitlab_url: the URL of the GitLab instance that the fingerprints are about
+        """
+        self.enabled = bool(path)
+        self.path = os.path.expanduser(path) if path else None
+        self.gitlab_url = gitlab_url
+        # if True then all the sections are processed, but the fingerprints are still stored
+        self.full_verify = False
+        self.skipped = 0
+        self._lock = threading.Lock()
+        # lowercase group/project path -> section name -> {"config": ..., "remote": ...}
+        self._entities: Dict[str, Dict[str, Dict[str, str]]] = {}
+        # the whole file, to keep the fingerprints for other GitLab instances
+        self._stored: dict = {}
+        self._changed = False
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as file:
+                    stored = json.load(file)
+            except (OSError, ValueError) as e:
+                fatal(
+                    f"Error when trying to read the fingerprints file {self.path}: {e}",
+                    exit_code=EXIT_INVALID_INPUT,
+                )
+            # the processing logic may be different in other versions
+            if stored.get("version") == self.VERSION and stored.get(
+                "gitlabform_version"
+            ) == package_version("gitlabform"):
+                self._entities = stored.get("gitlab_urls", {}).get(gitlab_url, {})
+                self._stored = stored
+            else:
+                debug(
+                    f"Ignoring the fingerprints in {self.path} stored by another version of GitLabForm"
+                )
+
+    def can_skip(self, entity: str) -> bool:
+        """
+        :return: True if any section of the given group/project may be skipped, so it's worth to get
+                 its remote fingerprint
+        """
+        return (
+            self.enabled and not self.full_verify and entity.lower() in self._entities
+        )
+
+    def is_unchanged(
+        self,
+        entity: str,
+        section: str,
+        config_fingerprint: str,
+        remote_fingerprint: Optional[str],
+    ) -> bool:
+        """
+        :return: True if the given section of the given group/project can be skipped
+        """
+        if not self.can_skip(entity) or remote_fingerprint is None:
+            return False
+        with self._lock:
+            stored = self._entities.get(entity.lower(), {}).get(section)
+        if stored == {"config": config_fingerprint, "remote": remote_fingerprint}:
+            with self._lock:
+                self.skipped += 1
+            return True
+        return False
+
+    def put(
+        self,
+        entity: str,
+        section: str,
+        config_fingerprint: str,
+        remote_fingerprint: Optional[str],
+    ) -> None:
+        """
+        :param config_fingerprint: fingerprint of the configuration of the processed section
+        :param remote_fingerprint: the remote fingerprint of the section after processing it
+        """
+        if not self.enabled or remote_fingerprint is None:
+            return
+        with self._lock:
+            self._entities.setdefault(entity.lower(), {})[section] = {
+                "config": config_fingerprint,
+                "remote": remote_fingerprint,
+            }
+            self._changed = True
+
+    def write(self) -> None:
+        if not self.path or not self._changed:
+            return
+        with self._lock:
+            gitlab_urls = dict(self._stored.get("gitlab_urls", {}))
+            gitlab_urls[self.gitlab_url] = self._entities
+            to_store = {
+                "version": self.VERSION,
+                "gitlabform_version": package_version("gitlabform"),
+                "gitlab_urls": gitlab_urls,
+            }
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # write the whole file at once, so an interrupted run doesn't leave a broken one
+                temporary_path = f"{self.path}.tmp"
+                with open(temporary_path, "w") as file:
+                    json.dump(to_store, file, sort_keys=True)
+                os.replace(temporary_path, self.path)
+            except OSError as e:
+                fatal(
+                    f"Error when trying to write the fingerprints file {self.path}: {e}",
+                    exit_code=EXIT_PROCESSING_ERROR,
+                )
+            self._changed = False
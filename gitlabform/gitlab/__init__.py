@@ -4,6 +4,7 @@ from typing import List
 
 from gitlab import GraphQL
 
+from gitlabform.gitlab.audit_events import GitLabAuditEvents
 from gitlabform.gitlab.commits import GitLabCommits
 from gitlabform.gitlab.group_badges import GitLabGroupBadges
 from gitlabform.gitlab.group_ldap_links import GitLabGroupLDAPLinks
@@ -48,6 +49,7 @@ class AccessLevel(enum.IntEnum):
 
 
 class GitLab(
+    GitLabAuditEvents,
     GitLabCommits,
     GitLabMergeRequests,
     GitLabGroupLDAPLinks,
@@ -60,7 +62,14 @@ class GitLab(
     GitLabProjectMergeRequestsApprovals,
     GitLabVariables,
 ):
-    pass
+    def __init__(
+        self, config_path=None, config_string=None, refresh_cache=False
+    ) -> None:
+        super().__init__(config_path, config_string, refresh_cache)
+
+        # A single python-gitlab client for the whole run, shared by all the processors,
+        # so that they also share its caches of groups, projects and users.
+        self.python_gitlab: PythonGitlab = GitlabWrapper(self).get_gitlab()
 
 
 class GitlabWrapper:
@@ -82,6 +91,7 @@ class GitlabWrapper:
             retry_transient_errors=True,
             graphql=graphql,
             session=session,
+            cache=gitlabform.cache,
         )
 
     def get_gitlab(self):
@@ -0,0 +1,327 @@
+import asyncio
+import time
+from logging import debug
+from typing import Any, List, Optional, Sequence
+
+from cli_ui import fatal
+
+from gitlabform.constants import EXIT_INVALID_INPUT
+from gitlabform.gitlab.core import (
+    GitLabCore,
+    NotFoundException,
+    UnexpectedResponseException,
+)
+from gitlabform.gitlab.groups import GitLabGroups
+from gitlabform.profiler import RequestsProfiler
+from gitlabform.util import to_str
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # type: ignore
+
+
+class AsyncGitLabCore:
+    """
+    An asyncio-based counterpart of the GitLabCore's methods for making requests, with the same contract,
+    for the code that needs to make many independent requests at once, f.e. to get many lists of projects.
+    The requests are multiplexed over up to `max_connections` connections instead of using a thread per request.
+
+    It reuses the URL, authentication, SSL verification and timeout settings of the given (synchronous)
+    GitLab object. It requires the optional "httpx" dependency (`pip install gitlabform[async]`).
+
+    Use it as an async context manager, f.e.:
+
+        async with AsyncGitLabCore(gitlab) as async_gitlab:
+            projects = await async_gitlab.get_projects("group")
+    """
+
+    # the same as for the synchronous requests
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.25
+    RETRY_STATUSES = [500, 502, 503, 504] + list(range(520, 531))
+
+    def __init__(
+        self,
+        gitlab: GitLabGroups,
+        max_connections: int = 10,
+        http2: bool = False,
+        transport: Optional[Any] = None,
+    ) -> None:
+        """
+        :param gitlab: GitLab object to take the connection settings from
+        :param max_connections: maximal number of connections to GitLab that are open at once
+        :param http2: set to True to use HTTP/2, if GitLab supports it, to multiplex the requests over
+                      a single connection. Requires the optional "h2" dependency.
+        :param transport: httpx transport to use instead of the default one (f.e. httpx.ASGITransport in tests)
+        """
+        if httpx is None:
+            fatal(
+                "Async transport requires the 'httpx' package."
+                " Please install it with: pip install gitlabform[async]",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+
+        self.gitlab = gitlab
+        self.url = gitlab.url
+        self.per_page = gitlab.per_page
+        # shared with the synchronous requests
+        self.rate_limiter = gitlab.rate_limiter
+        self.profiler = gitlab.profiler
+        self.tracer = gitlab.tracer
+        try:
+            self.client = httpx.AsyncClient(
+                headers=dict(gitlab.session.headers),
+                verify=gitlab.ssl_verify,
+                timeout=gitlab.timeout,
+                limits=httpx.Limits(max_connections=max_connections),
+                http2=http2,
+                transport=transport,
+            )
+        except ImportError:
+            fatal(
+                "HTTP/2 requires the 'h2' package."
+                " Please install it with: pip install gitlabform[async]",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+
+    async def __aenter__(self) -> "AsyncGitLabCore":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.client.aclose()
+
+    async def get_project(self, project_and_group_or_id) -> dict:
+        return await self._make_requests_to_api("projects/%s", project_and_group_or_id)
+
+    async def get_projects(
+        self,
+        group,
+        include_archived=False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        """
+        See GitLabGroups.iterate_projects() for the description - this is its async equivalent,
+        but it returns a list.
+        """
+        try:
+            projects = await self._make_requests_to_api(
+                self.gitlab.get_group_projects_path(include_archived), group
+            )
+        except NotFoundException:
+            return []
+
+        return [
+            {field: project[field] for field in fields} if fields else project
+            for project in projects
+            if project["path_with_namespace"].startswith(group + "/")
+        ]
+
+    async def _make_requests_to_api(
+        self,
+        path_as_format_string,
+        args=None,
+        method="GET",
+        data=None,
+        expected_codes=200,
+        json=None,
+    ):
+        """
+        See GitLabCore._make_requests_to_api() for the description - this is its async equivalent.
+
+        If GitLab says how many pages there are, then all the remaining pages are requested at once.
+        """
+        if method != "GET":
+            response = await self._make_request_to_api(
+                path_as_format_string, args, method, data, expected_codes, json
+            )
+            return response.json()
+
+        separator = "&" if "?" in path_as_format_string else "?"
+        path_as_format_string += f"{separator}per_page={self.per_page}"
+
+        # see GitLabCore._get_pages()
+        keyset_pagination = self.gitlab._supports_keyset_pagination(
+            path_as_format_string
+        )
+        if keyset_pagination:
+            if "order_by=" not in path_as_format_string:
+                path_as_format_string += "&order_by=id&sort=asc"
+            elif not GitLabCore._is_ordered_by_id(path_as_format_string):
+                return await self._get_pages_with_keyset_pagination(
+                    path_as_format_string, args, expected_codes
+                )
+
+        first_response = await self._make_request_to_api(
+            path_as_format_string, args, "GET", None, expected_codes, None
+        )
+        results = first_response.json()
+
+        next_page = first_response.headers.get("x-next-page")
+        total_pages = first_response.headers.get("x-total-pages")
+
+        if not next_page:
+            return results
+        elif total_pages:
+            responses = await asyncio.gather(
+                *(
+                    self._make_request_to_api(
+                        f"{path_as_format_string}&page={page}",
+                        args,
+                        "GET",
+                        None,
+                        expected_codes,
+                        None,
+                    )
+                    for page in range(int(next_page), int(total_pages) + 1)
+                )
+            )
+            for response in responses:
+                results += response.json()
+        elif keyset_pagination:
+            results += await self._get_pages_with_keyset_pagination(
+                path_as_format_string, args, expected_codes, results
+            )
+        else:
+            response = first_response
+            while response.headers.get("x-next-page"):
+                response = await self._make_request_to_api(
+                    f"{path_as_format_string}&page={response.headers['x-next-page']}",
+                    args,
+                    "GET",
+                    None,
+                    expected_codes,
+                    None,
+                )
+                results += response.json()
+
+        return results
+
+    async def _get_pages_with_keyset_pagination(
+        self,
+        path_as_format_string,
+        args,
+        expected_codes,
+        first_page: Optional[list] = None,
+    ) -> list:
+        """
+        See GitLabCore._get_pages_with_keyset_pagination() for the description - this is its async equivalent,
+        but it returns a single list with the objects from all the pages.
+        """
+        response = await self._make_request_to_api(
+            GitLabCore._to_keyset_pagination_path(path_as_format_string, first_page),
+            args,
+            "GET",
+            None,
+            expected_codes,
+            None,
+        )
+        results = response.json()
+        while "next" in response.links:
+            response = await self._make_request_to_api(
+                GitLabCore._to_api_path(response.links["next"]["url"]),
+                None,
+                "GET",
+                None,
+                expected_codes,
+                None,
+            )
+            results += response.json()
+        return results
+
+    async def _make_request_to_api(
+        self, path_as_format_string, args, method, dict_data, expected_codes, json_data
+    ):
+        """
+        See GitLabCore._make_request_to_api() for the description - this is its async equivalent.
+        """
+
+        expected_codes = GitLabCore._listify(expected_codes)
+
+        if dict_data and json_data:
+            raise Exception(
+                "You need to pass the data either as dict (dict_data) or JSON (json_data), not both!"
+            )
+
+        url = f"{self.url}/api/v4/{GitLabCore._format_with_url_encoding(path_as_format_string, args)}"
+
+        retries = 0
+        rate_limited_retries = 0
+        while True:
+            if wait := self.rate_limiter.reserve():
+                await asyncio.sleep(wait)
+            self.profiler.count_request(method)
+            endpoint = RequestsProfiler.normalize_endpoint(url)
+            with self.tracer.span(
+                f"{method} {endpoint}",
+                {
+                    "http.request.method": method,
+                    "url.full": url,
+                    "url.template": endpoint,
+                },
+            ) as span:
+                start = time.perf_counter()
+                if dict_data:
+                    response = await self.client.request(method, url, data=dict_data)
+                    debug(f"===> data = {to_str(dict_data)}")
+                elif json_data:
+                    response = await self.client.request(method, url, json=json_data)
+                    debug(f"===> json = {to_str(json_data)}")
+                else:
+                    response = await self.client.request(method, url)
+                if span:
+                    span.set_attribute(
+                        "http.response.status_code", response.status_code
+                    )
+                    if response.status_code >= 400:
+                        span.set_error(f"HTTP {response.status_code}")
+            self.profiler.record(
+                method,
+                url,
+                response.status_code,
+                time.perf_counter() - start,
+                len(response.content),
+            )
+            self.rate_limiter.update(response.status_code, response.headers)
+
+            if (
+                response.status_code == 429
+                and rate_limited_retries < self.rate_limiter.max_retries
+            ):
+                # the rate limiter will make us wait before the next attempt
+                rate_limited_retries += 1
+            elif response.status_code in self.RETRY_STATUSES and retries < self.RETRIES:
+                await asyncio.sleep(self.BACKOFF_FACTOR * (2**retries))
+                retries += 1
+            else:
+                break
+
+        if response.status_code in expected_codes:
+            # if we accept error responses then they will likely not contain a JSON body
+            # so fake it to fix further calls to response.json()
+            if response.status_code == 204 or (400 <= response.status_code <= 499):
+                response.json = lambda: {}  # type: ignore
+        else:
+            if response.status_code == 404:
+                raise NotFoundException(
+                    f"Resource with url='{url}' not found (HTTP 404)!"
+                )
+            else:
+                if dict_data:
+                    data_output = f"data='{to_str(dict_data)}' "
+                elif json_data:
+                    data_output = f"json='{to_str(json_data)}' "
+                else:
+                    data_output = ""
+
+                raise UnexpectedResponseException(
+                    f"Request url='{url}', method={method}, {data_output}failed -"
+                    f" expected code(s) {str(expected_codes)},"
+                    f" got code {response.status_code} & body: '{response.text}'",
+                    response.status_code,
+                    response.text,
+                )
+        debug(
+            f"<--- json = {to_str(response.json()) if response.json() else '(empty)'}"
+        )
+        return response
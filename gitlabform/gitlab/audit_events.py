@@ -0,0 +1,23 @@
+from typing import Iterator, Optional
+
+from gitlabform.gitlab.core import GitLabCore
+
+
+class GitLabAuditEvents(GitLabCore):
+    def iterate_audit_events_since(
+        self, since: str, group: Optional[str] = None
+    ) -> Iterator[dict]:
+        """
+        Requires GitLab Premium or Ultimate, and being an admin to get the instance audit events
+        or a group owner to get the group ones.
+
+        :param since: time in ISO 8601 format, like "2024-01-31T12:00:00Z"
+        :param group: group to get the audit events of, None to get the ones of the whole instance
+        :return: iterator over the audit events created after the given time
+        """
+        if group:
+            return self._iterate_requests_to_api(
+                "groups/%s/audit_events?created_after=%s", (group, since)
+            )
+        else:
+            return self._iterate_requests_to_api("audit_events?created_after=%s", since)
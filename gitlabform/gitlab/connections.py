@@ -0,0 +1,156 @@
+import threading
+import time
+from logging import debug
+from typing import Dict, Optional
+
+from requests.adapters import HTTPAdapter
+
+# noinspection PyPackageRequirements
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from gitlabform.gitlab.rate_limiter import RateLimiter
+from gitlabform.profiler import RequestsProfiler
+from gitlabform.tracing import Tracer
+
+
+class ConnectionStatistics:
+    """
+    Thread-safe counters of the HTTP requests made and of the connections opened for them,
+    to show how well the connections to GitLab are reused.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.discarded_connections = 0
+
+    def count_request(self) -> None:
+        with self.lock:
+            self.requests += 1
+
+    def count_new_connection(self) -> None:
+        with self.lock:
+            self.new_connections += 1
+
+    def count_discarded_connection(self) -> None:
+        with self.lock:
+            self.discarded_connections += 1
+
+    def get_statistics(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "new connections": self.new_connections,
+                "reused connections": max(0, self.requests - self.new_connections),
+                "discarded connections": self.discarded_connections,
+            }
+
+
+class _CountingConnectionPoolMixin:
+    statistics: ConnectionStatistics
+
+    def _new_conn(self):
+        self.statistics.count_new_connection()
+        return super()._new_conn()  # type: ignore
+
+    def _make_request(self, *args, **kwargs):
+        # called for each attempt, including the retries
+        self.statistics.count_request()
+        return super()._make_request(*args, **kwargs)  # type: ignore
+
+    def _put_conn(self, conn) -> None:
+        pool = self.pool  # type: ignore
+        if conn and pool is not None and pool.full():
+            # ...so it will be closed instead of being put back into the pool for reuse
+            self.statistics.count_discarded_connection()
+        super()._put_conn(conn)  # type: ignore
+
+
+class GitLabHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that counts the requests and connections in the given ConnectionStatistics and, if given
+    a RateLimiter, makes the requests at the rate it allows, retrying them after "429 Too Many Requests".
+    If given an enabled RequestsProfiler and/or Tracer, it records each request in them.
+    """
+
+    def __init__(
+        self,
+        statistics: ConnectionStatistics,
+        rate_limiter: Optional[RateLimiter] = None,
+        profiler: Optional[RequestsProfiler] = None,
+        tracer: Optional[Tracer] = None,
+        **kwargs,
+    ) -> None:
+        # has to be set before calling the parent constructor as it creates the pool manager
+        self.statistics = statistics
+        self.rate_limiter = rate_limiter
+        self.profiler = profiler or RequestsProfiler()
+        self.tracer = tracer or Tracer()
+        super().__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):
+        if not self.rate_limiter:
+            return self._send(request, *args, **kwargs)
+
+        retry = 0
+        while True:
+            self.rate_limiter.acquire()
+            response = self._send(request, *args, **kwargs)
+            self.rate_limiter.update(response.status_code, response.headers)
+            if response.status_code != 429 or retry >= self.rate_limiter.max_retries:
+                return response
+            # the request was not processed by GitLab, so it's safe to repeat it, whatever the method
+            retry += 1
+            debug(
+                f"Retrying {request.method} {request.url} - {retry}/{self.rate_limiter.max_retries}..."
+            )
+            response.close()
+
+    def _send(self, request, *args, **kwargs):
+        self.profiler.count_request(request.method)
+        if not (self.profiler.enabled or self.tracer.enabled):
+            return super().send(request, *args, **kwargs)
+
+        endpoint = RequestsProfiler.normalize_endpoint(request.url)
+        with self.tracer.span(
+            f"{request.method} {endpoint}",
+            {
+                "http.request.method": request.method,
+                "url.full": request.url,
+                "url.template": endpoint,
+            },
+        ) as span:
+            start = time.perf_counter()
+            response = super().send(request, *args, **kwargs)
+            if kwargs.get("stream"):
+                size = int(response.headers.get("content-length", 0))
+            else:
+                # read the body here, to include the time it takes in the latency
+                size = len(response.content)
+            latency = time.perf_counter() - start
+
+            if span:
+                span.set_attribute("http.response.status_code", response.status_code)
+                if response.status_code >= 400:
+                    span.set_error(f"HTTP {response.status_code}")
+
+        self.profiler.record(
+            request.method, request.url, response.status_code, latency, size
+        )
+        return response
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type(
+                "CountingHTTPConnectionPool",
+                (_CountingConnectionPoolMixin, HTTPConnectionPool),
+                {"statistics": self.statistics},
+            ),
+            "https": type(
+                "CountingHTTPSConnectionPool",
+                (_CountingConnectionPoolMixin, HTTPSConnectionPool),
+                {"statistics": self.statistics},
+            ),
+        }
@@ -1,6 +1,9 @@
-import functools
+import hashlib
 import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import debug
+from typing import Any, Deque, Iterator, Optional, Sequence, Tuple
 from urllib import parse
 
 from importlib.metadata import version as package_version
@@ -8,24 +11,55 @@ import requests
 
 # noinspection PyPackageRequirements
 import urllib3
-from cli_ui import debug as verbose, warning
-from requests.adapters import HTTPAdapter
+from cli_ui import warning
+from gitlabform.output import debug as verbose
 
 # noinspection PyPackageRequirements
 from urllib3.util.retry import Retry
 
+from gitlabform.cache import PersistentCache, cached
 from gitlabform.configuration import Configuration
+from gitlabform.fingerprints import SectionsFingerprints
+from gitlabform.gitlab.connections import ConnectionStatistics, GitLabHTTPAdapter
+from gitlabform.gitlab.rate_limiter import RateLimiter
+from gitlabform.profiler import RequestsProfiler
+from gitlabform.tracing import Tracer
 from gitlabform.util import to_str
 
 
 class GitLabCore:
-    def __init__(self, config_path=None, config_string=None):
-        self.configuration = Configuration(config_path, config_string)
+    def __init__(self, config_path=None, config_string=None, refresh_cache=False):
+        self.configuration = Configuration(config_path, config_string, refresh_cache)
 
         self.url = self.configuration.get("gitlab|url", os.getenv("GITLAB_URL"))
         self.token = self.configuration.get("gitlab|token", os.getenv("GITLAB_TOKEN"))
         self.ssl_verify = self.configuration.get("gitlab|ssl_verify", True)
         self.timeout = self.configuration.get("gitlab|timeout", 10)
+        self.per_page = self.configuration.get("gitlab|pagination|per_page", 100)
+        self.pagination_fan_out = self.configuration.get("gitlab|pagination|fan_out", 4)
+
+        self.cache = self.configuration.cache
+        self.cache.configure(self.configuration.get("gitlab|cache", {}))
+        persistent_cache_path = self.configuration.get(
+            "gitlab|persistent_cache|path", ""
+        )
+        if persistent_cache_path:
+            self.cache.persistent = PersistentCache(
+                path=persistent_cache_path,
+                gitlab_url=self.url,
+                ttl=self.configuration.get(
+                    "gitlab|persistent_cache|ttl", PersistentCache.DEFAULT_TTL
+                ),
+                refresh=refresh_cache,
+                conditional_requests=self.configuration.get(
+                    "gitlab|persistent_cache|conditional_requests", False
+                ),
+            )
+
+        self.fingerprints = SectionsFingerprints(
+            path=self.configuration.get("gitlab|fingerprints|path", None),
+            gitlab_url=self.url,
+        )
 
         self.session = requests.Session()
 
@@ -35,8 +69,38 @@ class GitLabCore:
             status_forcelist=[500, 502, 503, 504] + list(range(520, 531)),
         )
 
-        self.session.mount("http://", HTTPAdapter(max_retries=retries))
-        self.session.mount("https://", HTTPAdapter(max_retries=retries))
+        # shared by the http and https adapters, and also by python-gitlab as it uses the same session
+        self.connection_statistics = ConnectionStatistics()
+        # disabled unless requested
+        self.profiler = RequestsProfiler()
+        self.tracer = Tracer()
+        self.rate_limiter = RateLimiter(
+            requests_per_second=self.configuration.get(
+                "gitlab|rate_limit|requests_per_second", None
+            ),
+            burst=self.configuration.get("gitlab|rate_limit|burst", 10),
+            max_retries=self.configuration.get("gitlab|rate_limit|max_retries", 10),
+        )
+        for prefix in ["http://", "https://"]:
+            self.session.mount(
+                prefix,
+                GitLabHTTPAdapter(
+                    self.connection_statistics,
+                    self.rate_limiter,
+                    self.profiler,
+                    self.tracer,
+                    # the number of hosts to keep the connections pools for
+                    pool_connections=self.configuration.get(
+                        "gitlab|pool_connections", 10
+                    ),
+                    # the number of connections to keep open to a single host
+                    pool_maxsize=self.configuration.get("gitlab|pool_maxsize", 10),
+                    # whether to wait for a free connection instead of opening a new one
+                    # that will be discarded after the request, if all the kept connections are in use
+                    pool_block=self.configuration.get("gitlab|pool_block", False),
+                    max_retries=retries,
+                ),
+            )
 
         self.session.verify = self.ssl_verify
         if not self.ssl_verify:
@@ -79,8 +143,15 @@ class GitLabCore:
     def get_project(self, project_and_group_or_id):
         return self._make_requests_to_api("projects/%s", project_and_group_or_id)
 
-    @functools.lru_cache()
+    @cached("users")
     def _get_user_id(self, username: str) -> int:
+        return self.cache.persistent.get_or_resolve_id(
+            "users",
+            username,
+            lambda: self._get_user_id_from_gitlab(username),
+        )
+
+    def _get_user_id_from_gitlab(self, username: str) -> int:
         users = self._make_requests_to_api("users?username=%s", username, "GET")
 
         # this API endpoint is for lookup, not search, so 'username' has to be full and exact username
@@ -93,23 +164,30 @@ class GitLabCore:
 
         return int(users[0]["id"])
 
-    @functools.lru_cache()
+    @cached("groups")
     def _get_group_id(self, path) -> int:
-        group = self._make_requests_to_api("groups/%s", path, "GET")
-        return int(group["id"])
+        return self.cache.persistent.get_or_resolve_id(
+            "groups",
+            path,
+            lambda: int(self._make_requests_to_api("groups/%s", path, "GET")["id"]),
+        )
 
-    @functools.lru_cache()
+    @cached("projects")
     def _get_protected_branch_id(self, project_and_group_name, branch) -> int:
         branch = self._make_requests_to_api(
             "projects/%s/protected_branches/%s", (project_and_group_name, branch)
         )
         return int(branch["id"])
 
-    @functools.lru_cache()
+    @cached("projects")
     def _get_project_id(self, project_and_group):
         # This is a NEW workaround for https://github.com/gitlabhq/gitlabhq/issues/8290
-        result = self.get_project(project_and_group)
-        return str(result["id"])
+        project_id = self.cache.persistent.get_or_resolve_id(
+            "projects",
+            project_and_group,
+            lambda: int(self.get_project(project_and_group)["id"]),
+        )
+        return str(project_id)
 
     def _make_requests_to_api(
         self,
@@ -138,46 +216,319 @@ class GitLabCore:
                  arrays of objects and then this method returns JSON with a single array that contains all of those
                  objects.
         """
+        try:
+            results = self._make_requests_to_api_once(
+                path_as_format_string, args, method, data, expected_codes, json
+            )
+        except NotFoundException:
+            args_and_data = self._resolve_outdated_ids_again(
+                path_as_format_string, args, data, None
+            )
+            if args_and_data is None:
+                raise
+        else:
+            args_and_data = self._resolve_outdated_ids_again(
+                path_as_format_string, args, data, results
+            )
+            if args_and_data is None:
+                return results
+        # ...so the request has been made with an outdated persistently cached id, repeat it with the valid one
+        args, data = args_and_data
+        return self._make_requests_to_api_once(
+            path_as_format_string, args, method, data, expected_codes, json
+        )
+
+    def _make_requests_to_api_once(
+        self, path_as_format_string, args, method, data, expected_codes, json
+    ):
         if method != "GET":
             response = self._make_request_to_api(
                 path_as_format_string, args, method, data, expected_codes, json
             )
             return response.json()
         else:
-            if "?" in path_as_format_string:
-                path_as_format_string += "&per_page=100"
-            else:
-                path_as_format_string += "?per_page=100"
+            results = None
+            for page in self._get_pages(path_as_format_string, args, expected_codes):
+                if results is None:
+                    results = page
+                else:
+                    results += page
 
-            first_response = self._make_request_to_api(
-                path_as_format_string, args, method, data, expected_codes, json
+        return results
+
+    def _resolve_outdated_ids_again(
+        self, path_as_format_string, args, data, results
+    ) -> Optional[Tuple[Any, Any]]:
+        """
+        :param results: what the request has returned, or None if it failed with 404
+        :return: the args and data of the request with the outdated persistently cached ids that it has been made
+                 with (see PersistentCache.drop_outdated_ids()) replaced with the resolved again ones,
+                 or None if there were no such ids
+        """
+        persistent = self.cache.persistent
+        if not persistent.unconfirmed_ids:
+            return None
+        dropped_ids = persistent.drop_outdated_ids(
+            self._format_with_url_encoding(path_as_format_string, args),
+            data,
+            results if isinstance(results, dict) else None,
+        )
+        if not dropped_ids:
+            return None
+
+        resolve_again = {
+            "users": self._get_user_id,
+            "groups": self._get_group_id,
+            "projects": self._get_project_id,
+        }
+        valid_ids = {}
+        for kind, outdated_id, key in dropped_ids:
+            self.cache.invalidate(kind, key)
+            valid_ids[str(outdated_id)] = resolve_again[kind](key)
+
+        def replace(value):
+            if str(value) in valid_ids:
+                return type(value)(valid_ids[str(value)])
+            return value
+
+        if isinstance(args, tuple):
+            args = tuple(replace(arg) for arg in args)
+        elif args is not None:
+            args = replace(args)
+        if isinstance(data, dict):
+            data = {
+                field: replace(value) if field in PersistentCache.ID_FIELDS else value
+                for field, value in data.items()
+            }
+        return args, data
+
+    def get_list_fingerprint(self, path_as_format_string, args=None) -> Optional[str]:
+        """
+        Makes a single GET request to a list endpoint to get a fingerprint of the list that changes when any of
+        its elements is added, changed or removed. (For the params description please see `_make_requests_to_api()`.)
+
+        :return: the ETag of the list (or a hash of it, if there is no ETag), or None if the list doesn't fit
+                 in a single page (or doesn't exist), as then getting its fingerprint is not cheap
+        """
+        separator = "&" if "?" in path_as_format_string else "?"
+        try:
+            response = self._make_request_to_api(
+                f"{path_as_format_string}{separator}per_page={self.per_page}",
+                args,
+                "GET",
+                None,
+                200,
+                None,
             )
-            results = first_response.json()
+        except NotFoundException:
+            return None
+        if response.headers.get("x-next-page"):
+            return None
+        return (
+            response.headers.get("etag") or hashlib.sha256(response.content).hexdigest()
+        )
 
-            # In newer versions of GitLab the 'x-total-pages' may not be available
-            # anymore, see https://gitlab.com/gitlab-org/gitlab/-/merge_requests/43159
-            # so let's use the 'x-next-page' header instead
+    def _iterate_requests_to_api(
+        self,
+        path_as_format_string,
+        args=None,
+        expected_codes=200,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        """
+        Like `_make_requests_to_api()` for GETs of lists, but instead of returning a single list with all the objects
+        from all the pages, yields the objects one by one, requesting the next pages only when they are needed.
+        Use it for the lists that may be huge, like all the projects in a GitLab instance.
 
-            response = first_response
-            while True:
-                if (
-                    "x-next-page" in response.headers
-                    and response.headers["x-next-page"]
-                ):
-                    next_page = response.headers["x-next-page"]
-                    response = self._make_request_to_api(
-                        path_as_format_string + "&page=" + str(next_page),
-                        args,
-                        method,
-                        data,
-                        expected_codes,
-                        json,
-                    )
-                    results += response.json()
+        :param fields: if set, then only these fields of each object are yielded, so the rest of them can be
+                       garbage collected together with their page
+        :return: iterator over the objects from the list
+        """
+        for page in self._get_pages(path_as_format_string, args, expected_codes):
+            for item in page:
+                if fields:
+                    yield {field: item[field] for field in fields}
                 else:
-                    break
+                    yield item
 
-        return results
+    def _get_pages(self, path_as_format_string, args, expected_codes) -> Iterator[Any]:
+        """
+        Makes GET request(s) to a maybe paginated endpoint and yields the JSON returned in each of the pages,
+        in order. (For the params description please see `_make_requests_to_api()`.)
+
+        If the endpoint tells us how many pages there are, then the rest of them are requested concurrently,
+        up to `gitlab|pagination|fan_out` pages at once. Otherwise, for the endpoints that support it, we switch
+        to the keyset pagination, which is faster for the huge lists. Otherwise, we request one page after another.
+        """
+        separator = "&" if "?" in path_as_format_string else "?"
+        path_as_format_string += f"{separator}per_page={self.per_page}"
+
+        keyset_pagination = self._supports_keyset_pagination(path_as_format_string)
+        if keyset_pagination:
+            if "order_by=" not in path_as_format_string:
+                # order the first page like the next ones would be in the keyset pagination mode,
+                # so that we can switch to it after the first page, without requesting it again
+                path_as_format_string += "&order_by=id&sort=asc"
+            elif not self._is_ordered_by_id(path_as_format_string):
+                # ...which is possible only when ordering by id, so otherwise use this mode from the start
+                yield from self._get_pages_with_keyset_pagination(
+                    path_as_format_string, args, expected_codes
+                )
+                return
+
+        first_response = self._make_request_to_api(
+            path_as_format_string, args, "GET", None, expected_codes, None
+        )
+
+        next_page = first_response.headers.get("x-next-page")
+        # In newer versions of GitLab the 'x-total-pages' is not available for the lists with more than
+        # 10k elements, see https://gitlab.com/gitlab-org/gitlab/-/merge_requests/43159
+        total_pages = first_response.headers.get("x-total-pages")
+
+        if not next_page:
+            yield first_response.json()
+        elif total_pages and self.pagination_fan_out > 1:
+            yield first_response.json()
+
+            def get_page(page: int) -> Any:
+                return self._make_request_to_api(
+                    f"{path_as_format_string}&page={page}",
+                    args,
+                    "GET",
+                    None,
+                    expected_codes,
+                    None,
+                ).json()
+
+            pages = iter(range(int(next_page), int(total_pages) + 1))
+            with ThreadPoolExecutor(max_workers=self.pagination_fan_out) as executor:
+                # keep only up to `fan_out` pages requested ahead of the one being consumed,
+                # so that the memory usage doesn't grow with the length of the list
+                requested: Deque[Future] = deque(
+                    executor.submit(get_page, page)
+                    for _, page in zip(range(self.pagination_fan_out), pages)
+                )
+                while requested:
+                    page_json = requested.popleft().result()
+                    if (page := next(pages, None)) is not None:
+                        requested.append(executor.submit(get_page, page))
+                    yield page_json
+        elif not total_pages and keyset_pagination:
+            first_page = first_response.json()
+            yield first_page
+            yield from self._get_pages_with_keyset_pagination(
+                path_as_format_string, args, expected_codes, first_page
+            )
+        else:
+            yield first_response.json()
+
+            response = first_response
+            while response.headers.get("x-next-page"):
+                response = self._make_request_to_api(
+                    f"{path_as_format_string}&page={response.headers['x-next-page']}",
+                    args,
+                    "GET",
+                    None,
+                    expected_codes,
+                    None,
+                )
+                yield response.json()
+
+    # endpoints that support keyset pagination -> the orderings that it supports for them,
+    # see https://docs.gitlab.com/ee/api/rest/#keyset-based-pagination
+    KEYSET_PAGINATION_ORDERINGS = {
+        "projects": [
+            "id",
+            "name",
+            "path",
+            "created_at",
+            "updated_at",
+            "last_activity_at",
+        ],
+        "groups/%s/projects": ["id"],
+    }
+
+    def _supports_keyset_pagination(self, path_as_format_string: str) -> bool:
+        path, _, query = path_as_format_string.partition("?")
+        if path not in self.KEYSET_PAGINATION_ORDERINGS:
+            return False
+        # an explicit ordering may be required, f.e. by the "updated_after" filter, so it's kept
+        order_by = parse.parse_qs(query).get("order_by", ["id"])[0]
+        return order_by in self.KEYSET_PAGINATION_ORDERINGS[path]
+
+    @staticmethod
+    def _is_ordered_by_id(path_as_format_string: str) -> bool:
+        query = parse.parse_qs(path_as_format_string.partition("?")[2])
+        return query.get("order_by", ["id"])[0] == "id"
+
+    @staticmethod
+    def _to_keyset_pagination_path(
+        path_as_format_string: str, first_page: Optional[list] = None
+    ) -> str:
+        """
+        :param first_page: the first page, if it has been already requested in the offset pagination mode,
+                           ordered by id - then the returned path is to the pages after it
+        """
+        path, query = path_as_format_string.split("?", 1)
+        parameters = [
+            parameter
+            for parameter in query.split("&")
+            if not parameter.startswith("page=")
+        ]
+        parameters.append("pagination=keyset")
+        if not any(parameter.startswith("order_by=") for parameter in parameters):
+            parameters += ["order_by=id", "sort=asc"]
+        if first_page is not None:
+            # the same parameter as in the links to the next pages returned by GitLab
+            sort = parse.parse_qs("&".join(parameters)).get("sort", ["desc"])[0]
+            parameters.append(
+                f"{'id_after' if sort == 'asc' else 'id_before'}={first_page[-1]['id']}"
+            )
+        return f"{path}?{'&'.join(parameters)}"
+
+    def _get_pages_with_keyset_pagination(
+        self,
+        path_as_format_string,
+        args,
+        expected_codes,
+        first_page: Optional[list] = None,
+    ) -> Iterator[Any]:
+        """
+        :param first_page: the first page, if it has been already requested in the offset pagination mode,
+                           ordered by id - then the pages after it are yielded
+        """
+        response = self._make_request_to_api(
+            self._to_keyset_pagination_path(path_as_format_string, first_page),
+            args,
+            "GET",
+            None,
+            expected_codes,
+            None,
+        )
+        yield response.json()
+
+        while "next" in response.links:
+            response = self._make_request_to_api(
+                self._to_api_path(response.links["next"]["url"]),
+                None,
+                "GET",
+                None,
+                expected_codes,
+                None,
+            )
+            yield response.json()
+
+    @staticmethod
+    def _to_api_path(url: str) -> str:
+        """
+        :param url: a complete, already URL-encoded URL of an API endpoint, f.e. from a link returned by GitLab
+        :return: the path (with the query) of the endpoint relative to the API root, f.e. "projects?id_after=1",
+                 regardless of the host, port and scheme in the URL (which may be different than in `self.url`,
+                 f.e. behind a proxy)
+        """
+        split_url = parse.urlsplit(url)
+        path = split_url.path.split("/api/v4/", 1)[-1]
+        return f"{path}?{split_url.query}" if split_url.query else path
 
     def _make_request_to_api(
         self, path_as_format_string, args, method, dict_data, expected_codes, json_data
@@ -208,6 +559,8 @@ class GitLabCore:
                 method, url, json=json_data, timeout=self.timeout
             )
             debug(f"===> json = {to_str(json_data)}")
+        elif method == "GET" and self.cache.persistent.conditional_requests:
+            response = self._make_conditional_get_request(url)
         else:
             response = self.session.request(method, url, timeout=self.timeout)
 
@@ -242,6 +595,75 @@ class GitLabCore:
             debug(f"<--- json = (empty))")
         return response
 
+    def query_graphql(self, query: str, variables: Optional[dict] = None) -> dict:
+        """
+        Makes a request to the GitLab GraphQL API, using the same session (so with the same rate limiting,
+        retries, profiling etc.) as for the REST API requests.
+
+        :param query: GraphQL query
+        :param variables: values of the variables used in the query
+        :return: the data returned. If there are also some errors, f.e. because of missing permissions
+                 for some fields, then they are logged and these fields are null in the data.
+        """
+        url = f"{self.url}/api/graphql"
+        response = self.session.request(
+            "POST",
+            url,
+            json={"query": query, "variables": variables or {}},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise UnexpectedResponseException(
+                f"GraphQL request to url='{url}' failed -"
+                f" got code {response.status_code} & body: '{response.text}'",
+                response.status_code,
+                response.text,
+            )
+
+        result = response.json()
+        if result.get("errors"):
+            if not result.get("data"):
+                raise UnexpectedResponseException(
+                    f"GraphQL request to url='{url}' failed with errors: {result['errors']}",
+                    response.status_code,
+                    response.text,
+                )
+            debug(f"<--- GraphQL errors = {to_str(result['errors'])}")
+        return result["data"]
+
+    def _make_conditional_get_request(self, url: str) -> requests.Response:
+        """
+        Makes a GET request with the ETag of the response stored in the persistent cache (if there is one),
+        so that GitLab can answer with just "304 Not Modified" instead of the whole body if nothing has changed.
+        In such case the stored response is returned.
+        """
+        stored_response = self.cache.persistent.get_response(url)
+
+        if stored_response:
+            etag, stored_headers, stored_body = stored_response
+            response = self.session.request(
+                "GET",
+                url,
+                timeout=self.timeout,
+                headers={"If-None-Match": etag},
+            )
+            if response.status_code == 304:
+                debug(f"<--- 304 Not Modified, using stored response for {url}")
+                self.cache.persistent.count_response(hit=True)
+                response.status_code = 200
+                response.headers.update(stored_headers)
+                response._content = stored_body
+                return response
+        else:
+            response = self.session.request("GET", url, timeout=self.timeout)
+
+        self.cache.persistent.count_response(hit=False)
+        if response.status_code == 200 and "etag" in response.headers:
+            self.cache.persistent.put_response(
+                url, response.headers["etag"], response.headers, response.content
+            )
+        return response
+
     @staticmethod
     def _format_with_url_encoding(format_string, single_arg_or_args_tuple):
         # we want to URL-encode all the args, but not the path itself which looks like "/foo/%s/bar"
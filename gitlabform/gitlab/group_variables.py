@@ -11,6 +11,9 @@ def to_string(x):
 
 class GitLabGroupVariables(GitLabCore):
     def get_group_variables(self, group):
+        prefetched_variables = self.cache.prefetched.take("group_variables", group)
+        if prefetched_variables is not None:
+            return prefetched_variables
         return self._make_requests_to_api("groups/%s/variables", group)
 
     def post_group_variable(self, group, variable):
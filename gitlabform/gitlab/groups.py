@@ -1,10 +1,11 @@
-import functools
+from typing import Iterator, Optional, Sequence
 
+from gitlabform.cache import cached
 from gitlabform.gitlab.core import GitLabCore, NotFoundException
 
 
 class GitLabGroups(GitLabCore):
-    @functools.lru_cache()
+    @cached("groups")
     def get_group_id_case_insensitive(self, some_string):
         # Cache the mapping from some_string -> id, as that won't change during our run.
         return self.get_group_case_insensitive(some_string)["id"]
@@ -38,10 +39,28 @@ class GitLabGroups(GitLabCore):
             "groups/%s/descendant_groups", group_id_or_path
         )
 
+    def iterate_group_descendants(
+        self, group_id_or_path, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[dict]:
+        """
+        :param group_id_or_path: group id or path
+        :param fields: if set, then only these fields of the descendant groups objects are returned
+        :return: iterator over descendant groups objects, getting them from GitLab page by page
+        """
+        return self._iterate_requests_to_api(
+            "groups/%s/descendant_groups", group_id_or_path, fields=fields
+        )
+
     def get_groups(self):
         """
         :return: sorted list of groups
         """
+        return sorted(group["full_path"] for group in self.iterate_groups())
+
+    def iterate_groups(self) -> Iterator[dict]:
+        """
+        :return: iterator over groups objects with only the "full_path" field, getting them from GitLab page by page
+        """
 
         if self.admin:
             query = "all_available=true"
@@ -50,9 +69,7 @@ class GitLabGroups(GitLabCore):
             # - it's the minimal role that is needed to manage something (f.e. group labels)
             query = f"min_access_level=20"
 
-        result = self._make_requests_to_api(f"groups?{query}")
-
-        return sorted(map(lambda x: x["full_path"], result))
+        return self._iterate_requests_to_api(f"groups?{query}", fields=["full_path"])
 
     def get_projects(self, group, include_archived=False, only_names=True):
         """
@@ -63,42 +80,59 @@ class GitLabGroups(GitLabCore):
                  returned, so if "group" (= members of this group) is also a member of some projects, they won't be
                  returned here.
         """
-        try:
-            # there are 3 states of the "archived" flag: true, false, undefined
-            # we use the last 2
-            if include_archived:
-                query1 = "include_subgroups=true"
-            else:
-                query1 = "include_subgroups=true&archived=false"
-
-            if self.admin:
-                query2 = "all_available=true"
-            else:
-                # it's pointless to get projects with a lower role than Reporter
-                # - it's the minimal role that is needed to manage something (f.e. labels)
-                query2 = f"min_access_level=20"
-
-            projects = self._make_requests_to_api(
-                f"groups/%s/projects?{query1}&{query2}", group
-            )
-        except NotFoundException:
-            projects = []
-
-        project_and_groups_in_group_namespace = [
-            project
-            for project in projects
-            if project["path_with_namespace"].startswith(group + "/")
-        ]
-
         if only_names:
             return sorted(
-                map(
-                    lambda x: x["path_with_namespace"],
-                    project_and_groups_in_group_namespace,
+                project["path_with_namespace"]
+                for project in self.iterate_projects(
+                    group, include_archived, fields=["path_with_namespace"]
                 )
             )
         else:
             return sorted(
-                project_and_groups_in_group_namespace,
+                self.iterate_projects(group, include_archived),
                 key=lambda x: x["path_with_namespace"],
             )
+
+    def iterate_projects(
+        self,
+        group,
+        include_archived=False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        """
+        :param group: group name
+        :param include_archived: set to True if archived projects should also be returned
+        :param fields: if set, then only these fields of the project objects are returned
+                       ("path_with_namespace" has to be one of them)
+        :return: iterator over project objects from the "group" namespace (see `get_projects()`), getting them
+                 from GitLab page by page, in no particular order
+        """
+        try:
+            for project in self._iterate_requests_to_api(
+                self.get_group_projects_path(include_archived), group, fields=fields
+            ):
+                if project["path_with_namespace"].startswith(group + "/"):
+                    yield project
+        except NotFoundException:
+            return
+
+    def get_group_projects_path(self, include_archived: bool) -> str:
+        """
+        :param include_archived: set to True if archived projects should also be returned
+        :return: path to get projects in a group and its subgroups, with '%s' in place of the group
+        """
+        # there are 3 states of the "archived" flag: true, false, undefined
+        # we use the last 2
+        if include_archived:
+            query1 = "include_subgroups=true"
+        else:
+            query1 = "include_subgroups=true&archived=false"
+
+        if self.admin:
+            query2 = "all_available=true"
+        else:
+            # it's pointless to get projects with a lower role than Reporter
+            # - it's the minimal role that is needed to manage something (f.e. labels)
+            query2 = f"min_access_level=20"
+
+        return f"groups/%s/projects?{query1}&{query2}"
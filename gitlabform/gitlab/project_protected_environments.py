@@ -1,4 +1,4 @@
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 
 from gitlabform.gitlab.projects import GitLabProjects
 
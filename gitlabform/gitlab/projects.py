@@ -1,4 +1,5 @@
 from time import sleep
+from typing import Iterator
 
 from gitlabform.gitlab.core import (
     GitLabCore,
@@ -108,17 +109,52 @@ class GitLabProjects(GitLabCore):
         :param include_archived: if the archived projects should be returned too
         :return: sorted list of ALL projects you have access to, strings like: "group/project_name"
         """
+        return sorted(self.iterate_all_projects(include_archived))
+
+    def iterate_all_projects(self, include_archived=False) -> Iterator[str]:
+        """
+        :param include_archived: if the archived projects should be returned too
+        :return: iterator over ALL projects you have access to, strings like: "group/project_name",
+                 getting them from GitLab page by page, in no particular order
+        """
+        # there are 3 states of the "archived" flag: true, false, undefined
+        # we use the last 2
+        if include_archived:
+            query_string = "order_by=name&sort=asc"
+        else:
+            query_string = "order_by=name&sort=asc&archived=false"
         try:
-            # there are 3 states of the "archived" flag: true, false, undefined
-            # we use the last 2
-            if include_archived:
-                query_string = "order_by=name&sort=asc"
-            else:
-                query_string = "order_by=name&sort=asc&archived=false"
-            result = self._make_requests_to_api(f"projects?{query_string}")
-            return sorted(map(lambda x: x["path_with_namespace"], result))
+            for project in self._iterate_requests_to_api(
+                f"projects?{query_string}", fields=["path_with_namespace"]
+            ):
+                yield project["path_with_namespace"]
         except NotFoundException:
-            return []
+            return
+
+    def iterate_projects_changed_since(self, since: str) -> Iterator[str]:
+        """
+        :param since: time in ISO 8601 format, like "2024-01-31T12:00:00Z"
+        :return: iterator over the projects you have access to with some activity (pushes, merge requests etc.)
+                 or changes of the project itself after the given time, strings like: "group/project_name".
+                 A project may be returned twice.
+        """
+        yield from (
+            project["path_with_namespace"]
+            for project in self._iterate_requests_to_api(
+                "projects?last_activity_after=%s",
+                since,
+                fields=["path_with_namespace"],
+            )
+        )
+        # (this filter requires ordering by the update time)
+        yield from (
+            project["path_with_namespace"]
+            for project in self._iterate_requests_to_api(
+                "projects?order_by=updated_at&updated_after=%s",
+                since,
+                fields=["path_with_namespace"],
+            )
+        )
 
     def get_project_settings(self, project_and_group_name):
         try:
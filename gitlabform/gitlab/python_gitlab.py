@@ -1,12 +1,13 @@
-import functools
 from typing import Union, Any, Optional, Dict, List
 
 import gitlab.const
-from gitlab import Gitlab, GitlabGetError, GraphQL
+from gitlab import Gitlab, GitlabGetError, GitlabHttpError, GraphQL
 from gitlab.base import RESTObject
 from gitlab.v4.objects import Group, Project, User
 
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
+
+from gitlabform.cache import EntityCache, PersistentCache, cached
 
 
 # Extends the python-gitlab class to add convenience wrappers for common functionality used within gitlabform
@@ -29,6 +30,7 @@ class PythonGitlab(Gitlab):
         user_agent: str = gitlab.const.USER_AGENT,
         retry_transient_errors: bool = False,
         keep_base_url: bool = False,
+        cache: Optional[EntityCache] = None,
         **kwargs: Any,
     ) -> None:
         super().__init__(
@@ -52,6 +54,59 @@ class PythonGitlab(Gitlab):
         # Python Gitlab GraphQL interface
         # https://python-gitlab.readthedocs.io/en/stable/api-usage-graphql.html
         self.graphql = graphql
+        self.cache = cache or EntityCache()
+
+    def http_request(self, verb: str, path: str, *args: Any, **kwargs: Any) -> Any:
+        # the "429 Too Many Requests" responses are already retried, at the rate allowed by GitLab,
+        # by the HTTP adapter of the session shared with GitLabForm (see GitLabHTTPAdapter),
+        # so they must not be retried here again
+        kwargs.setdefault("obey_rate_limit", False)
+        try:
+            return super().http_request(verb, path, *args, **kwargs)
+        except GitlabHttpError as e:
+            if e.response_code != 404:
+                raise
+            valid_ids = self._resolve_outdated_ids_again(path, kwargs.get("post_data"))
+            if not valid_ids:
+                raise
+        # ...so the request has been made with an outdated persistently cached id, repeat it with the valid one
+        segments = path.split("/")
+        for index in range(1, len(segments)):
+            if segments[index - 1] in PersistentCache.KEY_ATTRIBUTES:
+                segments[index] = valid_ids.get(segments[index], segments[index])
+        path = "/".join(segments)
+        if isinstance(kwargs.get("post_data"), dict):
+            kwargs["post_data"] = {
+                field: (
+                    int(valid_ids[str(value)])
+                    if field in PersistentCache.ID_FIELDS and str(value) in valid_ids
+                    else value
+                )
+                for field, value in kwargs["post_data"].items()
+            }
+        return super().http_request(verb, path, *args, **kwargs)
+
+    def _resolve_outdated_ids_again(
+        self, path: str, post_data: Optional[Any]
+    ) -> Dict[str, str]:
+        """
+        :return: the outdated persistently cached ids that the request failed with 404 has been made with
+                 (see PersistentCache.drop_outdated_ids()) -> the resolved again ones, as strings
+        """
+        resolve_again = {
+            "users": self.get_user_id_cached,
+            "groups": self.get_group_id,
+            "projects": self.get_project_id,
+        }
+        valid_ids = {}
+        for kind, outdated_id, key in self.cache.persistent.drop_outdated_ids(
+            path, post_data
+        ):
+            self.cache.invalidate(kind, key)
+            valid_id = resolve_again[kind](key)
+            if valid_id is not None:
+                valid_ids[str(outdated_id)] = str(valid_id)
+        return valid_ids
 
     def get_user_id_cached(self, username) -> int | None:
         """
@@ -66,15 +121,19 @@ class PythonGitlab(Gitlab):
 
         return user.id
 
+    @cached("groups")
     def get_group_id(self, groupname) -> int:
-        group = self.get_group_by_path_cached(groupname)
-        return group.id
+        return self.cache.persistent.get_or_resolve_id(
+            "groups", groupname, lambda: self.get_group_by_path_cached(groupname).id
+        )
 
+    @cached("projects")
     def get_project_id(self, name) -> int:
-        project = self.get_project_by_path_cached(name)
-        return project.id
+        return self.cache.persistent.get_or_resolve_id(
+            "projects", name, lambda: self.get_project_by_path_cached(name).id
+        )
 
-    @functools.lru_cache()
+    @cached("projects")
     def get_project_by_path_cached(self, name: str, lazy: bool = False) -> Project:
         project: Project = self.projects.get(name, lazy)
         if project:
@@ -82,7 +141,7 @@ class PythonGitlab(Gitlab):
 
         raise GitlabGetError("No project found when getting '%s'" % name, 404)
 
-    @functools.lru_cache()
+    @cached("groups")
     def get_group_by_path_cached(self, groupname: str) -> Group:
         group: Group = self.groups.get(groupname)
         if group:
@@ -91,8 +150,19 @@ class PythonGitlab(Gitlab):
         raise GitlabGetError("No group found when getting '%s'" % groupname, 404)
 
     #  Uses "LIST" to get a user by username, to get the full User object, call get using the user's id
-    @functools.lru_cache()
+    @cached("users")
     def get_user_by_username_cached(self, username: str) -> User | None:
+        user_id = self.cache.persistent.get_id("users", username)
+        if user_id is not None:
+            try:
+                user: User = self.users.get(user_id)
+                if user.username.lower() == username.lower():
+                    return user
+            except GitlabGetError:
+                pass
+            verbose(f"Persistently cached id of user '{username}' is outdated")
+            self.cache.persistent.delete_id("users", username)
+
         # Gitlab API will only ever return 0 or 1 entry when GETting using `username` attribute
         # https://docs.gitlab.com/ee/api/users.html#for-non-administrator-users
         # so will always be list[RESTObject] and never RESTObjectList from python-gitlab's api
@@ -101,10 +171,10 @@ class PythonGitlab(Gitlab):
         if len(users) == 0:
             return None
 
-        user = users[0]
-        return self.users.get(user.id)
+        self.cache.persistent.put_id("users", username, users[0].id)
+        return self.users.get(users[0].id)
 
-    @functools.lru_cache()
+    @cached("member_roles")
     def _get_member_roles_from_group_cached(
         self, group_full_path: str
     ) -> List[Dict[str, str]]:
@@ -157,7 +227,7 @@ class PythonGitlab(Gitlab):
 
         return self._convert_result_to_member_roles(member_role_nodes)
 
-    @functools.lru_cache()
+    @cached("member_roles")
     def _get_member_roles_from_instance_cached(self) -> List[Dict[str, str]]:
         """Query GraphQL using Python Gitlab
         https://python-gitlab.readthedocs.io/en/stable/api-usage-graphql.html
@@ -0,0 +1,153 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from logging import debug
+from typing import Callable, Dict, Mapping, Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting the rate of the requests to GitLab, shared by all the ways we make them
+    (our own requests, python-gitlab and the async transport).
+
+    The rate adapts to what GitLab tells us in the responses:
+    * "RateLimit-Remaining" and "RateLimit-Reset" headers - the rate is set to spread the remaining requests
+      evenly until the reset, but not higher than the configured `requests_per_second`, if it is set,
+    * "429 Too Many Requests" responses - all the requests are paused for the time from their "Retry-After"
+      header (or until the "RateLimit-Reset" time, or for a second, if there are none of these headers).
+    """
+
+    # used if GitLab responds with 429 without telling us for how long to wait
+    DEFAULT_RETRY_AFTER = 1.0
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        burst: int = 10,
+        max_retries: int = 10,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        :param requests_per_second: max rate of the requests, None for no limit other than the one from GitLab
+        :param burst: max number of requests that can be made at once, without waiting
+        :param max_retries: max number of retries of a request after 429 responses
+        :param clock: function returning current time, in seconds since the epoch
+        :param sleep: function to wait for the given number of seconds
+        """
+        self.lock = threading.Lock()
+        self.max_rate = requests_per_second
+        self.rate = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.clock = clock
+        self.sleep = sleep
+
+        self.tokens = float(burst)
+        self.last_refill = self.clock()
+        self.blocked_until = 0.0
+
+        self.started = self.clock()
+        self.requests = 0
+        self.throttle_wait = 0.0
+        self.too_many_requests_responses = 0
+
+    def acquire(self) -> None:
+        """
+        Waits until a request can be made.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+
+    def reserve(self) -> float:
+        """
+        Reserves the right to make a request, without waiting.
+
+        :return: number of seconds to wait before making the request
+        """
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            wait = max(0.0, self.blocked_until - now)
+            if self.rate:
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+            self.requests += 1
+            self.throttle_wait += wait
+            return wait
+
+    def update(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """
+        Adapts the rate to the response from GitLab.
+
+        :param status_code: HTTP status code of the response
+        :param headers: headers of the response (case-insensitive)
+        """
+        with self.lock:
+            now = self.clock()
+            reset = self._get_float_header(headers, "RateLimit-Reset")
+
+            if status_code == 429:
+                self.too_many_requests_responses += 1
+                retry_after = self._get_retry_after(headers, now)
+                if retry_after is None:
+                    retry_after = (
+                        reset - now
+                        if reset and reset > now
+                        else self.DEFAULT_RETRY_AFTER
+                    )
+                debug(f"Rate limited by GitLab, pausing requests for {retry_after}s")
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                # ...and start again slowly after that
+                self.tokens = min(self.tokens, 0.0)
+
+            remaining = self._get_float_header(headers, "RateLimit-Remaining")
+            if remaining is not None and reset is not None:
+                if remaining <= 0:
+                    self.blocked_until = max(self.blocked_until, reset)
+                else:
+                    self._refill(now)
+                    rate = remaining / max(reset - now, 1.0)
+                    self.rate = min(rate, self.max_rate) if self.max_rate else rate
+
+    def get_statistics(self) -> Dict[str, float]:
+        with self.lock:
+            elapsed = self.clock() - self.started
+            return {
+                "requests": self.requests,
+                "requests per second": (
+                    round(self.requests / elapsed, 2) if elapsed > 0 else 0.0
+                ),
+                "throttled seconds": round(self.throttle_wait, 2),
+                "too many requests responses": self.too_many_requests_responses,
+            }
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self.tokens = min(
+                float(self.burst), self.tokens + (now - self.last_refill) * self.rate
+            )
+        self.last_refill = now
+
+    @staticmethod
+    def _get_float_header(headers: Mapping[str, str], name: str) -> Optional[float]:
+        try:
+            return float(headers[name])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _get_retry_after(
+        cls, headers: Mapping[str, str], now: float
+    ) -> Optional[float]:
+        # can be either a number of seconds or an HTTP date
+        if (retry_after := cls._get_float_header(headers, "Retry-After")) is not None:
+            return max(0.0, retry_after)
+        try:
+            return max(
+                0.0, parsedate_to_datetime(headers["Retry-After"]).timestamp() - now
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
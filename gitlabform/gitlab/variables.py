@@ -3,6 +3,11 @@ from gitlabform.gitlab.projects import GitLabProjects
 
 class GitLabVariables(GitLabProjects):
     def get_variables(self, project_and_group_name):
+        prefetched_variables = self.cache.prefetched.take(
+            "variables", project_and_group_name
+        )
+        if prefetched_variables is not None:
+            return prefetched_variables
         return self._make_requests_to_api(
             "projects/%s/variables", project_and_group_name
         )
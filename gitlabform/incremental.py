@@ -0,0 +1,132 @@
+import json
+import os
+from datetime import datetime, timezone
+from logging import debug
+from typing import Dict, Optional
+
+from cli_ui import fatal
+from gitlabform.output import debug as verbose
+
+from gitlabform.constants import EXIT_INVALID_INPUT, EXIT_PROCESSING_ERROR
+from gitlabform.plan import Plan
+
+
+class IncrementalState:
+    """
+    The state of the incremental runs, requested with `--incremental-since`, which process only the groups
+    and projects that could have changed since a given time (see OmitUnchanged filter).
+
+    The time can be given directly, or as a path to a state file. The state file keeps the start time of the last
+    full, successful run (the "watermark") and the fingerprints of the effective configs of all the groups
+    and projects then, so that the ones with changed configs are processed too. If the file doesn't exist yet,
+    then everything is processed and the file is created.
+    """
+
+    VERSION = 1
+
+    def __init__(self, since_or_path: Optional[str] = None, gitlab_url: str = ""):
+        """
+        :param since_or_path: time in ISO 8601 format, like "2024-01-31T12:00:00Z", or a path to the state file,
+                              None if the incremental mode is not enabled
+        :param gitlab_url: the URL of the GitLab instance that the state is about
+        """
+        self.enabled = bool(since_or_path)
+        self.gitlab_url = gitlab_url
+        # the watermark for the next run - anything that happens during this run has to be checked then
+        self.started_at = self.format_time(datetime.now(timezone.utc))
+        # None means that everything has to be processed
+        self.since: Optional[str] = None
+        self.path: Optional[str] = None
+        # lowercase group/project path -> fingerprint of its effective config
+        self.configs: Dict[str, str] = {}
+        self.new_configs: Dict[str, str] = {}
+
+        if not since_or_path:
+            return
+
+        since = self.parse_time(since_or_path)
+        if since:
+            self.since = since
+            return
+
+        self.path = os.path.expanduser(since_or_path)
+        if not os.path.exists(self.path):
+            verbose(
+                f"Incremental state file {self.path} doesn't exist yet, so everything will be processed."
+            )
+            return
+        try:
+            with open(self.path) as file:
+                stored = json.load(file)
+        except (OSError, ValueError) as e:
+            fatal(
+                f"Error when trying to read the incremental state file {self.path}: {e}",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+        if stored.get("version") != self.VERSION:
+            fatal(
+                f"The incremental state in {self.path} has been stored by an incompatible version of GitLabForm",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+        if stored.get("gitlab_url") != gitlab_url:
+            fatal(
+                f"The incremental state in {self.path} is for GitLab at {stored.get('gitlab_url')}, not {gitlab_url}",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+        self.since = stored["since"]
+        self.configs = stored["configs"]
+        debug(f"Last full run watermark: {self.since}")
+
+    def is_config_changed(self, entity: str, configuration: dict) -> bool:
+        """
+        :return: True if the effective config of the given group/project has changed since the last run,
+                 or if it is unknown (so never when the time was given directly, not as the state file)
+        """
+        config_fingerprint = Plan.fingerprint(configuration)
+        self.new_configs[entity.lower()] = config_fingerprint
+        return (
+            self.path is not None
+            and self.configs.get(entity.lower()) != config_fingerprint
+        )
+
+    def write(self) -> None:
+        """
+        Stores the state after a full, successful run, if the state file is used.
+        """
+        if not self.path:
+            return
+        to_store = {
+            "version": self.VERSION,
+            "gitlab_url": self.gitlab_url,
+            "since": self.started_at,
+            "configs": self.configs | self.new_configs,
+        }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "w") as file:
+                json.dump(to_store, file, sort_keys=True)
+        except OSError as e:
+            fatal(
+                f"Error when trying to write the incremental state file {self.path}: {e}",
+                exit_code=EXIT_PROCESSING_ERROR,
+            )
+        verbose(f"Stored the incremental state with watermark {self.started_at}")
+
+    @staticmethod
+    def parse_time(value: str) -> Optional[str]:
+        """
+        :return: the given time in ISO 8601 format in UTC, or None if it is not a time
+        """
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if not parsed.tzinfo:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return IncrementalState.format_time(parsed)
+
+    @staticmethod
+    def format_time(time: datetime) -> str:
+        return time.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
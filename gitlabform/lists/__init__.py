@@ -15,6 +15,8 @@ class OmissionReason(Enum):
     ARCHIVED = "archived"
     EMPTY = "empty effective config"
     SKIPPED = "skipped"
+    UNCHANGED = "unchanged since the last run"
+    CONFIG_UNCHANGED = "config unchanged"
 
 
 class Entities(ABC):
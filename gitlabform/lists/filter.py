@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Set, Tuple
 
-from cli_ui import fatal
+from cli_ui import fatal, warning
 
+from gitlabform.configuration.diff import ConfigurationDiff
 from gitlabform.constants import EXIT_INVALID_INPUT
+from gitlabform.gitlab.core import NotFoundException, UnexpectedResponseException
+from gitlabform.incremental import IncrementalState
 from gitlabform.lists import OmissionReason, Groups, Projects
 
 
@@ -13,16 +17,40 @@ from gitlabform.lists import OmissionReason, Groups, Projects
 
 
 class GroupsAndProjectsFilters:
-    def __init__(self, configuration, group_processors, project_processors):
+    def __init__(
+        self,
+        configuration,
+        group_processors,
+        project_processors,
+        gitlab=None,
+        incremental_state: Optional[IncrementalState] = None,
+        configuration_diff: Optional[ConfigurationDiff] = None,
+    ):
         self.configuration = configuration
 
         self.omit_empty_configs = OmitEmptyConfigs(
             configuration, group_processors, project_processors
         )
+        self.omit_unchanged = (
+            OmitUnchanged(gitlab, configuration, incremental_state)
+            if incremental_state and incremental_state.enabled
+            else None
+        )
+        self.omit_unchanged_configs = (
+            OmitUnchangedConfigs(
+                configuration_diff, group_processors, project_processors
+            )
+            if configuration_diff
+            else None
+        )
         # add next filters here
 
     def filter(self, groups: Groups, projects: Projects):
         self.omit_empty_configs.filter(groups, projects)
+        if self.omit_unchanged:
+            self.omit_unchanged.filter(groups, projects)
+        if self.omit_unchanged_configs:
+            self.omit_unchanged_configs.filter(groups, projects)
         # add next filters here
 
 
@@ -103,3 +131,151 @@ class OmitEmptyConfigs(GroupsAndProjectsFilter):
             if configuration_name in self.project_processors.get_configuration_names():
                 return False
         return True
+
+
+class OmitUnchangedConfigs(GroupsAndProjectsFilter):
+    """
+    With `--changed-since` we omit the groups and projects which effective configs have not changed
+    since the given previous version of the configuration (see ConfigurationDiff).
+    """
+
+    def __init__(
+        self,
+        configuration_diff: ConfigurationDiff,
+        group_processors,
+        project_processors,
+    ):
+        self.configuration_diff = configuration_diff
+        self.group_processors = group_processors
+        self.project_processors = project_processors
+
+    def filter(self, groups: Groups, projects: Projects) -> None:
+        """
+        :param groups: list of groups (and possibly subgroups)
+        :param projects: list of projects
+        """
+        group_sections = set(self.group_processors.get_configuration_names())
+        groups.add_omitted(
+            OmissionReason.CONFIG_UNCHANGED,
+            [
+                group
+                for group in groups.get_effective()
+                if not group_sections.intersection(
+                    self.configuration_diff.get_changed_sections_for_group(group)
+                )
+            ],
+        )
+        project_sections = set(self.project_processors.get_configuration_names())
+        projects.add_omitted(
+            OmissionReason.CONFIG_UNCHANGED,
+            [
+                project
+                for project in projects.get_effective()
+                if not project_sections.intersection(
+                    self.configuration_diff.get_changed_sections_for_project(project)
+                )
+            ],
+        )
+
+
+class OmitUnchanged(GroupsAndProjectsFilter):
+    """
+    In the incremental mode (`--incremental-since`) we omit the groups and projects that could not have changed
+    since the given time (or since the last full run, see IncrementalState), so there is nothing to do for them.
+
+    A project could have changed if GitLab reports any activity in it or changes of it after that time,
+    or if there are audit events about it. A group - if there are audit events about it. All the groups
+    and projects with changed effective configs are processed too.
+
+    Audit events require GitLab Premium. If we can't get them, then all the groups are processed.
+    The audit events of the whole instance are available only for admins, so for the other users
+    we get the ones of each group to process, and the projects' ones are not used.
+    """
+
+    def __init__(self, gitlab, configuration, incremental_state: IncrementalState):
+        self.gitlab = gitlab
+        self.configuration = configuration
+        self.incremental_state = incremental_state
+
+    def filter(self, groups: Groups, projects: Projects) -> None:
+        """
+        :param groups: list of groups (and possibly subgroups)
+        :param projects: list of projects
+        """
+
+        # the configs of all of them have to be checked, so that they are stored for the next run
+        groups_with_changed_configs = {
+            group.lower()
+            for group in groups.get_effective()
+            if self.incremental_state.is_config_changed(
+                group, self.configuration.get_effective_config_for_group(group)
+            )
+        }
+        projects_with_changed_configs = {
+            project.lower()
+            for project in projects.get_effective()
+            if self.incremental_state.is_config_changed(
+                project, self.configuration.get_effective_config_for_project(project)
+            )
+        }
+
+        since = self.incremental_state.since
+        if not since:
+            return
+
+        changed_projects = {
+            project.lower()
+            for project in self.gitlab.iterate_projects_changed_since(since)
+        }
+        changed_projects |= projects_with_changed_configs
+
+        audited_groups, audited_projects = self._get_audited(since, groups)
+        if audited_groups is not None:
+            changed_groups = audited_groups | groups_with_changed_configs
+            groups.add_omitted(
+                OmissionReason.UNCHANGED,
+                [
+                    group
+                    for group in groups.get_effective()
+                    if group.lower() not in changed_groups
+                ],
+            )
+        changed_projects |= audited_projects
+
+        projects.add_omitted(
+            OmissionReason.UNCHANGED,
+            [
+                project
+                for project in projects.get_effective()
+                if project.lower() not in changed_projects
+            ],
+        )
+
+    def _get_audited(
+        self, since: str, groups: Groups
+    ) -> Tuple[Optional[Set[str]], Set[str]]:
+        """
+        :return: lowercase paths of the groups (None if we can't get the audit events)
+                 and the projects with audit events since the given time
+        """
+        try:
+            if self.gitlab.admin:
+                events = list(self.gitlab.iterate_audit_events_since(since))
+            else:
+                events = [
+                    event
+                    for group in groups.get_effective()
+                    for event in self.gitlab.iterate_audit_events_since(since, group)
+                ]
+        except (NotFoundException, UnexpectedResponseException) as e:
+            warning(
+                f"Cannot get the audit events, so all the groups will be processed: {e}"
+            )
+            return None, set()
+
+        audited: dict = {"Group": set(), "Project": set()}
+        for event in events:
+            path = event.get("details", {}).get("entity_path")
+            if path and event.get("entity_type") in audited:
+                audited[event["entity_type"]].add(path.lower())
+        return audited["Group"], audited["Project"]
@@ -39,8 +39,14 @@ class GroupsProvider:
             groups.add_requested([path])
 
             if recurse_subgroups:
-                descendants = self.gitlab.get_group_descendants(path)
-                groups.add_requested([group["full_path"] for group in descendants])
+                groups.add_requested(
+                    [
+                        group["full_path"]
+                        for group in self.gitlab.iterate_group_descendants(
+                            path, fields=["full_path"]
+                        )
+                    ]
+                )
 
                 groups.add_omitted(
                     OmissionReason.SKIPPED,
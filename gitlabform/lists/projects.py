@@ -1,8 +1,10 @@
-from typing import Optional, Tuple
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
 from logging import debug
 from cli_ui import fatal
 
 from gitlabform.constants import EXIT_INVALID_INPUT
+from gitlabform.gitlab.async_core import AsyncGitLabCore
 from gitlabform.lists import OmissionReason, Groups, Projects
 from gitlabform.lists.groups import GroupsProvider
 
@@ -23,6 +25,13 @@ class ProjectsProvider(GroupsProvider):
     ):
         super().__init__(gitlab, configuration, recurse_subgroups)
         self.include_archived_projects = include_archived_projects
+        self.async_transport = self.configuration.get(
+            "gitlab|async_transport|enabled", False
+        )
+        self.async_max_connections = self.configuration.get(
+            "gitlab|async_transport|max_connections", 10
+        )
+        self.async_http2 = self.configuration.get("gitlab|async_transport|http2", False)
 
     def get_projects(self, target: str) -> Projects:
         """
@@ -71,15 +80,29 @@ class ProjectsProvider(GroupsProvider):
     def _get_projects(self, target: str, groups: Groups) -> Projects:
         projects = Projects()
 
-        # the source of projects are the *effective* requested groups
+        # the source of projects are the *effective* requested groups, except the ones with all the projects
+        # skipped - there is no need to get them from GitLab just to skip them
         (
             projects_from_groups,
             archived_projects_from_groups,
-        ) = self._get_all_and_archived_projects_from_groups(groups.get_effective())
+        ) = self._get_all_and_archived_projects_from_groups(
+            [
+                group
+                for group in groups.get_effective()
+                if not self.configuration.are_all_projects_in_group_skipped(group)
+            ]
+        )
         projects.add_requested(projects_from_groups)
         projects.add_omitted(OmissionReason.ARCHIVED, archived_projects_from_groups)
 
-        projects_from_configuration = self.configuration.get_projects()
+        # ...and similarly, the skipped projects from the configuration are not looked for in GitLab
+        projects_from_configuration = []
+        skipped_projects_from_configuration = []
+        for project in self.configuration.get_projects():
+            if self.configuration.is_project_skipped(project):
+                skipped_projects_from_configuration.append(project)
+            else:
+                projects_from_configuration.append(project)
 
         # TODO: this check should be case-insensitive
         projects_from_configuration_not_from_groups = [
@@ -100,6 +123,7 @@ class ProjectsProvider(GroupsProvider):
             )
 
             projects.add_requested(projects_from_configuration_not_from_groups)
+            projects.add_requested(skipped_projects_from_configuration)
             projects.add_omitted(
                 OmissionReason.ARCHIVED,
                 archived_projects_from_configuration_not_from_groups,
@@ -125,7 +149,6 @@ class ProjectsProvider(GroupsProvider):
                     ) != 0:
                         projects.add_requested([project])
 
-        # TODO: consider checking for skipped earlier to avoid making requests for projects that will be skipped anyway
         projects.add_omitted(
             OmissionReason.SKIPPED, self._get_skipped_projects(projects.get_effective())
         )
@@ -136,9 +159,22 @@ class ProjectsProvider(GroupsProvider):
         self, projects: list
     ) -> list:
         archived = []
+
+        if self.async_transport:
+            # get the projects that are in the config with the exact case all at once,
+            # the rest will be looked for one by one below
+            prefetched_project_objects = asyncio.run(
+                self._get_project_objects_concurrently(projects)
+            )
+        else:
+            prefetched_project_objects = {}
+
         for project in projects:
             try:
-                project_object = self.gitlab.get_project_case_insensitive(project)
+                if project in prefetched_project_objects:
+                    project_object = prefetched_project_objects[project]
+                else:
+                    project_object = self.gitlab.get_project_case_insensitive(project)
                 if project_object["archived"]:
                     archived.append(project_object["path_with_namespace"])
             except NotFoundException:
@@ -169,24 +205,70 @@ class ProjectsProvider(GroupsProvider):
     def _get_all_and_archived_projects_from_groups(
         self, groups: list
     ) -> Tuple[list, list]:
-        all = []
-        archived = []
-        for group in groups:
-            if self.include_archived_projects:
-                all += self.gitlab.get_projects(group, include_archived=True)
-            else:
-                project_objects = self.gitlab.get_projects(
-                    group, include_archived=True, only_names=False
+        # sets, as we may have a group X and its subgroup X/Y in the groups list so the effective projects
+        # may occur more than once
+        all = set()
+        archived = set()
+
+        # get only the fields we need as there may be really a lot of projects
+        fields = ["path_with_namespace", "archived"]
+        project_objects_from_groups: Iterable[Iterable[dict]]
+        if self.async_transport:
+            project_objects_from_groups = asyncio.run(
+                self._get_projects_from_groups_concurrently(groups, fields)
+            )
+        else:
+            # ...and page by page
+            project_objects_from_groups = (
+                self.gitlab.iterate_projects(
+                    group, include_archived=True, fields=fields
                 )
-                for project_object in project_objects:
-                    project = project_object["path_with_namespace"]
-                    all.append(project)
-                    if project_object["archived"]:
-                        archived.append(project)
+                for group in groups
+            )
 
-        # deduplicate as we may have a group X and its subgroup X/Y in the groups list so the effective projects
-        # may occur more than once
-        return list(set(all)), list(set(archived))
+        for project_objects in project_objects_from_groups:
+            for project_object in project_objects:
+                project = project_object["path_with_namespace"]
+                all.add(project)
+                if not self.include_archived_projects and project_object["archived"]:
+                    archived.add(project)
+
+        return list(all), list(archived)
+
+    async def _get_projects_from_groups_concurrently(
+        self, groups: list, fields: list
+    ) -> List[List[dict]]:
+        async with AsyncGitLabCore(
+            self.gitlab, self.async_max_connections, self.async_http2
+        ) as async_gitlab:
+            return await asyncio.gather(
+                *(
+                    async_gitlab.get_projects(
+                        group, include_archived=True, fields=fields
+                    )
+                    for group in groups
+                )
+            )
+
+    async def _get_project_objects_concurrently(
+        self, projects: list
+    ) -> Dict[str, dict]:
+        async with AsyncGitLabCore(
+            self.gitlab, self.async_max_connections, self.async_http2
+        ) as async_gitlab:
+            project_objects = await asyncio.gather(
+                *(async_gitlab.get_project(project) for project in projects),
+                return_exceptions=True,
+            )
+
+        prefetched = {}
+        for project, project_object in zip(projects, project_objects):
+            if isinstance(project_object, NotFoundException):
+                continue
+            elif isinstance(project_object, BaseException):
+                raise project_object
+            prefetched[project] = project_object
+        return prefetched
 
     def _get_skipped_projects(self, projects: list) -> list:
         skipped = []
@@ -1,24 +1,61 @@
-from logging import debug
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, TextIO, Tuple
 
+import cli_ui
 import ez_yaml
-from cli_ui import debug as verbose
-from cli_ui import fatal
+from cli_ui import Token, fatal
 
 from gitlabform.constants import EXIT_INVALID_INPUT, EXIT_PROCESSING_ERROR
 
 
+# The cli_ui functions that print to stdout do it by default to the sys.stdout from the time when cli_ui has been
+# imported, so they are wrapped here to print to the current sys.stdout instead - which is redirected when the output
+# is buffered (see EntityOutputBuffer). The ones that print to stderr, like warning() and fatal(), already use the
+# current sys.stderr.
+
+
+def message(*tokens: Token, **kwargs: Any) -> None:
+    kwargs.setdefault("fileobj", sys.stdout)
+    cli_ui.message(*tokens, **kwargs)
+
+
+def debug(*tokens: Token, **kwargs: Any) -> None:
+    kwargs.setdefault("fileobj", sys.stdout)
+    cli_ui.debug(*tokens, **kwargs)
+
+
+def info(*tokens: Token, **kwargs: Any) -> None:
+    kwargs.setdefault("fileobj", sys.stdout)
+    cli_ui.info(*tokens, **kwargs)
+
+
+def info_1(*tokens: Token, **kwargs: Any) -> None:
+    kwargs.setdefault("fileobj", sys.stdout)
+    cli_ui.info_1(*tokens, **kwargs)
+
+
+def info_table(data: Any, **kwargs: Any) -> None:
+    kwargs.setdefault("fileobj", sys.stdout)
+    cli_ui.info_table(data, **kwargs)
+
+
 class EffectiveConfigurationFile:
     """
     For GitLabForm upgrades and configuration refactoring we want to be able to compare the effective configurations
     before and after the code/app change. This class provides a feature to write the effective configuration into a YAML
     file.
+
+    It is safe to use from multiple threads, as groups and projects may be processed in parallel.
     """
 
     def __init__(self, output_file):
         if output_file:
             try:
                 self.output_file = open(output_file, "w")
-                debug(
+                logging.debug(
                     f"Opened file {self.output_file} to write the effective configs to."
                 )
             except Exception as e:
@@ -30,26 +67,126 @@ class EffectiveConfigurationFile:
             self.output_file = None
 
         self.config = {}
+        self._lock = threading.Lock()
 
     def add_placeholder(self, project_or_group: str):
         if self.output_file:
-            self.config[project_or_group] = {}
+            with self._lock:
+                self.config[project_or_group] = {}
 
     def add_configuration(
         self, project_or_group: str, configuration_name: str, configuration: dict
     ):
         if self.output_file:
-            verbose(f"Adding effective configuration for {configuration_name}.")
-            self.config[project_or_group][configuration_name] = configuration
+            debug(f"Adding effective configuration for {configuration_name}.")
+            with self._lock:
+                self.config[project_or_group][configuration_name] = configuration
 
     def write_to_file(self):
         if self.output_file:
-            try:
-                yaml_configuration = ez_yaml.to_string(self.config)
-                self.output_file.write(yaml_configuration)
-                self.output_file.close()
-            except Exception as e:
-                fatal(
-                    f"Error when trying to write or close {self.output_file}: {e}",
-                    exit_code=EXIT_PROCESSING_ERROR,
-                )
+            with self._lock:
+                try:
+                    yaml_configuration = ez_yaml.to_string(self.config)
+                    self.output_file.write(yaml_configuration)
+                    self.output_file.close()
+                except Exception as e:
+                    fatal(
+                        f"Error when trying to write or close {self.output_file}: {e}",
+                        exit_code=EXIT_PROCESSING_ERROR,
+                    )
+
+
+class EntityOutputBuffer:
+    """
+    When groups or projects are processed in parallel, the output of each of them would be interleaved
+    with the others and therefore unreadable. This class makes it possible to collect all the output
+    (cli_ui messages and logging) produced by a thread while it is processing a single entity and print
+    it all at once when the entity is done.
+
+    Threads that have not started buffering write through to the real stdout/stderr as usual.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._original_stdout: Optional[TextIO] = None
+        self._original_stderr: Optional[TextIO] = None
+        self._redirected_handlers: List[logging.StreamHandler] = []
+
+    @contextmanager
+    def installed(self) -> Iterator[None]:
+        """
+        Redirects stdout, stderr (and so the cli_ui messages, see above) and logging through this buffer
+        for the duration of the context.
+        """
+        self._original_stdout = sys.stdout
+        self._original_stderr = sys.stderr
+        stdout = _BufferedStream(sys.stdout, self)
+        stderr = _BufferedStream(sys.stderr, self)
+
+        sys.stdout = stdout  # type: ignore
+        sys.stderr = stderr  # type: ignore
+
+        # logging.basicConfig() binds sys.stderr in its handler
+        for handler in logging.getLogger().handlers:
+            if (
+                isinstance(handler, logging.StreamHandler)
+                and handler.stream is self._original_stderr
+            ):
+                handler.setStream(stderr)  # type: ignore
+                self._redirected_handlers.append(handler)
+
+        try:
+            yield
+        finally:
+            for handler in self._redirected_handlers:
+                handler.setStream(self._original_stderr)
+            self._redirected_handlers = []
+            sys.stdout = self._original_stdout
+            sys.stderr = self._original_stderr
+
+    @contextmanager
+    def buffered(self) -> Iterator[None]:
+        """
+        Collects all the output of the current thread for the duration of the context
+        and then prints it atomically.
+        """
+        self._local.chunks = []
+        try:
+            yield
+        finally:
+            chunks = self._local.chunks
+            self._local.chunks = None
+            with self._lock:
+                for stream, text in chunks:
+                    stream.write(text)
+                for stream in {stream for stream, _ in chunks}:
+                    stream.flush()
+
+    def _write(self, stream: TextIO, text: str) -> int:
+        chunks: Optional[List[Tuple[TextIO, str]]] = getattr(
+            self._local, "chunks", None
+        )
+        if chunks is not None:
+            chunks.append((stream, text))
+        else:
+            with self._lock:
+                stream.write(text)
+        return len(text)
+
+
+class _BufferedStream:
+    def __init__(self, stream: TextIO, output_buffer: EntityOutputBuffer):
+        self._stream = stream
+        self._output_buffer = output_buffer
+
+    def write(self, text: str) -> int:
+        return self._output_buffer._write(self._stream, text)
+
+    def flush(self) -> None:
+        if getattr(self._output_buffer._local, "chunks", None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        # isatty(), encoding, fileno() etc. should behave like in the wrapped stream
+        return getattr(self._stream, name)
@@ -0,0 +1,90 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Set, Tuple
+
+
+class DependentTasksExecutor:
+    """
+    Runs tasks in a bounded thread pool, starting each task only after all the tasks it depends on
+    are done (successfully or not). Tasks without any dependencies between them run in parallel.
+
+    We use it to process groups and projects in parallel while still processing each group
+    before its subgroups and projects.
+    """
+
+    def __init__(self, max_workers: int):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gitlabform"
+        )
+
+    def __enter__(self) -> "DependentTasksExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # if we are exiting early (f.e. because of --terminate), don't start the tasks
+        # that are still waiting, but let the ones in progress finish
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def run(
+        self,
+        tasks: Mapping[str, Callable[[], Any]],
+        dependencies: Dict[str, Set[str]],
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        :param tasks: dict with tasks to run, under their keys, in the order in which they should be started
+                      if there is more of them ready than available workers
+        :param dependencies: dict of sets of keys of tasks that must be done before the task under the given key.
+                             Keys of tasks that are not in `tasks` are ignored.
+        :return: iterator over tuples of task keys and their results, in the order of completion
+        """
+
+        waiting_for: Dict[str, Set[str]] = {}
+        dependents: Dict[str, List[str]] = {key: [] for key in tasks}
+        for key in tasks:
+            waiting_for[key] = {
+                dependency
+                for dependency in dependencies.get(key, set())
+                if dependency in tasks and dependency != key
+            }
+            for dependency in waiting_for[key]:
+                dependents[dependency].append(key)
+
+        running: Dict[Future, str] = {}
+
+        def start_if_ready(key: str) -> None:
+            if not waiting_for[key]:
+                running[self.executor.submit(tasks[key])] = key
+
+        for key in tasks:
+            start_if_ready(key)
+
+        while running:
+            done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                for dependent in dependents[key]:
+                    waiting_for[dependent].discard(key)
+                    start_if_ready(dependent)
+                yield key, future.result()
+
+
+def get_namespace_dependencies(
+    groups: List[str], projects: List[str]
+) -> Dict[str, Set[str]]:
+    """
+    :param groups: list of groups and subgroups, like "group/subgroup"
+    :param projects: list of projects, like "group/subgroup/project"
+    :return: dict with a set of the nearest ancestor group from `groups` (if there is any) for each group and project.
+             Group and project paths in GitLab are case-insensitive, so we compare them ignoring the case.
+    """
+
+    groups_by_lowercase_path = {group.lower(): group for group in groups}
+
+    def nearest_ancestor(path: str) -> Set[str]:
+        elements = path.lower().split("/")
+        for length in range(len(elements) - 1, 0, -1):
+            ancestor = "/".join(elements[:length])
+            if ancestor in groups_by_lowercase_path:
+                return {groups_by_lowercase_path[ancestor]}
+        return set()
+
+    return {entity: nearest_ancestor(entity) for entity in groups + projects}
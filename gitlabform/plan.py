@@ -0,0 +1,107 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from cli_ui import fatal
+
+from gitlabform.constants import EXIT_INVALID_INPUT, EXIT_PROCESSING_ERROR
+
+
+class Plan:
+    """
+    The changes that processing the groups and projects would make, computed with the `--plan` option
+    without making them, to be applied later with `--apply`.
+
+    For each group/project (or "" for the application) and each of its sections it contains:
+    * "config" - fingerprint of the section configuration,
+    * "state" - fingerprint of the state of the section in GitLab that the changes are based on,
+      or None if the section processor can't get it,
+    * "changes" - list of the changes to make, like {"action": "update", "entity": {"key": "FOO"}},
+      or None if the section processor can't compute them - then the section is always processed when applying.
+
+    Applying the plan processes only the sections with changes planned, and fails for a group/project
+    if the configuration or the state of any of its sections is different than when the plan was made.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        target: str,
+        gitlab_url: str,
+        entities: Optional[Dict[str, Dict[str, dict]]] = None,
+    ):
+        self.target = target
+        self.gitlab_url = gitlab_url
+        self.entities: Dict[str, Dict[str, dict]] = entities or {}
+        self._lock = threading.Lock()
+
+    def add_entity(self, entity: str, sections: Dict[str, dict]) -> None:
+        """
+        :param entity: group or project path, or "" for the application
+        :param sections: section name -> dict with its "config", "state" and "changes"
+        """
+        with self._lock:
+            self.entities[entity] = sections
+
+    def get_sections(self, entity: str) -> Optional[Dict[str, dict]]:
+        """
+        :return: the plan for the sections of the given group/project, or None if it is not in the plan
+        """
+        return self.entities.get(entity)
+
+    def get_changes_count(self) -> int:
+        return sum(
+            len(section["changes"] or [])
+            for sections in self.entities.values()
+            for section in sections.values()
+        )
+
+    def write(self, path: str) -> None:
+        with self._lock:
+            plan = {
+                "version": self.VERSION,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "target": self.target,
+                "gitlab_url": self.gitlab_url,
+                "entities": self.entities,
+            }
+        try:
+            with open(path, "w") as file:
+                json.dump(plan, file, indent=1, sort_keys=True)
+        except OSError as e:
+            fatal(
+                f"Error when trying to write the plan to {path}: {e}",
+                exit_code=EXIT_PROCESSING_ERROR,
+            )
+
+    @classmethod
+    def read(cls, path: str) -> "Plan":
+        try:
+            with open(path) as file:
+                plan = json.load(file)
+        except (OSError, ValueError) as e:
+            fatal(
+                f"Error when trying to read the plan from {path}: {e}",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+        if plan.get("version") != cls.VERSION:
+            fatal(
+                f"The plan in {path} has been made by an incompatible version of GitLabForm",
+                exit_code=EXIT_INVALID_INPUT,
+            )
+        return cls(plan["target"], plan["gitlab_url"], plan["entities"])
+
+    @staticmethod
+    def fingerprint(data: Any) -> str:
+        """
+        :return: a hash of the given configuration or state, the same for the equal ones
+        """
+        serialized = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class PlanConflictException(Exception):
+    pass
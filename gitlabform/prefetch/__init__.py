@@ -0,0 +1,271 @@
+from abc import ABC
+from logging import debug
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from gitlabform.output import debug as verbose
+
+from gitlabform.gitlab import GitLab
+from gitlabform.gitlab.core import UnexpectedResponseException
+
+
+class PrefetchedConnection:
+    """
+    A GraphQL connection (a paginated list) of a group or project, that contains the state of a single section.
+    """
+
+    def __init__(
+        self,
+        section: str,
+        field: str,
+        nodes: str,
+        convert: Callable[[dict], Optional[dict]],
+        arguments: str = "",
+        ancestors_section: Optional[str] = None,
+    ):
+        """
+        :param section: name of the section that this is the state of, f.e. "group_members"
+        :param field: the group/project field with the connection, f.e. "groupMembers"
+        :param nodes: fields of the nodes to get, f.e. "user { username } accessLevel { integerValue }"
+        :param convert: function converting a node into the format of the REST API responses,
+                        or returning None to leave the node out
+        :param arguments: arguments of the field other than the pagination ones, f.e. "relations: [DIRECT]"
+        :param ancestors_section: name of the section of the ancestor groups which state is included in this
+                                  connection, f.e. "group_labels" for the labels with the ones of the ancestor groups
+        """
+        self.section = section
+        self.field = field
+        self.nodes = nodes
+        self.convert = convert
+        self.arguments = arguments
+        self.ancestors_section = ancestors_section
+
+
+class AbstractStatePrefetcher(ABC):
+    """
+    Gets the state of many groups or projects in bulk - with paginated GraphQL queries, each about a batch
+    of them - and puts it into the run-scoped PrefetchedState store, for the processors to use instead
+    of making the REST API requests to get it for each group or project separately.
+
+    This is only an optimization - what cannot be prefetched (because it is not available in GraphQL
+    in this GitLab version, we are not allowed to see it etc.) is not stored, so the processors
+    get it with the REST API, as usual.
+    """
+
+    # max page size allowed by GitLab GraphQL API
+    MAX_PAGE_SIZE = 100
+
+    def __init__(
+        self,
+        gitlab: GitLab,
+        entity_field: str,
+        connections: List[PrefetchedConnection],
+    ):
+        """
+        :param gitlab: GitLab object
+        :param entity_field: the query field to get a single group/project by its full path, f.e. "group"
+        :param connections: connections with the states of the sections that can be prefetched
+        """
+        self.gitlab = gitlab
+        self.entity_field = entity_field
+        self.connections: Dict[str, PrefetchedConnection] = {
+            connection.section: connection for connection in connections
+        }
+        self.batch_size = gitlab.configuration.get("gitlab|prefetch|batch_size", 10)
+        self.page_size = min(gitlab.per_page, self.MAX_PAGE_SIZE)
+        self.queries = 0
+        # sections which queries GitLab has rejected
+        self.unsupported_sections: Set[str] = set()
+
+    def prefetch(
+        self,
+        entities_sections: Dict[str, Set[str]],
+        groups_sections: Optional[Dict[str, Set[str]]] = None,
+    ) -> None:
+        """
+        :param entities_sections: full paths of groups/projects -> names of the sections to prefetch for them,
+                                  the sections that cannot be prefetched are ignored
+        :param groups_sections: full paths of the groups processed in this run -> names of their sections
+                                to process. The sections which state includes the state of the ancestor groups
+                                are not prefetched if these groups' sections are processed, as the prefetched
+                                state would be outdated by then (they are processed before their descendants).
+        """
+        groups_sections = {
+            group.lower(): sections
+            for group, sections in (groups_sections or {}).items()
+        }
+        entities = []
+        for entity, sections in entities_sections.items():
+            sections = {
+                section
+                for section in sections & set(self.connections)
+                if not self._is_ancestors_section_processed(
+                    entity, self.connections[section], groups_sections
+                )
+            }
+            if sections:
+                entities.append((entity, sections))
+        for start in range(0, len(entities), self.batch_size):
+            self._prefetch_batch(entities[start : start + self.batch_size])
+
+    @staticmethod
+    def _is_ancestors_section_processed(
+        entity: str,
+        connection: PrefetchedConnection,
+        groups_sections: Dict[str, Set[str]],
+    ) -> bool:
+        """
+        :param groups_sections: lowercase full paths of the groups processed in this run -> names of their sections
+        :return: if the section of the ancestor groups which state is included in the given connection
+                 is processed in this run for any of the ancestor groups of the given group/project
+        """
+        if not connection.ancestors_section:
+            return False
+        path = entity.lower().split("/")
+        for length in range(1, len(path)):
+            if connection.ancestors_section in groups_sections.get(
+                "/".join(path[:length]), set()
+            ):
+                debug(
+                    f"Not prefetching '{connection.section}' of {entity} - its ancestor groups'"
+                    f" '{connection.ancestors_section}' will be processed before it"
+                )
+                return True
+        return False
+
+    def _prefetch_batch(self, batch: List[Tuple[str, Set[str]]]) -> None:
+        sections = set().union(*(sections for _, sections in batch))
+        sections -= self.unsupported_sections
+        if not sections:
+            return
+
+        try:
+            self._query_batch(batch, sections)
+        except UnexpectedResponseException as e:
+            if len(sections) == 1:
+                section = sections.pop()
+                verbose(
+                    f"Cannot prefetch '{section}' with GraphQL, it will be get with REST API instead: {e}"
+                )
+                self.unsupported_sections.add(section)
+            else:
+                # find out which sections GitLab rejects, f.e. because of the fields that are not available
+                # in its version or edition, so that the other ones are still prefetched
+                for section in sorted(sections):
+                    self._prefetch_batch(
+                        [
+                            (entity, {section})
+                            for entity, entity_sections in batch
+                            if section in entity_sections
+                        ]
+                    )
+
+    def _query_batch(self, batch: List[Tuple[str, Set[str]]], sections: Set[str]):
+        variables = {}
+        entities_queries = []
+        for index, (entity, entity_sections) in enumerate(batch):
+            variables[f"path{index}"] = entity
+            connections_queries = " ".join(
+                self._get_connection_query(self.connections[section])
+                for section in sorted(entity_sections & sections)
+            )
+            entities_queries.append(
+                f"entity{index}: {self.entity_field}(fullPath: $path{index}) {{ {connections_queries} }}"
+            )
+        query = (
+            f"query({', '.join(f'${variable}: ID!' for variable in variables)}) "
+            f"{{ {' '.join(entities_queries)} }}"
+        )
+        data = self._query(query, variables)
+
+        for index, (entity, entity_sections) in enumerate(batch):
+            entity_data = data.get(f"entity{index}")
+            if not entity_data:
+                # the group/project does not exist or we are not allowed to see it
+                debug(f"Cannot prefetch the state of {entity}")
+                continue
+            for section in sorted(entity_sections & sections):
+                self._store(entity, self.connections[section], entity_data[section])
+
+    def _store(
+        self, entity: str, connection: PrefetchedConnection, data: Optional[dict]
+    ) -> None:
+        if data is None:
+            # we are not allowed to see this, f.e. the variables of a group in which we are not a maintainer
+            debug(f"Cannot prefetch '{connection.section}' of {entity}")
+            return
+
+        nodes = list(data["nodes"])
+        while data["pageInfo"]["hasNextPage"]:
+            query = (
+                f"query($path: ID!, $after: String) "
+                f"{{ entity: {self.entity_field}(fullPath: $path) {{ {self._get_connection_query(connection, paginated=True)} }} }}"
+            )
+            entity_data = self._query(
+                query, {"path": entity, "after": data["pageInfo"]["endCursor"]}
+            )["entity"]
+            data = entity_data[connection.section] if entity_data else None
+            if data is None:
+                debug(f"Cannot prefetch '{connection.section}' of {entity}")
+                return
+            nodes += data["nodes"]
+
+        state = [
+            converted
+            for node in nodes
+            if (converted := connection.convert(node)) is not None
+        ]
+        self.gitlab.cache.prefetched.put(connection.section, entity, state)
+
+    def _get_connection_query(
+        self, connection: PrefetchedConnection, paginated: bool = False
+    ) -> str:
+        arguments = [f"first: {self.page_size}"]
+        if paginated:
+            arguments.append("after: $after")
+        if connection.arguments:
+            arguments.append(connection.arguments)
+        return (
+            f"{connection.section}: {connection.field}({', '.join(arguments)}) "
+            f"{{ pageInfo {{ hasNextPage endCursor }} nodes {{ {connection.nodes} }} }}"
+        )
+
+    def _query(self, query: str, variables: dict) -> dict:
+        self.queries += 1
+        return self.gitlab.query_graphql(query, variables)
+
+    # the nodes fields and conversions of the connections that are the same for groups and projects
+
+    LABEL_NODES = "id title color description textColor"
+    VARIABLE_NODES = "key value variableType protected masked raw hidden environmentScope description"
+
+    @classmethod
+    def _to_label(cls, node: dict) -> dict:
+        return {
+            "id": cls.get_id(node["id"]),
+            "name": node["title"],
+            "color": node["color"],
+            "description": node["description"],
+            "text_color": node["textColor"],
+        }
+
+    @staticmethod
+    def _to_variable(node: dict) -> dict:
+        return {
+            "key": node["key"],
+            "value": node["value"],
+            "variable_type": node["variableType"].lower(),
+            "protected": node["protected"],
+            "masked": node["masked"],
+            "raw": node["raw"],
+            "hidden": node["hidden"],
+            "environment_scope": node["environmentScope"],
+            "description": node["description"],
+        }
+
+    @staticmethod
+    def get_id(global_id: str) -> int:
+        """
+        :param global_id: GraphQL global id, like "gid://gitlab/User/123"
+        :return: REST API id, like 123
+        """
+        return int(global_id.rsplit("/", 1)[-1])
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from gitlabform.gitlab import GitLab
+from gitlabform.prefetch import AbstractStatePrefetcher, PrefetchedConnection
+
+
+class GroupsStatePrefetcher(AbstractStatePrefetcher):
+    """
+    Prefetches the direct members, the labels and the CI/CD variables of the groups.
+
+    The group settings are not prefetched, as they have to be get with the REST API anyway to update them
+    (and they are get only once per group, as the group object is cached and shared between the processors).
+    The group badges are not available in GraphQL.
+    """
+
+    def __init__(self, gitlab: GitLab):
+        super().__init__(
+            gitlab,
+            "group",
+            [
+                PrefetchedConnection(
+                    "group_members",
+                    "groupMembers",
+                    "user { id username } accessLevel { integerValue } expiresAt memberRole { id }",
+                    self._to_member,
+                    # like the REST API, without the inherited members
+                    arguments="relations: [DIRECT]",
+                ),
+                PrefetchedConnection(
+                    "group_labels",
+                    "labels",
+                    self.LABEL_NODES,
+                    self._to_label,
+                    # like the REST API, with the labels of the parent groups
+                    arguments="includeAncestorGroups: true",
+                    ancestors_section="group_labels",
+                ),
+                PrefetchedConnection(
+                    "group_variables",
+                    "ciVariables",
+                    self.VARIABLE_NODES,
+                    self._to_variable,
+                ),
+            ],
+        )
+
+    @classmethod
+    def _to_member(cls, node: dict) -> Optional[dict]:
+        if not node["user"]:
+            # an invitation sent to an email address, not listed by the REST API
+            return None
+        member = {
+            "id": cls.get_id(node["user"]["id"]),
+            "username": node["user"]["username"],
+            "access_level": node["accessLevel"]["integerValue"],
+            # GraphQL returns a time, REST API - just a date
+            "expires_at": node["expiresAt"][:10] if node["expiresAt"] else None,
+        }
+        if node["memberRole"]:
+            member["member_role"] = {"id": cls.get_id(node["memberRole"]["id"])}
+        return member
@@ -0,0 +1,103 @@
+from typing import Optional
+
+from gitlabform.gitlab import GitLab
+from gitlabform.prefetch import AbstractStatePrefetcher, PrefetchedConnection
+
+
+class ProjectsStatePrefetcher(AbstractStatePrefetcher):
+    """
+    Prefetches the protected branches, the labels, the CI/CD variables and the pipeline schedules of the projects.
+
+    The hooks and the merge requests approval rules are not available in GraphQL. The job token scope is,
+    but the processor needs the REST API objects to change it, so it is not prefetched either.
+    """
+
+    ACCESS_LEVEL_NODES = "accessLevel accessLevelDescription user { id } group { id }"
+
+    def __init__(self, gitlab: GitLab):
+        super().__init__(
+            gitlab,
+            "project",
+            [
+                PrefetchedConnection(
+                    "branches",
+                    "branchRules",
+                    "name branchProtection { allowForcePush codeOwnerApprovalRequired"
+                    f" pushAccessLevels {{ nodes {{ {self.ACCESS_LEVEL_NODES} deployKey {{ id }} }} }}"
+                    f" mergeAccessLevels {{ nodes {{ {self.ACCESS_LEVEL_NODES} }} }}"
+                    f" unprotectAccessLevels {{ nodes {{ {self.ACCESS_LEVEL_NODES} }} }} }}",
+                    self._to_protected_branch,
+                ),
+                PrefetchedConnection(
+                    "labels",
+                    "labels",
+                    self.LABEL_NODES,
+                    self._to_label,
+                    # like the REST API, with the labels of the parent groups
+                    arguments="includeAncestorGroups: true",
+                    ancestors_section="group_labels",
+                ),
+                PrefetchedConnection(
+                    "variables",
+                    "ciVariables",
+                    self.VARIABLE_NODES,
+                    self._to_variable,
+                ),
+                PrefetchedConnection(
+                    "schedules",
+                    "pipelineSchedules",
+                    "id description ref cron cronTimezone active",
+                    self._to_schedule,
+                ),
+            ],
+        )
+
+    @classmethod
+    def _to_protected_branch(cls, node: dict) -> Optional[dict]:
+        protection = node["branchProtection"]
+        if not protection:
+            # the rules for all the branches, that are not protected branches
+            return None
+
+        return {
+            "name": node["name"],
+            "allow_force_push": protection["allowForcePush"],
+            "code_owner_approval_required": protection["codeOwnerApprovalRequired"],
+            "push_access_levels": [
+                cls._to_access_level(access_level)
+                | {"deploy_key_id": cls._get_optional_id(access_level["deployKey"])}
+                for access_level in protection["pushAccessLevels"]["nodes"]
+            ],
+            "merge_access_levels": [
+                cls._to_access_level(access_level)
+                for access_level in protection["mergeAccessLevels"]["nodes"]
+            ],
+            "unprotect_access_levels": [
+                cls._to_access_level(access_level)
+                for access_level in protection["unprotectAccessLevels"]["nodes"]
+            ],
+        }
+
+    @classmethod
+    def _to_access_level(cls, node: dict) -> dict:
+        return {
+            "access_level": node["accessLevel"],
+            "access_level_description": node["accessLevelDescription"],
+            "user_id": cls._get_optional_id(node["user"]),
+            "group_id": cls._get_optional_id(node["group"]),
+        }
+
+    @classmethod
+    def _get_optional_id(cls, node: Optional[dict]) -> Optional[int]:
+        return cls.get_id(node["id"]) if node else None
+
+    @classmethod
+    def _to_schedule(cls, node: dict) -> dict:
+        return {
+            "id": cls.get_id(node["id"]),
+            "description": node["description"],
+            "ref": node["ref"],
+            "cron": node["cron"],
+            "cron_timezone": node["cronTimezone"],
+            "active": node["active"],
+        }
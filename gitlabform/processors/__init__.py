@@ -1,18 +1,21 @@
 from abc import ABC
+from contextlib import nullcontext
 
 import requests
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 
-from typing import List
+from typing import Dict, List, Optional
 
 from gitlabform.configuration import Configuration
 from gitlabform.gitlab import GitLab
 from gitlabform.output import EffectiveConfigurationFile
+from gitlabform.plan import Plan
 from gitlabform.processors.abstract_processor import AbstractProcessor
 
 
 class AbstractProcessors(ABC):
     def __init__(self, gitlab: GitLab, config: Configuration, strict: bool):
+        self.gitlab = gitlab
         self.processors: List[AbstractProcessor] = []
 
     def get_configuration_names(self):
@@ -26,17 +29,124 @@ class AbstractProcessors(ABC):
         diff_only_changed: bool,
         effective_configuration: EffectiveConfigurationFile,
         only_sections: List[str],
+        planned_sections: Optional[Dict[str, dict]] = None,
     ):
-        for processor in self.processors:
-            if only_sections == "all" or processor.configuration_name in only_sections:
-                processor.process(
-                    entity_reference,
-                    configuration,
-                    dry_run,
-                    diff_only_changed,
-                    effective_configuration,
-                )
-            else:
-                verbose(
-                    f"Skipping section '{processor.configuration_name}' - not in --only-sections list."
-                )
+        """
+        :param planned_sections: the plan made before for the sections of this entity, if applying a plan -
+                                 then only the sections with planned changes are processed, and only
+                                 if nothing has changed since the plan was made (see Plan)
+        """
+        profiler = self.gitlab.profiler
+        tracer = self.gitlab.tracer
+        fingerprints = self.gitlab.fingerprints
+        with profiler.entity(entity_reference), tracer.span(
+            entity_reference or "application", {"gitlabform.entity": entity_reference}
+        ):
+            # section -> (its processor, fingerprint of its configuration), for the sections processed
+            processed_sections_config_fingerprints = {}
+
+            if planned_sections is not None:
+                # check the plan of all the sections before processing any of them, so that nothing is changed
+                # if any of them conflicts with the plan
+                sections_to_apply = {
+                    processor.configuration_name
+                    for processor in self.processors
+                    if (
+                        only_sections == "all"
+                        or processor.configuration_name in only_sections
+                    )
+                    and processor.check_plan(
+                        entity_reference,
+                        configuration,
+                        planned_sections.get(processor.configuration_name),
+                    )
+                }
+
+            for processor in self.processors:
+                if (
+                    only_sections == "all"
+                    or processor.configuration_name in only_sections
+                ):
+                    section = processor.configuration_name
+                    if (
+                        planned_sections is not None
+                        and section not in sections_to_apply
+                    ):
+                        continue
+                    # ...as otherwise it's skipped
+                    in_configuration = section in configuration
+                    if in_configuration and fingerprints.enabled:
+                        config_fingerprint = Plan.fingerprint(configuration[section])
+                        if (
+                            planned_sections is None
+                            and fingerprints.can_skip(entity_reference)
+                            and fingerprints.is_unchanged(
+                                entity_reference,
+                                section,
+                                config_fingerprint,
+                                processor.get_remote_fingerprint(entity_reference),
+                            )
+                        ):
+                            verbose(
+                                f"Skipping section '{section}' - nothing has changed since the last run."
+                            )
+                            continue
+                        processed_sections_config_fingerprints[section] = (
+                            processor,
+                            config_fingerprint,
+                        )
+                    with profiler.section(section, timed=in_configuration), (
+                        tracer.span(section, {"gitlabform.section": section})
+                        if in_configuration
+                        else nullcontext()
+                    ):
+                        processor.process(
+                            entity_reference,
+                            configuration,
+                            dry_run,
+                            diff_only_changed,
+                            effective_configuration,
+                        )
+                        if processor.has_reported_failures():
+                            # ...so that it's processed again in the next run
+                            processed_sections_config_fingerprints.pop(section, None)
+                else:
+                    verbose(
+                        f"Skipping section '{processor.configuration_name}' - not in --only-sections list."
+                    )
+
+            if not dry_run:
+                for section, (
+                    processor,
+                    config_fingerprint,
+                ) in processed_sections_config_fingerprints.items():
+                    # get after processing, as it has likely been changed by it
+                    fingerprints.put(
+                        entity_reference,
+                        section,
+                        config_fingerprint,
+                        processor.get_remote_fingerprint(entity_reference),
+                    )
+
+    def plan_entity(
+        self,
+        entity_reference: str,
+        configuration: dict,
+        only_sections: List[str],
+    ) -> Dict[str, dict]:
+        """
+        :return: section name -> the plan for it (see Plan), for the sections that would be processed
+        """
+        planned_sections = {}
+        with self.gitlab.profiler.entity(entity_reference), self.gitlab.tracer.span(
+            entity_reference or "application", {"gitlabform.entity": entity_reference}
+        ):
+            for processor in self.processors:
+                if (
+                    only_sections == "all"
+                    or processor.configuration_name in only_sections
+                ):
+                    section_plan = processor.plan(entity_reference, configuration)
+                    if section_plan is not None:
+                        planned_sections[processor.configuration_name] = section_plan
+        return planned_sections
@@ -1,17 +1,26 @@
+import threading
 from abc import ABC, abstractmethod
 from logging import debug
-from typing import Callable, Union
+from typing import Any, Callable, List, Optional, Union
 
 import requests
-from cli_ui import debug as verbose
+from cli_ui import warning
+from gitlabform.output import debug as verbose
 
 from gitlabform.gitlab import GitLab, PythonGitlab
-from gitlabform.gitlab import GitlabWrapper
 from gitlabform.output import EffectiveConfigurationFile
+from gitlabform.plan import Plan, PlanConflictException
 from gitlabform.processors.util.decorators import configuration_to_safe_dict
 
+# if processing the current section in the current thread has reported any failures, see _warn_about_failure()
+_reported_failures = threading.local()
+
 
 class AbstractProcessor(ABC):
+    # the GitLab API endpoint with the list of the entities of this section, like "projects/%s/variables",
+    # or None if there is no such list - see get_remote_fingerprint()
+    remote_fingerprint_path: Optional[str] = None
+
     def __init__(self, configuration_name: str, gitlab: GitLab):
         self.configuration_name = configuration_name
         self.gitlab = gitlab
@@ -21,7 +30,7 @@ class AbstractProcessor(ABC):
                 [str, list[dict[str, Union[str, int]]], list[dict[str, int]]], bool
             ],
         ] = {}
-        self.gl: PythonGitlab = GitlabWrapper(self.gitlab).get_gitlab()
+        self.gl: PythonGitlab = self.gitlab.python_gitlab
 
     @configuration_to_safe_dict
     def process(
@@ -32,19 +41,9 @@ class AbstractProcessor(ABC):
         diff_only_changed: bool,
         effective_configuration: EffectiveConfigurationFile,
     ):
+        _reported_failures.value = False
         if self._section_is_in_config(configuration):
-            if configuration.get(f"{self.configuration_name}|skip"):
-                verbose(
-                    f"Skipping section '{self.configuration_name}' - explicitly configured to do so."
-                )
-                return
-            elif (
-                configuration.get("project|archive")
-                and self.configuration_name != "project"
-            ):
-                verbose(
-                    f"Skipping section '{self.configuration_name}' - it is configured to be archived."
-                )
+            if self._is_skipped(configuration):
                 return
 
             if dry_run:
@@ -81,6 +80,147 @@ class AbstractProcessor(ABC):
         else:
             verbose(f"Skipping section '{self.configuration_name}' - not in config.")
 
+    @configuration_to_safe_dict
+    def plan(self, project_or_project_and_group: str, configuration) -> Optional[dict]:
+        """
+        Computes the changes that processing this section would make, without making them.
+
+        :return: None if the section would not be processed, otherwise a dict with the fingerprints
+                 of the section configuration and of its state in GitLab, and the changes - see Plan
+        """
+        if not self._section_is_in_config(configuration) or self._is_skipped(
+            configuration
+        ):
+            return None
+
+        config_fingerprint = Plan.fingerprint(
+            configuration.get(self.configuration_name)
+        )
+        if not self._can_proceed(project_or_project_and_group, configuration):
+            return {"config": config_fingerprint, "state": None, "changes": []}
+        state = self._get_state_for_fingerprint(
+            project_or_project_and_group, configuration
+        )
+        if state is None:
+            return {"config": config_fingerprint, "state": None, "changes": None}
+        return {
+            "config": config_fingerprint,
+            "state": Plan.fingerprint(state),
+            "changes": self._plan_changes(
+                project_or_project_and_group, configuration, state
+            ),
+        }
+
+    @configuration_to_safe_dict
+    def check_plan(
+        self,
+        project_or_project_and_group: str,
+        configuration,
+        section_plan: Optional[dict],
+    ) -> bool:
+        """
+        Checks if this section can be processed according to the plan made before.
+
+        :param section_plan: the plan for this section, None if it is not in the plan
+        :return: True if the section should be processed, False if there are no changes planned for it
+        :raises PlanConflictException: if its configuration or its state in GitLab is different
+                                       than when the plan was made
+        """
+        if not self._section_is_in_config(configuration):
+            return True
+        if self._is_skipped(configuration):
+            return False
+        if section_plan is None:
+            raise PlanConflictException(
+                f"Section '{self.configuration_name}' has not been planned"
+            )
+        if (
+            Plan.fingerprint(configuration.get(self.configuration_name))
+            != section_plan["config"]
+        ):
+            raise PlanConflictException(
+                f"Configuration of section '{self.configuration_name}' has changed since the plan was made"
+            )
+        if section_plan["changes"] == []:
+            verbose(
+                f"Skipping section '{self.configuration_name}' - no changes planned."
+            )
+            return False
+        if section_plan["state"] is not None:
+            state = self._get_state_for_fingerprint(
+                project_or_project_and_group, configuration
+            )
+            if Plan.fingerprint(state) != section_plan["state"]:
+                raise PlanConflictException(
+                    f"State of section '{self.configuration_name}' in GitLab has changed since the plan was made"
+                )
+        return True
+
+    def get_remote_fingerprint(
+        self, project_or_project_and_group: str
+    ) -> Optional[str]:
+        """
+        :return: a fingerprint of the state of this section in GitLab that is cheap to get and changes when
+                 anything in it is changed, also in the UI, or None if there is no such fingerprint - then
+                 this section is never skipped as unchanged (see SectionsFingerprints)
+        """
+        if not self.remote_fingerprint_path:
+            return None
+        return self.gitlab.get_list_fingerprint(
+            self.remote_fingerprint_path, project_or_project_and_group
+        )
+
+    def _get_state_for_fingerprint(
+        self, project_or_project_and_group: str, configuration: dict
+    ) -> Any:
+        """
+        :return: the state of this section in GitLab that processing it depends on, as simple types,
+                 or None if the processor does not support getting it (the default)
+        """
+        return None
+
+    def _plan_changes(
+        self, project_or_project_and_group: str, configuration: dict, state: Any
+    ) -> Optional[List[dict]]:
+        """
+        :param state: the state returned by `_get_state_for_fingerprint()`
+        :return: list of the changes that processing this section would make, like {"action": "update"},
+                 or None if the processor does not support computing them (the default)
+        """
+        return None
+
+    def _is_skipped(self, configuration: dict) -> bool:
+        if configuration.get(f"{self.configuration_name}|skip"):
+            verbose(
+                f"Skipping section '{self.configuration_name}' - explicitly configured to do so."
+            )
+            return True
+        elif (
+            configuration.get("project|archive")
+            and self.configuration_name != "project"
+        ):
+            verbose(
+                f"Skipping section '{self.configuration_name}' - it is configured to be archived."
+            )
+            return True
+        return False
+
+    @staticmethod
+    def has_reported_failures() -> bool:
+        """
+        :return: if processing the last section in the current thread has reported any failures as warnings
+        """
+        return getattr(_reported_failures, "value", False)
+
+    @staticmethod
+    def _warn_about_failure(message: str) -> None:
+        """
+        Reports a failure of processing the current section that doesn't stop it, f.e. in the non-strict mode,
+        so that the section is not skipped as unchanged in the next run (see SectionsFingerprints).
+        """
+        warning(message)
+        _reported_failures.value = True
+
     def _section_is_in_config(self, configuration: dict):
         return self.configuration_name in configuration
 
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 class AbstractKey(ABC):
@@ -40,6 +41,13 @@ class AbstractKey(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_names(self) -> List[str]:
+        """
+        :return: names of all the keys in this expression
+        """
+        pass
+
 
 class Key(AbstractKey):
     """
@@ -58,6 +66,9 @@ class Key(AbstractKey):
     def explain(self) -> str:
         return f"'{self.name}'"
 
+    def get_names(self) -> List[str]:
+        return [self.name]
+
 
 class And(AbstractKey):
     """
@@ -77,6 +88,9 @@ class And(AbstractKey):
         explains = [key.explain() for key in self.keys]
         return f"({' and '.join(explains)})"
 
+    def get_names(self) -> List[str]:
+        return [name for key in self.keys for name in key.get_names()]
+
 
 class Or(AbstractKey):
     """
@@ -96,6 +110,9 @@ class Or(AbstractKey):
         explains = [key.explain() for key in self.keys]
         return f"({' or '.join(explains)})"
 
+    def get_names(self) -> List[str]:
+        return [name for key in self.keys for name in key.get_names()]
+
 
 class Xor(AbstractKey):
     """
@@ -129,6 +146,9 @@ class Xor(AbstractKey):
         explains = [key.explain() for key in self.keys]
         return f"(exactly one of: {', '.join(explains)})"
 
+    def get_names(self) -> List[str]:
+        return [name for key in self.keys for name in key.get_names()]
+
 
 class OptionalKey(AbstractKey):
     """
@@ -152,3 +172,6 @@ class OptionalKey(AbstractKey):
 
     def explain(self) -> str:
         return f"(optionally '{self.name}')"
+
+    def get_names(self) -> List[str]:
+        return [self.name]
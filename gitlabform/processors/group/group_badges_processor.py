@@ -4,6 +4,8 @@ from gitlabform.processors.multiple_entities_processor import MultipleEntitiesPr
 
 
 class GroupBadgesProcessor(MultipleEntitiesProcessor):
+    remote_fingerprint_path = "groups/%s/badges"
+
     def __init__(self, gitlab: GitLab):
         super().__init__(
             "group_badges",
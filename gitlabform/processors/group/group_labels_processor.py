@@ -6,10 +6,12 @@ from gitlabform.gitlab import GitLab
 from gitlabform.processors.abstract_processor import AbstractProcessor
 from gitlabform.processors.util.labels_processor import LabelsProcessor
 
-from gitlab.v4.objects import Group
+from gitlab.v4.objects import Group, GroupLabel
 
 
 class GroupLabelsProcessor(AbstractProcessor):
+    remote_fingerprint_path = "groups/%s/labels"
+
     def __init__(self, gitlab: GitLab):
         super().__init__("group_labels", gitlab)
         self._labels_processor = LabelsProcessor()
@@ -25,6 +27,16 @@ class GroupLabelsProcessor(AbstractProcessor):
 
         group: Group = self.gl.get_group_by_path_cached(group_path_and_name)
 
+        prefetched_labels = self.gitlab.cache.prefetched.take(
+            "group_labels", group.full_path
+        )
+        if prefetched_labels is not None:
+            existing_labels = [
+                GroupLabel(group.labels, attrs) for attrs in prefetched_labels
+            ]
+        else:
+            existing_labels = None
+
         self._labels_processor.process_labels(
-            configured_labels, enforce, group, self._needs_update
+            configured_labels, enforce, group, self._needs_update, existing_labels
         )
@@ -2,7 +2,8 @@ from logging import debug, warning
 from typing import Dict, Tuple
 
 import gitlab
-from cli_ui import fatal, error, debug as verbose
+from cli_ui import fatal, error
+from gitlabform.output import debug as verbose
 
 from gitlabform.constants import EXIT_INVALID_INPUT
 from gitlabform.gitlab import GitLab, AccessLevel
@@ -304,9 +305,17 @@ class GroupMembersProcessor(AbstractProcessor):
 
         debug(f"Group members AFTER: {group.members.list(get_all=True)}")
 
-    @staticmethod
-    def get_group_members(group) -> dict:
-        members = group.members.list(get_all=True)
+    def get_group_members(self, group) -> dict:
+        prefetched_members = self.gitlab.cache.prefetched.take(
+            "group_members", group.full_path
+        )
+        if prefetched_members is not None:
+            members = [
+                GroupMember(group.members, attrs, created_from_list=True)
+                for attrs in prefetched_members
+            ]
+        else:
+            members = group.members.list(get_all=True)
         users = {}
         for member in members:
             users[member.username.lower()] = member
@@ -1,5 +1,5 @@
 from logging import info, debug
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
 from gitlabform.gitlab import GitLab
 from gitlab.v4.objects.groups import Group
@@ -21,6 +21,23 @@ class GroupSettingsProcessor(AbstractProcessor):
         else:
             debug("No update needed for Group Settings")
 
+    def _get_state_for_fingerprint(self, group: str, configuration: dict) -> Any:
+        gitlab_group: Group = self.gl.get_group_by_path_cached(group)
+        group_settings = gitlab_group.asdict()
+        # only the configured settings, as the other ones don't matter here
+        return {
+            key: group_settings[key]
+            for key in configuration.get("group_settings", {})
+            if key in group_settings
+        }
+
+    def _plan_changes(
+        self, group: str, configuration: dict, state: Any
+    ) -> Optional[List[dict]]:
+        if self._needs_update(state, configuration.get("group_settings", {})):
+            return [{"action": "update"}]
+        return []
+
     @staticmethod
     def update_group_settings(gitlab_group: Group, group_settings_config: dict):
         for key in group_settings_config:
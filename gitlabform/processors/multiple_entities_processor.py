@@ -1,9 +1,9 @@
 from logging import debug
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 from cli_ui import fatal
 
 import abc
-from typing import Callable, Union, Any
+from typing import Callable, Union, Any, List, Optional
 from gitlabform.constants import EXIT_INVALID_INPUT
 from gitlabform.gitlab import GitLab
 from gitlabform.processors.abstract_processor import AbstractProcessor
@@ -160,6 +160,47 @@ class MultipleEntitiesProcessor(AbstractProcessor, metaclass=abc.ABCMeta):
             self.add_method(project_or_group, entity_config)
             debug(f"{self.configuration_name} AFTER: ^^^")
 
+    def _get_state_for_fingerprint(
+        self, project_or_group: str, configuration: dict
+    ) -> Any:
+        return list(self.list_method(project_or_group))
+
+    def _plan_changes(
+        self, project_or_group: str, configuration: dict, state: Any
+    ) -> Optional[List[dict]]:
+        # the same logic as in _process_configuration(), but without changing the configuration
+        entities_in_configuration = dict(configuration[self.configuration_name])
+        enforce = entities_in_configuration.pop("enforce", False)
+        entities_in_gitlab = {
+            str(i): entity_in_gitlab for i, entity_in_gitlab in enumerate(state, 1)
+        }
+
+        changes = []
+        if enforce:
+            for entity_in_gitlab in entities_in_gitlab.values():
+                if not self._is_in(entity_in_gitlab, entities_in_configuration):
+                    changes.append(self._describe_change("delete", entity_in_gitlab))
+
+        for entity_config in entities_in_configuration.values():
+            entity_in_gitlab = self._is_in(entity_config, entities_in_gitlab)
+            if not entity_in_gitlab:
+                changes.append(self._describe_change("create", entity_config))
+            elif entity_config.get("delete", False):
+                changes.append(self._describe_change("delete", entity_config))
+            elif self._needs_update(entity_in_gitlab, entity_config):
+                changes.append(self._describe_change("update", entity_config))
+        return changes
+
+    def _describe_change(self, action: str, entity: dict) -> dict:
+        return {
+            "action": action,
+            "entity": {
+                name: entity[name]
+                for name in self.defining.get_names()
+                if name in entity
+            },
+        }
+
     def _find_duplicates(self, project_or_group: str, entities_in_configuration: dict):
         for first_key, first_value in entities_in_configuration.items():
             for second_key, second_value in entities_in_configuration.items():
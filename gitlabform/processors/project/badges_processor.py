@@ -4,6 +4,8 @@ from gitlabform.processors.multiple_entities_processor import MultipleEntitiesPr
 
 
 class BadgesProcessor(MultipleEntitiesProcessor):
+    remote_fingerprint_path = "projects/%s/badges"
+
     def __init__(self, gitlab: GitLab):
         super().__init__(
             "badges",
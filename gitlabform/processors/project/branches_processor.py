@@ -1,6 +1,7 @@
 from logging import debug
-from typing import Optional
-from cli_ui import warning, fatal, debug as verbose
+from typing import Dict, Optional
+from cli_ui import fatal
+from gitlabform.output import debug as verbose
 from gitlab import (
     GitlabGetError,
     GitlabDeleteError,
@@ -22,18 +23,40 @@ class BranchesProcessor(AbstractProcessor):
     def _process_configuration(self, project_and_group: str, configuration: dict):
         project: Project = self.gl.get_project_by_path_cached(project_and_group)
 
+        prefetched_protected_branches = self.gitlab.cache.prefetched.take(
+            "branches", project_and_group
+        )
+        if prefetched_protected_branches is not None:
+            protected_branches: Optional[Dict[str, ProjectProtectedBranch]] = {
+                attrs["name"]: ProjectProtectedBranch(
+                    project.protectedbranches, attrs, created_from_list=True
+                )
+                for attrs in prefetched_protected_branches
+            }
+        else:
+            protected_branches = None
+
         for branch in sorted(configuration["branches"]):
             branch_configuration: dict = self.transform_branch_config(
                 configuration["branches"][branch]
             )
 
-            self.process_branch_protection(project, branch, branch_configuration)
+            self.process_branch_protection(
+                project, branch, branch_configuration, protected_branches
+            )
 
     def process_branch_protection(
-        self, project: Project, branch_name: str, branch_config: dict
+        self,
+        project: Project,
+        branch_name: str,
+        branch_config: dict,
+        protected_branches: Optional[Dict[str, ProjectProtectedBranch]] = None,
     ):
         """
         Process branch protection according to gitlabform config.
+
+        :param protected_branches: protected branches by name, if they have been prefetched,
+                                   otherwise the protection of this branch is get here
         """
         protected_branch: Optional[ProjectProtectedBranch] = None
 
@@ -48,13 +71,17 @@ class BranchesProcessor(AbstractProcessor):
                         exit_code=EXIT_INVALID_INPUT,
                     )
                 else:
-                    warning(message)
+                    self._warn_about_failure(message)
 
-        try:
-            protected_branch = project.protectedbranches.get(branch_name)
-        except GitlabGetError:
-            message = f"The branch '{branch_name}' is not protected!"
-            debug(message)
+        if protected_branches is not None:
+            protected_branch = protected_branches.get(branch_name)
+        else:
+            try:
+                protected_branch = project.protectedbranches.get(branch_name)
+            except GitlabGetError:
+                pass
+        if not protected_branch:
+            debug(f"The branch '{branch_name}' is not protected!")
 
         if branch_config.get("protected"):
             if protected_branch and self._needs_update(
@@ -95,7 +122,7 @@ class BranchesProcessor(AbstractProcessor):
                     exit_code=EXIT_PROCESSING_ERROR,
                 )
             else:
-                warning(message)
+                self._warn_about_failure(message)
 
     def unprotect_branch(self, protected_branch: ProjectProtectedBranch):
         """
@@ -117,7 +144,7 @@ class BranchesProcessor(AbstractProcessor):
                     exit_code=EXIT_PROCESSING_ERROR,
                 )
             else:
-                warning(message)
+                self._warn_about_failure(message)
 
     def transform_branch_config(self, branch_config: dict):
         """
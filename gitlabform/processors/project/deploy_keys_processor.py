@@ -4,6 +4,8 @@ from gitlabform.processors.multiple_entities_processor import MultipleEntitiesPr
 
 
 class DeployKeysProcessor(MultipleEntitiesProcessor):
+    remote_fingerprint_path = "projects/%s/deploy_keys"
+
     def __init__(self, gitlab: GitLab):
         super().__init__(
             "deploy_keys",
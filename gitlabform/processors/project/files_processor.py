@@ -3,8 +3,8 @@ import re
 from pathlib import Path
 
 from logging import debug
-from cli_ui import debug as verbose
-from cli_ui import warning, fatal
+from gitlabform.output import debug as verbose
+from cli_ui import fatal
 from typing import List
 
 from jinja2 import Environment, FileSystemLoader
@@ -62,7 +62,7 @@ class FilesProcessor(AbstractProcessor):
                                 exit_code=EXIT_INVALID_INPUT,
                             )
                         else:
-                            warning(message)
+                            self._warn_about_failure(message)
 
             debug(
                 "File '%s' to be updated in '%s' branche(s)",
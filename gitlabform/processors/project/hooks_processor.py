@@ -9,6 +9,8 @@ from gitlabform.processors.abstract_processor import AbstractProcessor
 
 
 class HooksProcessor(AbstractProcessor):
+    remote_fingerprint_path = "projects/%s/hooks"
+
     def __init__(self, gitlab: GitLab):
         super().__init__("hooks", gitlab)
 
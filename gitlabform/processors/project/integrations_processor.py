@@ -1,4 +1,4 @@
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 
 from gitlab.v4.objects import Project, ProjectIntegration
 from gitlabform.gitlab import GitLab
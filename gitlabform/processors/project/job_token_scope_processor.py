@@ -2,7 +2,8 @@ from typing import List
 
 from gitlabform.gitlab import GitLab
 from gitlabform.processors import AbstractProcessor
-from cli_ui import warning, info, debug
+from cli_ui import warning
+from gitlabform.output import info, debug
 
 from gitlab.v4.objects import Project, ProjectJobTokenScope
 
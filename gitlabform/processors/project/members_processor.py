@@ -1,4 +1,5 @@
-from cli_ui import debug as verbose, warning, info, error
+from cli_ui import error
+from gitlabform.output import debug as verbose, info
 from cli_ui import fatal
 from gitlab import GitlabGetError, GitlabDeleteError
 from gitlab.v4.objects import Project, User
@@ -115,7 +116,9 @@ class MembersProcessor(AbstractProcessor):
 
                 user_id = self.gl.get_user_id_cached(user)
                 if user_id is None:
-                    warning(f"Could not find user '{user}' in Gitlab, skipping...")
+                    self._warn_about_failure(
+                        f"Could not find user '{user}' in Gitlab, skipping..."
+                    )
                     continue
 
                 expires_at = (
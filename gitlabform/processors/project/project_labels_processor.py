@@ -3,12 +3,14 @@ from typing import Dict
 from gitlabform.gitlab import GitLab
 from gitlabform.processors.abstract_processor import AbstractProcessor
 
-from gitlab.v4.objects import Project
+from gitlab.v4.objects import Project, ProjectLabel
 
 from gitlabform.processors.util.labels_processor import LabelsProcessor
 
 
 class ProjectLabelsProcessor(AbstractProcessor):
+    remote_fingerprint_path = "projects/%s/labels"
+
     def __init__(self, gitlab: GitLab):
         super().__init__("labels", gitlab)
         self._labels_processor = LabelsProcessor()
@@ -24,6 +26,20 @@ class ProjectLabelsProcessor(AbstractProcessor):
 
         project: Project = self.gl.get_project_by_path_cached(project_and_group)
 
+        prefetched_labels = self.gitlab.cache.prefetched.take(
+            "labels", project_and_group
+        )
+        # the labels priorities are not available in GraphQL, so we can't use the prefetched labels to check them
+        if prefetched_labels is not None and not any(
+            "priority" in configured_label
+            for configured_label in configured_labels.values()
+        ):
+            existing_labels = [
+                ProjectLabel(project.labels, attrs) for attrs in prefetched_labels
+            ]
+        else:
+            existing_labels = None
+
         self._labels_processor.process_labels(
-            configured_labels, enforce, project, self._needs_update
+            configured_labels, enforce, project, self._needs_update, existing_labels
         )
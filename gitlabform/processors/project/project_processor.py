@@ -1,4 +1,4 @@
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 from logging import fatal
 from gitlabform.gitlab import GitLab
 from gitlabform.processors.abstract_processor import AbstractProcessor
@@ -49,6 +49,17 @@ class ProjectProcessor(AbstractProcessor):
                     f"Transferring project to '{project_transfer_destination_group}' group..."
                 )
                 project_to_be_transferred.transfer(project_transfer_destination_group)
+                self.gitlab.cache.invalidate(
+                    "projects", source_project_path_with_namespace
+                )
+                self.gitlab.cache.invalidate("projects", project_path_with_namespace)
+                # ...and the ids stored for both paths, as they have changed
+                self.gitlab.cache.persistent.delete_id(
+                    "projects", source_project_path_with_namespace
+                )
+                self.gitlab.cache.persistent.delete_id(
+                    "projects", project_path_with_namespace
+                )
                 # TODO: Catch GitlabTransferProjectError exception.
                 #  The above code can run into exception for various reasons.
                 #  We should catch this exception and log a custom error message with hints.
@@ -67,6 +78,8 @@ class ProjectProcessor(AbstractProcessor):
             if configuration["project"].get("archive") is True:
                 verbose("Archiving project...")
                 project.archive()
+                self.gitlab.cache.invalidate("projects", project_path_with_namespace)
             elif configuration["project"].get("archive") is False:
                 verbose("Unarchiving project...")
                 project.unarchive()
+                self.gitlab.cache.invalidate("projects", project_path_with_namespace)
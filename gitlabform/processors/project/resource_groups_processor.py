@@ -1,4 +1,4 @@
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 from cli_ui import warning
 
 from gitlabform.gitlab import GitLab
@@ -41,7 +41,7 @@ class ResourceGroupsProcessor(AbstractProcessor):
                 if ensure_exists:
                     raise Exception(message)
                 else:
-                    warning(message)
+                    self._warn_about_failure(message)
                     continue
 
             if self._needs_update(
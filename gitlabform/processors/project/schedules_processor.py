@@ -11,6 +11,8 @@ from gitlabform.processors.abstract_processor import AbstractProcessor
 
 
 class SchedulesProcessor(AbstractProcessor):
+    remote_fingerprint_path = "projects/%s/pipeline_schedules"
+
     def __init__(self, gitlab: GitLab):
         super().__init__("schedules", gitlab)
 
@@ -24,9 +26,19 @@ class SchedulesProcessor(AbstractProcessor):
             configured_schedules.pop("enforce")
 
         project: Project = self.gl.get_project_by_path_cached(project_and_group)
-        existing_schedules: List[RESTObject] | RESTObjectList = (
-            project.pipelineschedules.list(get_all=True)
+        prefetched_schedules = self.gitlab.cache.prefetched.take(
+            "schedules", project_and_group
         )
+        existing_schedules: List[RESTObject] | RESTObjectList
+        if prefetched_schedules is not None:
+            existing_schedules = [
+                ProjectPipelineSchedule(
+                    project.pipelineschedules, attrs, created_from_list=True
+                )
+                for attrs in prefetched_schedules
+            ]
+        else:
+            existing_schedules = project.pipelineschedules.list(get_all=True)
 
         schedule_ids_by_description: Dict = self._group_schedule_ids_by_description(
             existing_schedules
@@ -1,5 +1,5 @@
 from logging import debug
-from cli_ui import warning, fatal, error
+from cli_ui import fatal, error
 
 from gitlabform.constants import EXIT_PROCESSING_ERROR
 from gitlabform.gitlab import GitLab
@@ -103,7 +103,7 @@ class TagsProcessor(AbstractProcessor):
                         exit_code=EXIT_PROCESSING_ERROR,
                     )
                 else:
-                    warning(message)
+                    self._warn_about_failure(message)
             except GitlabGetError as e:
                 if self.strict:
                     fatal(
@@ -111,4 +111,4 @@ class TagsProcessor(AbstractProcessor):
                         exit_code=EXIT_PROCESSING_ERROR,
                     )
                 else:
-                    warning(message)
+                    self._warn_about_failure(message)
@@ -1,5 +1,4 @@
-from cli_ui import debug as verbose
-from cli_ui import warning
+from gitlabform.output import debug as verbose
 
 import copy
 import textwrap
@@ -12,6 +11,8 @@ from gitlabform.processors.multiple_entities_processor import MultipleEntitiesPr
 
 
 class VariablesProcessor(MultipleEntitiesProcessor):
+    remote_fingerprint_path = "projects/%s/variables"
+
     def __init__(self, gitlab: GitLab):
         super().__init__(
             "variables",
@@ -31,7 +32,9 @@ class VariablesProcessor(MultipleEntitiesProcessor):
             )
             == "disabled"
         ):
-            warning("Builds disabled in this project so I can't set variables here.")
+            self._warn_about_failure(
+                "Builds disabled in this project so I can't set variables here."
+            )
             return False
         else:
             return True
@@ -1,8 +1,8 @@
 from logging import debug
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 
 import abc
-from typing import Callable, Optional
+from typing import Any, Callable, List, Optional
 
 from gitlabform.gitlab import GitLab
 from gitlabform.processors.abstract_processor import AbstractProcessor
@@ -50,6 +50,32 @@ class SingleEntityProcessor(AbstractProcessor, metaclass=abc.ABCMeta):
             self.add_method(project_or_group, entity_config)
             debug(f"{self.configuration_name} AFTER: ^^^")
 
+    def _get_state_for_fingerprint(
+        self, project_or_group: str, configuration: dict
+    ) -> Any:
+        entity_in_gitlab = self.get_method(project_or_group)
+        # only the configured settings, as the other ones (like the last activity time) don't matter here
+        return {
+            "exists": bool(entity_in_gitlab),
+            "settings": {
+                key: entity_in_gitlab[key]
+                for key in configuration[self.configuration_name]
+                if entity_in_gitlab and key in entity_in_gitlab
+            },
+        }
+
+    def _plan_changes(
+        self, project_or_group: str, configuration: dict, state: Any
+    ) -> Optional[List[dict]]:
+        if not state["exists"]:
+            return [{"action": "create"}]
+        elif self._needs_update(
+            state["settings"], configuration[self.configuration_name]
+        ):
+            return [{"action": "update"}]
+        else:
+            return []
+
     def _print_diff(
         self, project_or_project_and_group: str, entity_config, diff_only_changed: bool
     ):
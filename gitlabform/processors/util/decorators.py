@@ -1,3 +1,4 @@
+from copy import deepcopy
 from functools import wraps
 
 
@@ -34,11 +35,20 @@ class SafeDict(dict):
 
 def configuration_to_safe_dict(method):
     """
-    This wrapper function calls the method with the configuration converted from a regular dict into a SafeDict
+    This wrapper function calls the method with the configuration converted from a regular dict into a SafeDict.
+
+    The effective configurations share their values between the groups and projects (see
+    ConfigurationCore._merge_configs), so only the section of the processor is copied,
+    as the processors may modify it.
     """
 
     @wraps(method)
     def method_wrapper(self, project_and_group, configuration, *args):
-        return method(self, project_and_group, SafeDict(configuration), *args)
+        safe_configuration = SafeDict(configuration)
+        if self.configuration_name in safe_configuration:
+            safe_configuration[self.configuration_name] = deepcopy(
+                safe_configuration[self.configuration_name]
+            )
+        return method(self, project_and_group, safe_configuration, *args)
 
     return method_wrapper
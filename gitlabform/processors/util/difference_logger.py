@@ -2,7 +2,7 @@ import hashlib
 import json
 from itertools import starmap
 
-from cli_ui import debug as verbose
+from gitlabform.output import debug as verbose
 
 
 # Simple function to create strings for values which should be hidden
@@ -1,5 +1,5 @@
 from logging import debug, info
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Optional, Sequence
 
 from gitlab.base import RESTObject
 from gitlab.v4.objects import Group, Project, ProjectLabel, GroupLabel
@@ -14,9 +14,18 @@ class LabelsProcessor:
         enforce: bool,
         group_or_project: Group | Project,
         needs_update: Callable,  # self._needs_update passed from AbstractProcessor called process_labels
+        existing_labels: Optional[Sequence[GroupLabel | ProjectLabel]] = None,
     ):
-        # python-gitlab/python-gitlab#2843
-        existing_labels = group_or_project.labels.list(get_all=True)
+        """
+        :param existing_labels: full labels that are already in GitLab, if they have been prefetched,
+                                otherwise they are get here
+        """
+        if existing_labels is None:
+            # python-gitlab/python-gitlab#2843
+            existing_labels = [
+                group_or_project.labels.get(listed_label.id)
+                for listed_label in group_or_project.labels.list(get_all=True)
+            ]
         existing_label_names: List = []
 
         if isinstance(group_or_project, Group):
@@ -25,8 +34,7 @@ class LabelsProcessor:
             parent_object_type = "Project"
 
         if existing_labels:
-            for listed_label in existing_labels:
-                full_label = group_or_project.labels.get(listed_label.id)
+            for full_label in existing_labels:
                 label_name = full_label.name
 
                 if label_name not in configured_labels.keys():
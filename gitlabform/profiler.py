@@ -0,0 +1,293 @@
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+from urllib.parse import urlparse
+
+from gitlabform.output import info_1, info_table
+
+
+class RequestsProfiler:
+    """
+    Records the HTTP requests made to GitLab (by us and by python-gitlab), together with the entity
+    (group or project) and the section (processor) that made them, and reports where the time went.
+
+    The entity and the section are kept per thread, so that this works when processing in parallel.
+
+    Regardless of being enabled, it also measures the time of processing each section and counts
+    the GET and write requests made by it, for the summary and the metrics file.
+    """
+
+    # in the tables printed out
+    TOP_ENDPOINTS = 20
+
+    # after these, the next path element is the name of an element, not a part of the endpoint
+    NAMED_COLLECTIONS = {
+        "branches",
+        "environments",
+        "files",
+        "protected_branches",
+        "protected_environments",
+        "protected_tags",
+        "tags",
+        "variables",
+    }
+    # ...but after these it's an id or a path of a group, project, user etc.
+    ID_COLLECTIONS = {"groups", "projects", "users", "namespaces"}
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.records: List[dict] = []
+        self.context = threading.local()
+        self.sections_durations: Dict[str, List[float]] = defaultdict(list)
+        self.sections_requests: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"GET": 0, "write": 0}
+        )
+
+    @contextmanager
+    def entity(self, entity: str) -> Iterator[None]:
+        """
+        Attributes the requests made in this thread, within this context, to the given group or project.
+        """
+        previous = getattr(self.context, "entity", None)
+        self.context.entity = entity
+        try:
+            yield
+        finally:
+            self.context.entity = previous
+
+    @contextmanager
+    def section(self, section: str, timed: bool = True) -> Iterator[None]:
+        """
+        Attributes the requests made in this thread, within this context, to the given section (processor).
+
+        :param timed: whether to include the time spent in this context in the section's processing times,
+                      set to False f.e. if the section is not in the entity's config, so it's not really processed
+        """
+        previous = getattr(self.context, "section", None)
+        self.context.section = section
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.context.section = previous
+            if timed:
+                duration = time.perf_counter() - start
+                with self.lock:
+                    self.sections_durations[section].append(duration)
+
+    def count_request(self, method: str) -> None:
+        """
+        Counts a request made in the current section, if there is one.
+        """
+        section = getattr(self.context, "section", None)
+        if section:
+            kind = "GET" if method in ("GET", "HEAD") else "write"
+            with self.lock:
+                self.sections_requests[section][kind] += 1
+
+    def record(
+        self, method: str, url: str, status: int, latency: float, size: int
+    ) -> None:
+        """
+        :param method: HTTP method of the request
+        :param url: full URL of the request
+        :param status: HTTP status code of the response
+        :param latency: time from sending the request until getting the whole response, in seconds
+        :param size: size of the response body, in bytes
+        """
+        if not self.enabled:
+            return
+        record = {
+            "method": method,
+            "endpoint": self.normalize_endpoint(url),
+            "status": status,
+            "latency": latency,
+            "bytes": size,
+            "entity": getattr(self.context, "entity", None),
+            "section": getattr(self.context, "section", None),
+        }
+        with self.lock:
+            self.records.append(record)
+
+    @classmethod
+    def normalize_endpoint(cls, url: str) -> str:
+        """
+        :param url: URL like "https://gitlab.example.com/api/v4/projects/group%2Fproject/protected_branches/main?x=y"
+        :return: endpoint template like "projects/:id/protected_branches/:name"
+        """
+        path = urlparse(url).path
+        if "/api/v4/" in path:
+            path = path.split("/api/v4/", 1)[1]
+
+        elements = path.strip("/").split("/")
+        normalized: List[str] = []
+        for index, element in enumerate(elements):
+            previous = elements[index - 1] if index > 0 else None
+            if previous in cls.ID_COLLECTIONS or element.isdigit():
+                normalized.append(":id")
+            elif previous in cls.NAMED_COLLECTIONS or "%" in element:
+                normalized.append(":name")
+            else:
+                normalized.append(element)
+        return "/".join(normalized)
+
+    def get_report(self) -> dict:
+        """
+        :return: dict with the recorded requests and their aggregations by endpoint, section and entity,
+                 sorted by the total time, descending
+        """
+        with self.lock:
+            records = list(self.records)
+
+        def aggregate(key) -> List[dict]:
+            aggregates: Dict[tuple, dict] = defaultdict(
+                lambda: {"count": 0, "total_time": 0.0, "bytes": 0}
+            )
+            for record in records:
+                aggregated = aggregates[key(record)]
+                aggregated["count"] += 1
+                aggregated["total_time"] += record["latency"]
+                aggregated["bytes"] += record["bytes"]
+            return sorted(
+                (
+                    {"key": group_key, **aggregated}
+                    for group_key, aggregated in aggregates.items()
+                ),
+                key=lambda aggregated: aggregated["total_time"],
+                reverse=True,
+            )
+
+        return {
+            "endpoints": [
+                {"method": aggregated["key"][0], "endpoint": aggregated["key"][1]}
+                | {k: v for k, v in aggregated.items() if k != "key"}
+                for aggregated in aggregate(
+                    lambda record: (record["method"], record["endpoint"])
+                )
+            ],
+            "sections": [
+                {"section": aggregated["key"]}
+                | {k: v for k, v in aggregated.items() if k != "key"}
+                for aggregated in aggregate(lambda record: record["section"])
+            ],
+            "entities": [
+                {"entity": aggregated["key"]}
+                | {k: v for k, v in aggregated.items() if k != "key"}
+                for aggregated in aggregate(lambda record: record["entity"])
+            ],
+            "requests": records,
+        }
+
+    def get_sections_metrics(self) -> List[dict]:
+        """
+        :return: list of dicts with the number of entities, the total time and its percentiles per entity,
+                 and the numbers of GET and write requests, for each section processed,
+                 sorted by the total time, descending
+        """
+        with self.lock:
+            sections_durations = {
+                section: sorted(durations)
+                for section, durations in self.sections_durations.items()
+            }
+            sections_requests = {
+                section: dict(requests)
+                for section, requests in self.sections_requests.items()
+            }
+
+        def percentile(sorted_values: List[float], fraction: float) -> float:
+            # nearest-rank method
+            return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+        metrics = []
+        for section, durations in sections_durations.items():
+            requests = sections_requests.get(section, {"GET": 0, "write": 0})
+            metrics.append(
+                {
+                    "section": section,
+                    "entities": len(durations),
+                    "time": sum(durations),
+                    "p50": percentile(durations, 0.5),
+                    "p95": percentile(durations, 0.95),
+                    "gets": requests["GET"],
+                    "writes": requests["write"],
+                }
+            )
+        return sorted(metrics, key=lambda metric: metric["time"], reverse=True)
+
+    def write_metrics(self, path: str) -> None:
+        """
+        Writes the sections metrics to a file in the OpenMetrics text format, which can also be read
+        as the Prometheus text format, f.e. by the node exporter's textfile collector.
+        """
+        lines = [
+            "# HELP gitlabform_section_duration_seconds Time of processing a section for a group or project.",
+            "# TYPE gitlabform_section_duration_seconds summary",
+            "# UNIT gitlabform_section_duration_seconds seconds",
+        ]
+        sections_metrics = self.get_sections_metrics()
+        for metric in sections_metrics:
+            labels = f'section="{metric["section"]}"'
+            lines += [
+                f'gitlabform_section_duration_seconds{{{labels},quantile="0.5"}} {metric["p50"]}',
+                f'gitlabform_section_duration_seconds{{{labels},quantile="0.95"}} {metric["p95"]}',
+                f"gitlabform_section_duration_seconds_sum{{{labels}}} {metric['time']}",
+                f"gitlabform_section_duration_seconds_count{{{labels}}} {metric['entities']}",
+            ]
+        lines += [
+            "# HELP gitlabform_section_requests Requests made to GitLab while processing a section.",
+            "# TYPE gitlabform_section_requests counter",
+        ]
+        for metric in sections_metrics:
+            labels = f'section="{metric["section"]}"'
+            lines += [
+                f'gitlabform_section_requests_total{{{labels},kind="get"}} {metric["gets"]}',
+                f'gitlabform_section_requests_total{{{labels},kind="write"}} {metric["writes"]}',
+            ]
+        lines.append("# EOF")
+
+        with open(path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+
+    def write_report(self, path: str) -> None:
+        """
+        Writes the report to a JSON file and prints out its summary.
+        """
+        report = self.get_report()
+
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+        def rows(aggregates: List[dict], *keys: str) -> List[list]:
+            # cli_ui wants each cell to be a sequence of tokens
+            return [
+                [(str(aggregated[key] or "-"),) for key in keys]
+                + [
+                    (str(aggregated["count"]),),
+                    (f"{aggregated['total_time']:.2f}",),
+                    (str(aggregated["bytes"]),),
+                ]
+                for aggregated in aggregates[: self.TOP_ENDPOINTS]
+            ]
+
+        stats_headers = ["requests", "time [s]", "bytes"]
+        info_1(f"Top {self.TOP_ENDPOINTS} endpoints by total time:")
+        info_table(
+            rows(report["endpoints"], "method", "endpoint"),
+            headers=["method", "endpoint"] + stats_headers,
+        )
+        info_1(f"Top {self.TOP_ENDPOINTS} sections by total time of their requests:")
+        info_table(
+            rows(report["sections"], "section"), headers=["section"] + stats_headers
+        )
+        info_1(
+            f"Top {self.TOP_ENDPOINTS} groups/projects by total time of their requests:"
+        )
+        info_table(
+            rows(report["entities"], "entity"), headers=["entity"] + stats_headers
+        )
+        info_1(f"Profile report with all the requests written to: {path}")
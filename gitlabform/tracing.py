@@ -0,0 +1,195 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from cli_ui import warning
+
+
+class Span:
+    """
+    A single operation in a trace, like processing a project or making an HTTP request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            # internal
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": Tracer.to_otlp_attributes(self.attributes),
+            # error or ok
+            "status": (
+                {"code": 2, "message": self.error} if self.error else {"code": 1}
+            ),
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class Tracer:
+    """
+    Creates the spans of a single trace of a whole run - for the run itself, for processing each group
+    and project, each section of them and for each HTTP request made - and exports them in the OpenTelemetry
+    protocol (OTLP) JSON format, to a file and/or to an OTLP/HTTP endpoint (f.e. OpenTelemetry Collector
+    or Jaeger), without requiring the OpenTelemetry SDK.
+
+    The current span is kept in a context variable, so the spans made in parallel threads and asyncio tasks
+    get the right parents. The spans from the threads started without a copy of the context (like
+    the ones in a thread pool) get the root span as their parent.
+    """
+
+    def __init__(self) -> None:
+        self.file: Optional[str] = None
+        self.endpoint: Optional[str] = None
+        self.service_name = "gitlabform"
+        self.trace_id = secrets.token_hex(16)
+        self.lock = threading.Lock()
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self.current: ContextVar[Optional[Span]] = ContextVar(
+            f"current_span_{self.trace_id}", default=None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.file or self.endpoint)
+
+    def enable(
+        self, file: Optional[str] = None, endpoint: Optional[str] = None
+    ) -> None:
+        """
+        Tracing is enabled if at least one of the file and the endpoint is set.
+
+        :param file: name/path of a file to write the spans to
+        :param endpoint: OTLP/HTTP traces endpoint URL to send the spans to. If not set, it's taken from
+                         the standard OpenTelemetry environment variables, if they are set.
+        """
+        self.file = file
+        if endpoint:
+            self.endpoint = endpoint
+        elif traces_endpoint := os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"):
+            self.endpoint = traces_endpoint
+        elif base_endpoint := os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            self.endpoint = f"{base_endpoint.rstrip('/')}/v1/traces"
+        self.service_name = os.getenv("OTEL_SERVICE_NAME", self.service_name)
+
+    @contextmanager
+    def span(
+        self, name: str, attributes: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Optional[Span]]:
+        """
+        Records a span for the operation done within this context, as a child of the current span.
+        If the operation raises an exception, then the span gets an error status.
+
+        :return: the span, to set more attributes on it, or None if tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = self.current.get() or self.root
+        span = Span(
+            name,
+            self.trace_id,
+            parent.span_id if parent else None,
+            attributes or {},
+        )
+        if not parent:
+            self.root = span
+        token = self.current.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set_error(str(e))
+            raise
+        finally:
+            self.current.reset(token)
+            span.end_time = time.time_ns()
+            with self.lock:
+                self.spans.append(span)
+
+    def get_otlp(self) -> dict:
+        """
+        :return: all the finished spans, as an OTLP JSON ExportTraceServiceRequest
+        """
+        with self.lock:
+            spans = [span.to_otlp() for span in self.spans]
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": self.to_otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [{"scope": {"name": "gitlabform"}, "spans": spans}],
+                }
+            ]
+        }
+
+    def export(self) -> None:
+        """
+        Writes the finished spans to the file and/or sends them to the endpoint, if they are set.
+        """
+        if not self.enabled:
+            return
+        otlp = self.get_otlp()
+        if self.file:
+            with open(self.file, "w") as file:
+                json.dump(otlp, file, indent=2)
+        if self.endpoint:
+            try:
+                # not using the GitLab session, to not send the GitLab token here
+                response = requests.post(self.endpoint, json=otlp, timeout=10)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                warning(f"Failed to send the trace to {self.endpoint}: {e}")
+
+    @staticmethod
+    def to_otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+        def to_otlp_value(value: Any) -> dict:
+            if isinstance(value, bool):
+                return {"boolValue": value}
+            elif isinstance(value, int):
+                return {"intValue": str(value)}
+            elif isinstance(value, float):
+                return {"doubleValue": value}
+            else:
+                return {"stringValue": str(value)}
+
+        return [
+            {"key": key, "value": to_otlp_value(value)}
+            for key, value in attributes.items()
+        ]
@@ -46,7 +46,6 @@ setup(
         "Jinja2==3.1.5",
         "luddite==1.0.4",
         "MarkupSafe==3.0.2",
-        "mergedeep==1.3.4",
         "packaging==24.2",
         "python-gitlab==5.3.1",
         "python-gitlab[graphql]==5.3.1",
@@ -56,6 +55,9 @@ setup(
         "yamlpath==3.8.2",
     ],
     extras_require={
+        "async": [
+            "httpx[http2]==0.28.1",
+        ],
         "test": [
             "coverage==7.6.10",
             "cryptography==44.0.0",
@@ -46,6 +46,31 @@ def test__config_with_different_case_project():
     assert effective_configuration["project_settings"] == {"visibility": "public"}
 
 
+def test__config_replaced_by_transformers_is_used():
+    config_yaml = f"""
+    projects_and_groups:
+      Group/*:
+        project_settings:
+          visibility: internal
+    """
+    configuration = Configuration(config_string=config_yaml)
+    assert configuration._get_group_config("group") == {
+        "project_settings": {"visibility": "internal"}
+    }
+
+    # ...like the transformers do when converting the config to simple types
+    configuration.config = {
+        "projects_and_groups": {
+            "GROUP/*": {"project_settings": {"visibility": "public"}}
+        }
+    }
+
+    assert configuration._get_group_config("group") == {
+        "project_settings": {"visibility": "public"}
+    }
+    assert configuration._get_project_config("group/project") == {}
+
+
 def test__config_with_different_case_duplicate_groups():
     config_yaml = """
     projects_and_groups:
@@ -0,0 +1,96 @@
+import os
+from unittest.mock import MagicMock
+
+from gitlabform.configuration import Configuration
+from gitlabform.configuration.transform import ConfigurationTransformers
+from gitlabform.gitlab import GitLab
+
+
+CONFIG = """
+config_version: 3
+gitlab:
+  url: https://gitlab.example.com
+  token: secret-token
+  compiled_config_cache:
+    path: {cache_path}
+projects_and_groups:
+  foo/*:
+    merge_requests_approval_rules:
+      standard:
+        approvals_required: 1
+        users:
+          - a_user
+    members:
+      users:
+        a_user:
+          access_level: developer
+"""
+
+
+def _read_and_transform(config_path, refresh_cache=False):
+    configuration = Configuration(str(config_path), refresh_cache=refresh_cache)
+    gitlab_mock = MagicMock(GitLab)
+    gitlab_mock._get_user_id = MagicMock(return_value=123)
+    ConfigurationTransformers(gitlab_mock).transform(configuration)
+    return configuration, gitlab_mock
+
+
+def test__transformed_config_is_read_from_the_cache(tmp_path):
+    cache_path = tmp_path / "cache"
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(CONFIG.format(cache_path=cache_path))
+
+    configuration, gitlab_mock = _read_and_transform(config_path)
+    assert gitlab_mock._get_user_id.called
+    assert len(os.listdir(cache_path)) == 1
+
+    cached_configuration, gitlab_mock = _read_and_transform(config_path)
+    assert cached_configuration.transformed
+    assert not gitlab_mock._get_user_id.called
+    assert cached_configuration.config == configuration.config
+    assert cached_configuration.get("projects_and_groups|foo/*") == {
+        "merge_requests_approval_rules": {
+            "standard": {"approvals_required": 1, "user_ids": [123]}
+        },
+        "members": {"users": {"a_user": {"access_level": 30}}},
+    }
+
+    refreshed_configuration, gitlab_mock = _read_and_transform(
+        config_path, refresh_cache=True
+    )
+    assert gitlab_mock._get_user_id.called
+
+
+def test__changed_config_is_not_read_from_the_cache(tmp_path):
+    cache_path = tmp_path / "cache"
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(CONFIG.format(cache_path=cache_path))
+    _read_and_transform(config_path)
+
+    config_path.write_text(
+        CONFIG.format(cache_path=cache_path).replace("developer", "maintainer")
+    )
+    configuration, gitlab_mock = _read_and_transform(config_path)
+
+    assert gitlab_mock._get_user_id.called
+    assert (
+        configuration.get("projects_and_groups|foo/*|members|users|a_user|access_level")
+        == 40
+    )
+    assert len(os.listdir(cache_path)) == 2
+
+
+def test__gitlab_section_is_not_stored_and_entries_are_private(tmp_path):
+    cache_path = tmp_path / "cache"
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(CONFIG.format(cache_path=cache_path))
+    _read_and_transform(config_path)
+
+    (entry,) = os.listdir(cache_path)
+    assert b"secret-token" not in (cache_path / entry).read_bytes()
+    assert os.stat(cache_path).st_mode & 0o077 == 0
+    assert os.stat(cache_path / entry).st_mode & 0o077 == 0
+
+    cached_configuration, _ = _read_and_transform(config_path)
+    assert cached_configuration.transformed
+    assert cached_configuration.get("gitlab|token") == "secret-token"
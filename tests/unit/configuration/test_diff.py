@@ -0,0 +1,171 @@
+import subprocess
+from unittest.mock import MagicMock
+
+import pytest
+
+from gitlabform import GitLabForm
+from gitlabform.configuration import Configuration
+from gitlabform.configuration.diff import ConfigurationDiff
+from gitlabform.gitlab import GitLab
+from gitlabform.gitlab.core import NotFoundException
+from gitlabform.lists import Groups, OmissionReason, Projects
+from gitlabform.lists.filter import OmitUnchangedConfigs
+
+OLD_CONFIG = """
+---
+config_version: 3
+application:
+  settings:
+    foo: bar
+projects_and_groups:
+  "*":
+    project_settings:
+      visibility: private
+  some_group/*:
+    group_settings:
+      description: foo
+    variables:
+      foo:
+        key: FOO
+        value: foo
+  some_group/subgroup/*:
+    group_settings:
+      description: bar
+  some_group/subgroup/project:
+    badges:
+      pipeline:
+        name: pipeline
+"""
+
+# the group variables changed (so for all the projects in it), and a new section for one project
+NEW_CONFIG = (
+    OLD_CONFIG.replace("value: foo", "value: changed")
+    + """
+  other_group/project:
+    project_settings:
+      visibility: public
+"""
+)
+
+
+@pytest.fixture
+def configuration_diff():
+    return ConfigurationDiff(
+        Configuration(config_string=NEW_CONFIG),
+        Configuration(config_string=OLD_CONFIG),
+    )
+
+
+@pytest.fixture
+def group_processors():
+    group_processors = MagicMock()
+    group_processors.get_configuration_names.return_value = ["group_settings"]
+    return group_processors
+
+
+@pytest.fixture
+def project_processors():
+    project_processors = MagicMock()
+    project_processors.get_configuration_names.return_value = [
+        "project_settings",
+        "variables",
+        "badges",
+    ]
+    return project_processors
+
+
+def test__only_changed_sections_are_returned(configuration_diff):
+    assert configuration_diff.get_changed_sections_for_application() == []
+    assert configuration_diff.get_changed_sections_for_group("some_group") == [
+        "variables"
+    ]
+    assert configuration_diff.get_changed_sections_for_project(
+        "some_group/subgroup/project"
+    ) == ["variables"]
+    assert configuration_diff.get_changed_sections_for_project(
+        "other_group/project"
+    ) == ["project_settings"]
+    assert (
+        configuration_diff.get_changed_sections_for_project("third_group/project") == []
+    )
+
+
+def test__unchanged_groups_and_projects_are_omitted(
+    configuration_diff, group_processors, project_processors
+):
+    groups = Groups()
+    groups.add_requested(["some_group", "some_group/subgroup"])
+    projects = Projects()
+    projects.add_requested(
+        [
+            "some_group/subgroup/project",
+            "other_group/project",
+            "third_group/project",
+        ]
+    )
+
+    OmitUnchangedConfigs(
+        configuration_diff, group_processors, project_processors
+    ).filter(groups, projects)
+
+    # ...as the group variables are not processed for groups
+    assert groups.get_effective() == []
+    assert projects.get_effective() == [
+        "other_group/project",
+        "some_group/subgroup/project",
+    ]
+    assert projects.get_omitted(OmissionReason.CONFIG_UNCHANGED) == [
+        "third_group/project"
+    ]
+
+
+def test__old_configuration_is_read_from_git(tmp_path):
+    def git(*args):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+            + list(args),
+            cwd=tmp_path,
+            check=True,
+            capture_output=True,
+        )
+
+    config_path = tmp_path / "config.yml"
+    git("init", "-q")
+    config_path.write_text(OLD_CONFIG)
+    git("add", "config.yml")
+    git("commit", "-q", "-m", "old")
+    config_path.write_text(NEW_CONFIG)
+
+    assert (
+        ConfigurationDiff.read_old_configuration("HEAD", str(config_path)) == OLD_CONFIG
+    )
+
+    old_config_path = tmp_path / "old_config.yml"
+    old_config_path.write_text(OLD_CONFIG)
+    assert (
+        ConfigurationDiff.read_old_configuration(str(old_config_path), str(config_path))
+        == OLD_CONFIG
+    )
+
+
+def test__everything_is_processed_if_old_users_cannot_be_found(tmp_path):
+    old_config_path = tmp_path / "old_config.yml"
+    old_config_path.write_text(
+        OLD_CONFIG
+        + """
+    merge_requests_approval_rules:
+      standard:
+        approvals_required: 1
+        users:
+          - deleted_user
+"""
+    )
+    gitlabform = GitLabForm.__new__(GitLabForm)
+    gitlabform.config = str(tmp_path / "config.yml")
+    gitlabform.configuration = Configuration(config_string=NEW_CONFIG)
+    gitlabform.gitlab = MagicMock(GitLab)
+    gitlabform.gitlab._get_user_id.side_effect = NotFoundException(
+        "No users found when searching for username 'deleted_user'"
+    )
+
+    assert gitlabform._get_configuration_diff(str(old_config_path)) is None
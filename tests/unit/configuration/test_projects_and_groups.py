@@ -148,3 +148,50 @@ def test__get_effective_config_for_project__configuration_for_other_project():
             },
         }
     }
+
+
+def test__get_effective_config_for_project__values_are_shared_not_copied():
+    config_yaml = """
+    ---
+    projects_and_groups:
+      "*":
+        files:
+          README.md:
+            content: some long content
+      some_group/*:
+        hooks:
+          a:
+            foo: bar
+        files:
+          LICENSE:
+            content: other long content
+      some_group/some_project:
+        hooks:
+          inherit: false
+          b:
+            bar: foo
+    """
+    configuration = Configuration(config_string=config_yaml)
+
+    common_config = configuration.get_common_config()
+    group_config = configuration.get_effective_config_for_group("some_group")
+    effective_config = configuration.get_effective_config_for_project(
+        "some_group/some_project"
+    )
+
+    assert effective_config == {
+        "files": {
+            "README.md": {"content": "some long content"},
+            "LICENSE": {"content": "other long content"},
+        },
+        "hooks": {"b": {"bar": "foo"}},
+    }
+    # the values not merged on a given level are the same objects as on the more general levels...
+    assert effective_config["files"] is group_config["files"]
+    assert effective_config["files"]["README.md"] is common_config["files"]["README.md"]
+    # ...and merging does not modify the configs it has been made of
+    assert (
+        "inherit"
+        in configuration._get_project_config("some_group/some_project")["hooks"]
+    )
+    assert list(common_config["files"]) == ["README.md"]
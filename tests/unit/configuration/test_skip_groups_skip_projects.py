@@ -1,7 +1,11 @@
 import logging
+from unittest.mock import MagicMock
+
 import pytest
 
 from gitlabform.configuration import Configuration
+from gitlabform.lists import OmissionReason
+from gitlabform.lists.projects import ProjectsProvider
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +53,11 @@ def configuration_for_skip_groups_skip_projects():
         ("group-not-skip/subgroup-skip-wildcard/project-skip", True),
         ("group-not-skip/subgroup-not-skip/project-not-skip", False),
         ("group-not-skip/subgroup-skip/project-not-skip", False),
+        ("Group-Skip-Wildcard/Project-Skip", True),
+        ("GROUP-SKIP/PROJECT-SKIP", True),
+        # the wildcard entries match any path starting with the same characters
+        ("group-skip-wildcard-2/project-skip", True),
+        ("group-skip/project-skip/project-not-skip", False),
     ],
 )
 def test__config_skip_project(project, is_skipped, request):
@@ -74,6 +83,9 @@ def test__config_skip_project(project, is_skipped, request):
         ("group-not-skip/subgroup-skip-wildcard", True),
         ("group-not-skip/subgroup-skip-wildcard/subgroup-skip", True),
         ("group-not-skip/subgroup-not-skip", False),
+        ("Group-Skip", True),
+        ("group-skip/subgroup-not-skip", False),
+        ("group-skip-wildcard-2", True),
     ],
 )
 def test__config_skip_group(group, is_skipped, request):
@@ -85,3 +97,32 @@ def test__config_skip_group(group, is_skipped, request):
         configuration_for_skip_groups_skip_projects.is_group_skipped(group)
         == is_skipped
     )
+
+
+def test__skipped_projects_are_not_requested_from_gitlab(
+    configuration_for_skip_groups_skip_projects,
+):
+    gitlab = MagicMock()
+    gitlab.iterate_projects.side_effect = lambda group, **kwargs: [
+        {"path_with_namespace": f"{group}/project-skip", "archived": False},
+        {"path_with_namespace": f"{group}/project-not-skip", "archived": False},
+    ]
+    groups = MagicMock()
+    groups.get_effective.return_value = [
+        "group-not-skip",
+        "group-skip-wildcard",
+        "group-not-skip/subgroup-skip-wildcard",
+    ]
+
+    projects = ProjectsProvider(
+        gitlab, configuration_for_skip_groups_skip_projects, False, False
+    )._get_projects("ALL", groups)
+
+    # ...as all the projects in the other groups are skipped
+    assert [call.args for call in gitlab.iterate_projects.call_args_list] == [
+        ("group-not-skip",)
+    ]
+    assert projects.get_effective() == ["group-not-skip/project-not-skip"]
+    assert projects.get_omitted(OmissionReason.SKIPPED) == [
+        "group-not-skip/project-skip"
+    ]
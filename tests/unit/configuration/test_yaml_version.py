@@ -23,3 +23,8 @@ def test__default_yaml_11(configuration_with_yes):
     assert configuration_with_yes.get(
         "projects_and_groups|some_group/*|project_settings"
     ) == {"foo": True}
+
+
+def test__config_is_parsed_into_simple_types(configuration_with_yes):
+    assert type(configuration_with_yes.config) is dict
+    assert type(configuration_with_yes.get("projects_and_groups|some_group/*")) is dict
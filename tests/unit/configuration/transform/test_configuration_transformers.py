@@ -0,0 +1,65 @@
+from deepdiff import DeepDiff
+from unittest.mock import MagicMock
+
+from gitlabform.configuration import Configuration
+from gitlabform.configuration.transform import ConfigurationTransformers
+from gitlabform.gitlab import GitLab
+
+
+def test__all_transformers_in_single_pass() -> None:
+    config_yaml = f"""
+    projects_and_groups:
+      "foo/*":
+        merge_requests:
+          approvals:
+            approvals_before_merge: 1
+          approvers:
+            - a_user
+          approver_groups:
+            - a_group
+        protected_environments:
+          prod:
+            deploy_access_levels:
+              - access_level: maintainer
+              - user: other_user
+        members:
+          users:
+            a_user:
+              access_level: developer
+    """
+    configuration = Configuration(config_string=config_yaml)
+
+    gitlab_mock = MagicMock(GitLab)
+    gitlab_mock._get_user_id = MagicMock(side_effect=lambda user: f"{user}_id")
+    gitlab_mock._get_group_id = MagicMock(side_effect=lambda group: f"{group}_id")
+
+    ConfigurationTransformers(gitlab_mock).transform(configuration)
+
+    # ...including the users and groups from the old merge requests syntax transformed into the new one
+    expected_transformed_config = {
+        "projects_and_groups": {
+            "foo/*": {
+                "merge_requests_approval_rules": {
+                    "legacy": {
+                        "approvals_required": 1,
+                        "name": "Approvers (configured using GitLabForm)",
+                        "user_ids": ["a_user_id"],
+                        "group_ids": ["a_group_id"],
+                    }
+                },
+                "protected_environments": {
+                    "prod": {
+                        "name": "prod",
+                        "deploy_access_levels": [
+                            {"access_level": 40},
+                            {"user_id": "other_user_id"},
+                        ],
+                    }
+                },
+                "members": {"users": {"a_user": {"access_level": 30}}},
+            }
+        }
+    }
+
+    assert not DeepDiff(configuration.config, expected_transformed_config)
+    assert configuration.transformed
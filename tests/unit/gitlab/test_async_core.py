@@ -0,0 +1,183 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from gitlabform.gitlab.async_core import AsyncGitLabCore
+from gitlabform.gitlab.core import NotFoundException, UnexpectedResponseException
+from gitlabform.gitlab.groups import GitLabGroups
+from gitlabform.gitlab.rate_limiter import RateLimiter
+from gitlabform.profiler import RequestsProfiler
+from gitlabform.tracing import Tracer
+
+
+class FakeGitLab:
+    """
+    A minimal ASGI app that serves the projects in groups, paginated like GitLab does it.
+    """
+
+    def __init__(self, projects: list, failures: int = 0, total_pages: bool = True):
+        """
+        :param total_pages: if False then the total number of pages is not returned, like for the lists
+                            with more than 10k elements
+        """
+        self.projects = projects
+        self.failures = failures
+        self.total_pages = total_pages
+        self.requests: list = []
+
+    async def __call__(self, scope, receive, send):
+        path = scope["path"].removeprefix("/api/v4/")
+        query = parse_qs(scope["query_string"].decode())
+        self.requests.append((path, query))
+
+        if self.failures:
+            self.failures -= 1
+            await self._respond(send, 502, {}, {"message": "Bad Gateway"})
+            return
+
+        if path.startswith("groups/") and path.endswith("/projects"):
+            group = path.split("/")[1]
+            per_page = int(query["per_page"][0])
+            page = int(query.get("page", ["1"])[0])
+            projects = [
+                project
+                for project in self.projects
+                if project["path_with_namespace"].startswith(group + "/")
+            ]
+            if query.get("pagination") == ["keyset"]:
+                id_after = int(query["id_after"][0]) if "id_after" in query else -1
+                body = [project for project in projects if project["id"] > id_after]
+                headers = {}
+                if len(body) > per_page:
+                    body = body[:per_page]
+                    # ...with another host, like behind a proxy
+                    headers["link"] = (
+                        f"<https://proxy.example.com:8443/api/v4/{path}?per_page={per_page}"
+                        f"&pagination=keyset&order_by=id&sort=asc&id_after={body[-1]['id']}>;"
+                        f' rel="next"'
+                    )
+                await self._respond(send, 200, headers, body)
+                return
+            total_pages = max(1, -(-len(projects) // per_page))
+            headers = {"x-next-page": str(page + 1) if page < total_pages else ""}
+            if self.total_pages:
+                headers["x-total-pages"] = str(total_pages)
+            body = projects[(page - 1) * per_page : page * per_page]
+            await self._respond(send, 200, headers, body)
+        elif path.startswith("projects/"):
+            for project in self.projects:
+                if project["path_with_namespace"] == path.split("/", 1)[1]:
+                    await self._respond(send, 200, {}, project)
+                    return
+            await self._respond(send, 404, {}, {"message": "404 Project Not Found"})
+        else:
+            await self._respond(send, 404, {}, {"message": "404 Not Found"})
+
+    @staticmethod
+    async def _respond(send, status: int, headers: dict, body) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")]
+                + [(key.encode(), value.encode()) for key, value in headers.items()],
+            }
+        )
+        await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+def _make_async_gitlab(fake_gitlab: FakeGitLab) -> AsyncGitLabCore:
+    # don't run the constructor as it connects to GitLab
+    gitlab = GitLabGroups.__new__(GitLabGroups)
+    gitlab.url = "http://gitlab.example.com"
+    gitlab.timeout = 10
+    gitlab.per_page = 2
+    gitlab.ssl_verify = True
+    gitlab.admin = True
+    gitlab.session = MagicMock()
+    gitlab.session.headers = {"private-token": "token"}
+    gitlab.rate_limiter = RateLimiter()
+    gitlab.profiler = RequestsProfiler()
+    gitlab.tracer = Tracer()
+    return AsyncGitLabCore(gitlab, transport=httpx.ASGITransport(app=fake_gitlab))
+
+
+PROJECTS = [
+    {"path_with_namespace": f"{group}/project{i}", "archived": i == 0, "id": i}
+    for group in ["foo", "bar"]
+    for i in range(5)
+]
+
+
+def test__projects_in_groups_are_requested_concurrently():
+    fake_gitlab = FakeGitLab(PROJECTS)
+
+    async def get_projects():
+        async with _make_async_gitlab(fake_gitlab) as async_gitlab:
+            return await asyncio.gather(
+                async_gitlab.get_projects(
+                    "foo", include_archived=True, fields=["path_with_namespace"]
+                ),
+                async_gitlab.get_projects("bar", include_archived=True),
+            )
+
+    foo_projects, bar_projects = asyncio.run(get_projects())
+
+    assert foo_projects == [
+        {"path_with_namespace": f"foo/project{i}"} for i in range(5)
+    ]
+    assert bar_projects == PROJECTS[5:]
+    # 3 pages for each group
+    assert len(fake_gitlab.requests) == 6
+
+
+def test__keyset_pagination_continues_after_the_first_page():
+    projects = [
+        {"path_with_namespace": f"foo/project{i}", "archived": False, "id": i}
+        for i in range(7)
+    ]
+    fake_gitlab = FakeGitLab(projects, total_pages=False)
+
+    async def get_projects():
+        async with _make_async_gitlab(fake_gitlab) as async_gitlab:
+            return await async_gitlab.get_projects("foo")
+
+    assert asyncio.run(get_projects()) == projects
+    # the first page is requested only once, ordered like the next ones
+    first_path, first_query = fake_gitlab.requests[0]
+    assert first_query["order_by"] == ["id"] and "pagination" not in first_query
+    assert [query.get("id_after") for _, query in fake_gitlab.requests[1:]] == [
+        ["1"],
+        ["3"],
+        ["5"],
+    ]
+    assert all(path == first_path for path, _ in fake_gitlab.requests)
+
+
+def test__not_found_and_unexpected_responses():
+    async def get_project(fake_gitlab: FakeGitLab, project: str):
+        async with _make_async_gitlab(fake_gitlab) as async_gitlab:
+            async_gitlab.BACKOFF_FACTOR = 0
+            return await async_gitlab.get_project(project)
+
+    with pytest.raises(NotFoundException):
+        asyncio.run(get_project(FakeGitLab(PROJECTS), "foo/missing"))
+
+    with pytest.raises(UnexpectedResponseException):
+        asyncio.run(get_project(FakeGitLab(PROJECTS, failures=4), "foo/project1"))
+
+
+def test__failed_requests_are_retried():
+    fake_gitlab = FakeGitLab(PROJECTS, failures=2)
+
+    async def get_project():
+        async with _make_async_gitlab(fake_gitlab) as async_gitlab:
+            async_gitlab.BACKOFF_FACTOR = 0
+            return await async_gitlab.get_project("foo/project1")
+
+    assert asyncio.run(get_project())["id"] == 1
+    assert len(fake_gitlab.requests) == 3
@@ -0,0 +1,126 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from gitlabform.gitlab.connections import ConnectionStatistics, GitLabHTTPAdapter
+from gitlabform.gitlab.rate_limiter import RateLimiter
+from gitlabform.profiler import RequestsProfiler
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    barrier = None
+
+    def do_GET(self):
+        if self.barrier:
+            self.barrier.wait(timeout=5)
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(handler=KeepAliveHandler) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+    KeepAliveHandler.barrier = None
+
+
+def _make_session(statistics: ConnectionStatistics, **kwargs) -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", GitLabHTTPAdapter(statistics, **kwargs))
+    return session
+
+
+def test__connections_are_reused(start_server):
+    server = start_server()
+    statistics = ConnectionStatistics()
+    session = _make_session(statistics)
+
+    for _ in range(3):
+        session.get(server).raise_for_status()
+
+    assert statistics.get_statistics() == {
+        "requests": 3,
+        "new connections": 1,
+        "reused connections": 2,
+        "discarded connections": 0,
+    }
+
+
+def test__connections_over_the_pool_size_are_discarded(start_server):
+    server = start_server()
+    # make both requests wait for each other on the server side, so they need 2 connections
+    KeepAliveHandler.barrier = threading.Barrier(2)
+    statistics = ConnectionStatistics()
+    session = _make_session(statistics, pool_maxsize=1)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for response in executor.map(lambda _: session.get(server), range(2)):
+            response.raise_for_status()
+
+    assert statistics.get_statistics() == {
+        "requests": 2,
+        "new connections": 2,
+        "reused connections": 0,
+        "discarded connections": 1,
+    }
+
+
+def test__requests_are_retried_after_too_many_requests(start_server):
+    class TooManyRequestsOnceHandler(KeepAliveHandler):
+        responded = False
+
+        def do_GET(self):
+            if TooManyRequestsOnceHandler.responded:
+                return super().do_GET()
+            TooManyRequestsOnceHandler.responded = True
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    server_url = start_server(TooManyRequestsOnceHandler)
+    rate_limiter = RateLimiter()
+    session = requests.Session()
+    session.mount("http://", GitLabHTTPAdapter(ConnectionStatistics(), rate_limiter))
+
+    assert session.get(server_url).status_code == 200
+    assert rate_limiter.get_statistics()["requests"] == 2
+    assert rate_limiter.get_statistics()["too many requests responses"] == 1
+
+
+def test__requests_are_profiled(start_server):
+    server_url = start_server()
+    profiler = RequestsProfiler(enabled=True)
+    session = requests.Session()
+    session.mount(
+        "http://", GitLabHTTPAdapter(ConnectionStatistics(), profiler=profiler)
+    )
+
+    with profiler.entity("group/project"), profiler.section("members"):
+        session.get(f"{server_url}/api/v4/projects/group%2Fproject/members")
+
+    assert len(profiler.records) == 1
+    record = profiler.records[0]
+    assert record["endpoint"] == "projects/:id/members"
+    assert record["bytes"] == 2
+    assert (record["entity"], record["section"]) == ("group/project", "members")
@@ -0,0 +1,289 @@
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from gitlabform.cache import EntityCache, PersistentCache
+from gitlabform.gitlab import GitLab
+from gitlabform.gitlab.core import NotFoundException
+
+
+def _make_response(status_code: int, headers: dict, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    response._content = body
+    return response
+
+
+@pytest.fixture
+def gitlab(tmp_path):
+    # don't run the constructor as it connects to GitLab
+    gitlab = GitLab.__new__(GitLab)
+    gitlab.url = "https://gitlab.example.com"
+    gitlab.timeout = 10
+    gitlab.per_page = 100
+    gitlab.pagination_fan_out = 4
+    gitlab.session = MagicMock()
+    gitlab.cache = EntityCache()
+    gitlab.cache.persistent = PersistentCache(
+        str(tmp_path / "cache.sqlite"),
+        gitlab.url,
+        conditional_requests=True,
+    )
+    return gitlab
+
+
+def test__not_modified_response_is_served_from_the_store(gitlab):
+    gitlab.session.request.side_effect = [
+        _make_response(200, {"etag": 'W/"abc"', "x-next-page": ""}, b'[{"id": 1}]'),
+        _make_response(304, {"etag": 'W/"abc"'}, b""),
+    ]
+
+    first = gitlab._make_requests_to_api("groups/%s/projects", "foo")
+    second = gitlab._make_requests_to_api("groups/%s/projects", "foo")
+
+    assert first == second == [{"id": 1}]
+    last_call = gitlab.session.request.call_args_list[-1]
+    assert last_call.kwargs["headers"] == {"If-None-Match": 'W/"abc"'}
+    statistics = gitlab.cache.get_statistics()["persistent_responses"]
+    assert statistics["not modified"] == 1
+    assert statistics["modified"] == 1
+
+
+def test__modified_response_replaces_the_stored_one(gitlab):
+    gitlab.session.request.side_effect = [
+        _make_response(200, {"etag": '"1"'}, b'{"id": 1}'),
+        _make_response(200, {"etag": '"2"'}, b'{"id": 2}'),
+        _make_response(304, {}, b""),
+    ]
+
+    gitlab._make_requests_to_api("projects/%s", "foo/bar")
+    gitlab._make_requests_to_api("projects/%s", "foo/bar")
+    third = gitlab._make_requests_to_api("projects/%s", "foo/bar")
+
+    assert third == {"id": 2}
+    last_call = gitlab.session.request.call_args_list[-1]
+    assert last_call.kwargs["headers"] == {"If-None-Match": '"2"'}
+
+
+def test__pages_are_requested_concurrently_and_returned_in_order(gitlab):
+
+    def request(method, url, **kwargs):
+        page = int(url.split("page=")[-1]) if "&page=" in url else 1
+        headers = {"x-total-pages": "5", "x-next-page": "2" if page == 1 else ""}
+        return _make_response(200, headers, f'[{{"id": {page}}}]'.encode())
+
+    gitlab.session.request.side_effect = request
+
+    results = gitlab._make_requests_to_api("groups/%s/members", "foo")
+
+    assert results == [{"id": page} for page in range(1, 6)]
+    assert gitlab.session.request.call_count == 5
+
+
+def test__keyset_pagination_is_used_when_total_pages_is_unknown(gitlab):
+    # ...with a different URL than the configured one, f.e. behind a proxy
+    next_url = (
+        "http://gitlab.internal:8080/gitlab/api/v4/groups/foo%2Fbar/projects"
+        "?id_after=4&pagination=keyset&per_page=100&order_by=id&sort=asc"
+    )
+    gitlab.session.request.side_effect = [
+        _make_response(200, {"x-next-page": "2"}, b'[{"id": 1}, {"id": 2}]'),
+        _make_response(
+            200, {"link": f'<{next_url}>; rel="next"'}, b'[{"id": 3}, {"id": 4}]'
+        ),
+        _make_response(200, {}, b'[{"id": 5}]'),
+    ]
+
+    results = gitlab._make_requests_to_api("groups/%s/projects", "foo/bar")
+
+    assert results == [{"id": id} for id in range(1, 6)]
+    urls = [call.args[1] for call in gitlab.session.request.call_args_list]
+    # the first page is ordered like in the keyset pagination mode, so it's not requested again
+    assert urls == [
+        "https://gitlab.example.com/api/v4/groups/foo%2Fbar/projects"
+        "?per_page=100&order_by=id&sort=asc",
+        "https://gitlab.example.com/api/v4/groups/foo%2Fbar/projects"
+        "?per_page=100&order_by=id&sort=asc&pagination=keyset&id_after=2",
+        "https://gitlab.example.com/api/v4/groups/foo%2Fbar/projects"
+        "?id_after=4&pagination=keyset&per_page=100&order_by=id&sort=asc",
+    ]
+
+
+def test__keyset_pagination_is_used_from_the_start_if_not_ordered_by_id(gitlab):
+    gitlab.session.request.return_value = _make_response(200, {}, b'[{"id": 1}]')
+
+    gitlab._make_requests_to_api(
+        "projects?order_by=updated_at&updated_after=%s", "2024-01-31"
+    )
+
+    urls = [call.args[1] for call in gitlab.session.request.call_args_list]
+    assert urls == [
+        "https://gitlab.example.com/api/v4/projects"
+        "?order_by=updated_at&updated_after=2024-01-31&per_page=100&pagination=keyset"
+    ]
+
+
+def test__keyset_pagination_keeps_the_explicit_ordering(gitlab):
+
+    assert gitlab._supports_keyset_pagination(
+        "projects?order_by=updated_at&updated_after=%s"
+    )
+    assert gitlab._to_keyset_pagination_path(
+        "projects?order_by=updated_at&updated_after=%s&per_page=100"
+    ) == (
+        "projects?order_by=updated_at&updated_after=%s&per_page=100&pagination=keyset"
+    )
+    # ...and it is not used if it doesn't support the ordering
+    assert not gitlab._supports_keyset_pagination("groups/%s/projects?order_by=name")
+
+
+def test__other_lists_are_requested_page_after_page(gitlab):
+    gitlab.session.request.side_effect = [
+        _make_response(200, {"x-next-page": "2"}, b'[{"id": 1}]'),
+        _make_response(200, {"x-next-page": ""}, b'[{"id": 2}]'),
+    ]
+
+    results = gitlab._make_requests_to_api("users")
+
+    assert results == [{"id": 1}, {"id": 2}]
+    urls = [call.args[1] for call in gitlab.session.request.call_args_list]
+    assert urls[1].endswith("users?per_page=100&page=2")
+
+
+def test__pages_are_requested_when_needed(gitlab):
+    gitlab.session.request.side_effect = [
+        _make_response(200, {"x-next-page": "2"}, b'[{"id": 1, "name": "a"}]'),
+        _make_response(200, {"x-next-page": ""}, b'[{"id": 2, "name": "b"}]'),
+    ]
+
+    iterator = gitlab._iterate_requests_to_api("users", fields=["id"])
+
+    assert next(iterator) == {"id": 1}
+    assert gitlab.session.request.call_count == 1
+    assert list(iterator) == [{"id": 2}]
+    assert gitlab.session.request.call_count == 2
+
+
+def test__concurrent_requests_dont_go_too_far_ahead(gitlab):
+    gitlab.pagination_fan_out = 2
+
+    def request(method, url, **kwargs):
+        page = int(url.split("page=")[-1]) if "&page=" in url else 1
+        headers = {"x-total-pages": "10", "x-next-page": "2" if page == 1 else ""}
+        return _make_response(200, headers, f'[{{"id": {page}}}]'.encode())
+
+    gitlab.session.request.side_effect = request
+
+    iterator = gitlab._iterate_requests_to_api("users")
+    assert [next(iterator) for _ in range(3)] == [{"id": 1}, {"id": 2}, {"id": 3}]
+    # the first page + 2 consumed pages + up to 2 pages requested ahead
+    assert gitlab.session.request.call_count <= 5
+    assert len(list(iterator)) == 7
+
+
+def test__group_projects_from_other_namespaces_are_skipped(gitlab):
+    gitlab.admin = True
+    gitlab.session.request.return_value = _make_response(
+        200,
+        {},
+        b"""[
+            {"path_with_namespace": "foo/a", "archived": false, "id": 1},
+            {"path_with_namespace": "bar/b", "archived": true, "id": 2},
+            {"path_with_namespace": "foo/c/d", "archived": true, "id": 3}
+        ]""",
+    )
+
+    projects = gitlab.iterate_projects(
+        "foo", include_archived=True, fields=["path_with_namespace", "archived"]
+    )
+
+    assert list(projects) == [
+        {"path_with_namespace": "foo/a", "archived": False},
+        {"path_with_namespace": "foo/c/d", "archived": True},
+    ]
+
+
+def test__stored_id_is_used_without_checking_it(gitlab):
+    gitlab.cache.persistent.put_id("groups", "Foo", 1)
+
+    assert gitlab._get_group_id("Foo") == 1
+    assert gitlab._get_group_id("foo") == 1
+    gitlab.session.request.assert_not_called()
+
+
+def test__deleted_project_id_is_resolved_again_when_used(gitlab):
+    gitlab.cache.persistent.put_id("projects", "foo/bar", 1)
+    gitlab.session.request.side_effect = [
+        # the project with the stored id has been deleted...
+        _make_response(404, {}, b'{"message": "404 Project Not Found"}'),
+        # ...and another one has been created under its path
+        _make_response(200, {}, b'{"id": 2, "path_with_namespace": "foo/bar"}'),
+        _make_response(200, {}, b'{"approvals_before_merge": 1}'),
+    ]
+
+    approvals = gitlab._make_requests_to_api(
+        "projects/%s/approvals", gitlab._get_project_id("foo/bar")
+    )
+
+    assert approvals == {"approvals_before_merge": 1}
+    assert "/projects/2/approvals?" in gitlab.session.request.call_args[0][1]
+    assert gitlab.cache.persistent.get_id("projects", "foo/bar") == 2
+    assert gitlab._get_project_id("foo/bar") == "2"
+
+
+def test__transferred_project_id_is_resolved_again_when_used(gitlab):
+    gitlab.cache.persistent.put_id("projects", "foo/bar", 1)
+    gitlab.session.request.side_effect = [
+        # the project with the stored id has been transferred...
+        _make_response(200, {}, b'{"id": 1, "path_with_namespace": "baz/bar"}'),
+        # ...and another one has been created under its old path
+        _make_response(200, {}, b'{"id": 2, "path_with_namespace": "foo/bar"}'),
+        _make_response(200, {}, b'{"id": 2, "path_with_namespace": "foo/bar"}'),
+    ]
+
+    project = gitlab._make_requests_to_api(
+        "projects/%s", gitlab._get_project_id("foo/bar")
+    )
+
+    assert project["id"] == 2
+    assert gitlab.cache.persistent.get_id("projects", "foo/bar") == 2
+
+
+def test__valid_stored_id_is_not_resolved_again(gitlab):
+    gitlab.cache.persistent.put_id("groups", "Foo", 1)
+    gitlab.session.request.side_effect = [
+        _make_response(200, {}, b'{"id": 1, "full_path": "foo"}'),
+        _make_response(404, {}, b'{"message": "404 Not found"}'),
+    ]
+
+    gitlab._make_requests_to_api("groups/%s", gitlab._get_group_id("Foo"))
+    # ...as it has been confirmed by the previous request
+    with pytest.raises(NotFoundException):
+        gitlab._make_requests_to_api("groups/%s/badges/%s", (1, 5))
+
+    assert gitlab.session.request.call_count == 2
+    assert gitlab.cache.persistent.get_id("groups", "foo") == 1
+
+
+def test__list_fingerprint_is_its_etag(gitlab):
+    gitlab.session.request.side_effect = [
+        _make_response(200, {"etag": 'W/"abc"'}, b'[{"id": 1}]'),
+        _make_response(200, {}, b'[{"id": 1}]'),
+        _make_response(200, {}, b'[{"id": 1}]'),
+    ]
+
+    assert gitlab.get_list_fingerprint("projects/%s/variables", "foo/bar") == 'W/"abc"'
+    # ...or a hash of the list, if there is no ETag
+    assert gitlab.get_list_fingerprint(
+        "projects/%s/variables", "foo/bar"
+    ) == gitlab.get_list_fingerprint("projects/%s/badges", "foo/bar")
+
+
+def test__lists_with_many_pages_have_no_fingerprint(gitlab):
+    gitlab.session.request.return_value = _make_response(
+        200, {"etag": 'W/"abc"', "x-next-page": "2"}, b'[{"id": 1}]'
+    )
+
+    assert gitlab.get_list_fingerprint("projects/%s/hooks", "foo/bar") is None
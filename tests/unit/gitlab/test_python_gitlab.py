@@ -1,6 +1,7 @@
 import pytest
-from gitlab import GitlabGetError
+from gitlab import GitlabGetError, GitlabHttpError
 
+from gitlabform.cache import PersistentCache
 from gitlabform.gitlab.python_gitlab import PythonGitlab
 from unittest.mock import MagicMock
 
@@ -65,3 +66,81 @@ class TestPythonGitlab:
 
         expected = [dict(id=member_role_id, name=role_name)]
         assert member_roles == expected
+
+    def test_get_user_by_username_cached_resolves_outdated_persistently_cached_user_again(
+        self,
+    ):
+        python_gitlab = PythonGitlab(MagicMock())
+        python_gitlab.cache.persistent = MagicMock()
+        python_gitlab.cache.persistent.get_id.return_value = 1
+
+        # the cached id now belongs to a different user
+        old_user = MagicMock(id=1, username="someone_else")
+        new_user = MagicMock(id=2, username="john")
+        python_gitlab.users = MagicMock()
+        python_gitlab.users.get.side_effect = lambda user_id: {
+            1: old_user,
+            2: new_user,
+        }[user_id]
+        python_gitlab.users.list.return_value = [new_user]
+
+        user = python_gitlab.get_user_by_username_cached("john")
+
+        assert user is new_user
+        python_gitlab.cache.persistent.delete_id.assert_called_with("users", "john")
+        python_gitlab.cache.persistent.put_id.assert_called_with("users", "john", 2)
+
+    def test_too_many_requests_responses_are_not_retried_again(self):
+        session = MagicMock()
+        response = MagicMock(status_code=429, headers={}, reason="Too Many Requests")
+        response.json.return_value = {"message": "429 Too Many Requests"}
+        session.request.return_value = response
+        python_gitlab = PythonGitlab(
+            MagicMock(),
+            url="https://gitlab.example.com",
+            retry_transient_errors=True,
+            session=session,
+        )
+
+        with pytest.raises(GitlabHttpError):
+            python_gitlab.http_request("get", "/projects/1")
+
+        # ...as the HTTP adapter of the session has retried it already
+        assert session.request.call_count == 1
+
+    def test_request_with_outdated_persistently_cached_group_id_is_repeated(
+        self, tmp_path
+    ):
+        def response(status_code, body):
+            response = MagicMock(
+                status_code=status_code,
+                headers={"Content-Type": "application/json"},
+                reason="",
+            )
+            response.json.return_value = body
+            response.content = str(body).encode()
+            return response
+
+        session = MagicMock()
+        session.request.side_effect = [
+            # the group with the stored id has been deleted and another one created under its path
+            response(404, {"message": "404 Group Not Found"}),
+            response(200, {"id": 2, "full_path": "foo"}),
+            response(201, {"id": 5}),
+        ]
+        python_gitlab = PythonGitlab(
+            MagicMock(), url="https://gitlab.example.com", session=session
+        )
+        python_gitlab.cache.persistent = PersistentCache(
+            str(tmp_path / "cache.sqlite"), "https://gitlab.example.com"
+        )
+        python_gitlab.cache.persistent.put_id("groups", "foo", 1)
+
+        group_id = python_gitlab.get_group_id("foo")
+        python_gitlab.http_request(
+            "post", "/projects/5/share", post_data={"group_id": group_id}
+        )
+
+        assert session.request.call_args.kwargs["json"] == {"group_id": 2}
+        assert python_gitlab.cache.persistent.get_id("groups", "foo") == 2
+        assert python_gitlab.get_group_id("foo") == 2
@@ -0,0 +1,84 @@
+from gitlabform.gitlab.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _make_rate_limiter(clock: FakeClock, **kwargs) -> RateLimiter:
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test__no_waiting_without_limits():
+    clock = FakeClock()
+    rate_limiter = _make_rate_limiter(clock)
+
+    for _ in range(100):
+        rate_limiter.acquire()
+
+    assert clock.now == 1000.0
+    assert rate_limiter.get_statistics()["throttled seconds"] == 0
+
+
+def test__configured_rate_is_kept_after_the_burst():
+    clock = FakeClock()
+    rate_limiter = _make_rate_limiter(clock, requests_per_second=10, burst=5)
+
+    for _ in range(25):
+        rate_limiter.acquire()
+
+    # 5 requests at once, then 20 more at 10 per second
+    assert round(clock.now - 1000.0, 2) == 2.0
+
+
+def test__rate_adapts_to_the_remaining_requests():
+    clock = FakeClock()
+    rate_limiter = _make_rate_limiter(clock, requests_per_second=100, burst=1)
+
+    rate_limiter.update(200, {"RateLimit-Remaining": "20", "RateLimit-Reset": "1010"})
+    for _ in range(21):
+        rate_limiter.acquire()
+
+    assert rate_limiter.rate == 2
+    assert round(clock.now - 1000.0, 2) == 10.0
+
+
+def test__no_requests_until_reset_if_none_remaining():
+    clock = FakeClock()
+    rate_limiter = _make_rate_limiter(clock)
+
+    rate_limiter.update(200, {"RateLimit-Remaining": "0", "RateLimit-Reset": "1030"})
+    rate_limiter.acquire()
+
+    assert clock.now == 1030.0
+
+
+def test__too_many_requests_pauses_for_retry_after():
+    clock = FakeClock()
+    rate_limiter = _make_rate_limiter(clock)
+
+    rate_limiter.update(429, {"Retry-After": "7"})
+    rate_limiter.acquire()
+    rate_limiter.acquire()
+
+    assert clock.now == 1007.0
+    statistics = rate_limiter.get_statistics()
+    assert statistics["too many requests responses"] == 1
+    assert statistics["throttled seconds"] == 7.0
+
+
+def test__too_many_requests_without_headers_pauses_for_a_second():
+    clock = FakeClock()
+    rate_limiter = _make_rate_limiter(clock)
+
+    rate_limiter.update(429, {})
+    rate_limiter.acquire()
+
+    assert clock.now == 1000.0 + RateLimiter.DEFAULT_RETRY_AFTER
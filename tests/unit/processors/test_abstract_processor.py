@@ -1,4 +1,5 @@
 from gitlabform.processors import AbstractProcessor
+from gitlabform.processors.util.decorators import configuration_to_safe_dict
 
 
 class TestRecursiveDiffAnalyzer:
@@ -37,3 +38,28 @@ class TestRecursiveDiffAnalyzer:
         assert AbstractProcessor.recursive_diff_analyzer(
             "deploy_access_levels", self._cfg_a, modified_cfg
         )
+
+
+class TestConfigurationToSafeDict:
+    def test__processed_section_is_copied(self) -> None:
+        class Processor:
+            configuration_name = "labels"
+
+            @configuration_to_safe_dict
+            def process(self, project_and_group, configuration):
+                assert configuration.get("labels|foo|color") == "red"
+                configuration["labels"].pop("enforce")
+                return configuration
+
+        shared_config = {"labels": {"enforce": True, "foo": {"color": "red"}}}
+        other_section_config = {"foo": "bar"}
+        configuration = {
+            "labels": shared_config["labels"],
+            "other": other_section_config,
+        }
+
+        processed_configuration = Processor().process("group/project", configuration)
+
+        assert processed_configuration["labels"] == {"foo": {"color": "red"}}
+        assert shared_config["labels"]["enforce"]
+        assert processed_configuration["other"] is other_section_config
@@ -0,0 +1,14 @@
+from unittest.mock import MagicMock
+
+from gitlabform.processors.group import GroupProcessors
+from gitlabform.processors.project import ProjectProcessors
+
+
+def test__all_processors_share_a_single_python_gitlab_client():
+    gitlab = MagicMock()
+
+    project_processors = ProjectProcessors(gitlab, MagicMock(), strict=False)
+    group_processors = GroupProcessors(gitlab, MagicMock(), strict=False)
+
+    for processor in project_processors.processors + group_processors.processors:
+        assert processor.gl is gitlab.python_gitlab
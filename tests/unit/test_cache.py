@@ -0,0 +1,161 @@
+import pytest
+
+from gitlabform.cache import (
+    CacheNamespace,
+    EntityCache,
+    EvictionPolicy,
+    PersistentCache,
+    cached,
+)
+from gitlabform.constants import EXIT_INVALID_INPUT
+
+
+class ProjectsGetter:
+    def __init__(self, cache: EntityCache):
+        self.cache = cache
+        self.calls = 0
+
+    @cached("projects")
+    def get_project(self, name: str, lazy: bool = False) -> dict:
+        self.calls += 1
+        return {"name": name}
+
+
+def test__lru_evicts_the_least_recently_used_entry():
+    namespace = CacheNamespace("test", maxsize=2, policy=EvictionPolicy.LRU)
+    namespace.put(("get", ("a",)), 1)
+    namespace.put(("get", ("b",)), 2)
+    namespace.get(("get", ("a",)))
+    namespace.put(("get", ("c",)), 3)
+
+    assert namespace.get(("get", ("a",))) == (True, 1)
+    assert namespace.get(("get", ("b",))) == (False, None)
+    assert namespace.evictions == 1
+
+
+def test__fifo_evicts_the_oldest_entry():
+    namespace = CacheNamespace("test", maxsize=2, policy=EvictionPolicy.FIFO)
+    namespace.put(("get", ("a",)), 1)
+    namespace.put(("get", ("b",)), 2)
+    namespace.get(("get", ("a",)))
+    namespace.put(("get", ("c",)), 3)
+
+    assert namespace.get(("get", ("a",))) == (False, None)
+    assert namespace.get(("get", ("b",))) == (True, 2)
+
+
+def test__zero_maxsize_disables_caching():
+    namespace = CacheNamespace("test", maxsize=0)
+    namespace.put(("get", ("a",)), 1)
+
+    assert len(namespace) == 0
+
+
+def test__cached_method_counts_hits_and_misses():
+    cache = EntityCache()
+    getter = ProjectsGetter(cache)
+
+    getter.get_project("group/project")
+    getter.get_project(name="group/project")
+    getter.get_project("group/project", lazy=True)
+
+    assert getter.calls == 2
+    statistics = cache.get_statistics()["projects"]
+    assert statistics["hits"] == 1
+    assert statistics["misses"] == 2
+
+
+def test__invalidate_removes_entries_about_the_entity():
+    cache = EntityCache()
+    getter = ProjectsGetter(cache)
+
+    getter.get_project("group/project")
+    getter.get_project("group/project", lazy=True)
+    getter.get_project("group/other_project")
+    cache.invalidate("projects", "group/project")
+    getter.get_project("group/project")
+    getter.get_project("group/other_project")
+
+    assert getter.calls == 4
+
+
+def test__configure():
+    cache = EntityCache()
+    cache.configure({"projects": {"maxsize": 5, "policy": "FIFO"}})
+
+    assert cache.namespaces["projects"].maxsize == 5
+    assert cache.namespaces["projects"].policy == EvictionPolicy.FIFO
+
+
+@pytest.mark.parametrize(
+    "cache_configuration",
+    [{"foo": {"maxsize": 5}}, {"projects": {"policy": "random"}}],
+)
+def test__configure_invalid(cache_configuration):
+    with pytest.raises(SystemExit) as e:
+        EntityCache().configure(cache_configuration)
+    assert e.value.code == EXIT_INVALID_INPUT
+
+
+def test__persistent_cache_stores_ids_per_gitlab_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+
+    PersistentCache(path, "https://gitlab.example.com").put_id("users", "John", 42)
+
+    assert (
+        PersistentCache(path, "https://gitlab.example.com").get_id("users", "john")
+        == 42
+    )
+    assert (
+        PersistentCache(path, "https://other.example.com").get_id("users", "john")
+        is None
+    )
+
+
+def test__persistent_cache_entries_expire(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    PersistentCache(path, "https://gitlab.example.com").put_id("groups", "foo", 1)
+
+    cache = PersistentCache(path, "https://gitlab.example.com", ttl=-1)
+
+    assert cache.get_id("groups", "foo") is None
+
+
+def test__persistent_cache_refresh_resolves_ids_again(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    PersistentCache(path, "https://gitlab.example.com").put_id("groups", "foo", 1)
+
+    cache = PersistentCache(path, "https://gitlab.example.com", refresh=True)
+
+    assert cache.get_or_resolve_id("groups", "foo", lambda: 2) == 2
+    assert (
+        PersistentCache(path, "https://gitlab.example.com").get_id("groups", "foo") == 2
+    )
+
+
+def test__disabled_persistent_cache_always_resolves():
+    cache = PersistentCache()
+    cache.put_id("groups", "foo", 1)
+
+    assert cache.get_or_resolve_id("groups", "foo", lambda: 2) == 2
+
+
+def test__persistent_cache_drops_outdated_ids_used_in_requests(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    PersistentCache(path, "https://gitlab.example.com").put_id("groups", "foo", 1)
+    PersistentCache(path, "https://gitlab.example.com").put_id("users", "john", 5)
+
+    cache = PersistentCache(path, "https://gitlab.example.com")
+
+    assert cache.get_or_resolve_id("groups", "foo", lambda: 2) == 1
+    assert cache.get_or_resolve_id("users", "john", lambda: 6) == 5
+    # ...as it's not an id returned from the cache
+    assert cache.drop_outdated_ids("groups/3/members") == []
+    assert cache.drop_outdated_ids("projects/3/share", {"group_id": 1}) == [
+        ("groups", 1, "foo")
+    ]
+    assert cache.get_id("groups", "foo") is None
+    # the user with the stored id still has the username that it has been stored for
+    assert cache.drop_outdated_ids("users/5", entity={"username": "John"}) == []
+    assert cache.drop_outdated_ids("users/5/memberships") == []
+    assert cache.get_id("users", "john") == 5
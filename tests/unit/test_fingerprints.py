@@ -0,0 +1,184 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from gitlabform.fingerprints import SectionsFingerprints
+from gitlabform.processors import AbstractProcessors
+from gitlabform.processors.abstract_processor import AbstractProcessor
+from gitlabform.profiler import RequestsProfiler
+from gitlabform.tracing import Tracer
+
+
+def test__stored_fingerprints_are_used_in_the_next_run(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    fingerprints = SectionsFingerprints(path, "https://gitlab.example.com")
+    assert not fingerprints.can_skip("group/project")
+
+    fingerprints.put("Group/Project", "variables", "config1", "remote1")
+    fingerprints.write()
+
+    fingerprints = SectionsFingerprints(path, "https://gitlab.example.com")
+    assert fingerprints.is_unchanged("group/project", "variables", "config1", "remote1")
+    assert not fingerprints.is_unchanged(
+        "group/project", "variables", "config2", "remote1"
+    )
+    assert not fingerprints.is_unchanged(
+        "group/project", "variables", "config1", "remote2"
+    )
+    assert not fingerprints.is_unchanged("group/project", "variables", "config1", None)
+    assert not fingerprints.is_unchanged(
+        "group/project", "badges", "config1", "remote1"
+    )
+    assert fingerprints.skipped == 1
+
+    fingerprints.full_verify = True
+    assert not fingerprints.is_unchanged(
+        "group/project", "variables", "config1", "remote1"
+    )
+
+
+def test__fingerprints_are_kept_per_gitlab_instance(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    fingerprints = SectionsFingerprints(path, "https://gitlab.example.com")
+    fingerprints.put("group/project", "variables", "config1", "remote1")
+    fingerprints.write()
+
+    other_fingerprints = SectionsFingerprints(path, "https://other.example.com")
+    assert not other_fingerprints.can_skip("group/project")
+    other_fingerprints.put("group/project", "variables", "config2", "remote2")
+    other_fingerprints.write()
+
+    fingerprints = SectionsFingerprints(path, "https://gitlab.example.com")
+    assert fingerprints.is_unchanged("group/project", "variables", "config1", "remote1")
+
+
+def test__disabled_fingerprints_are_not_stored(tmp_path):
+    fingerprints = SectionsFingerprints(None, "https://gitlab.example.com")
+
+    fingerprints.put("group/project", "variables", "config1", "remote1")
+    fingerprints.write()
+
+    assert not fingerprints.can_skip("group/project")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def make_processors(tmp_path):
+    # the processors of the consecutive runs, sharing the fingerprints file
+    def make_processors(remote_fingerprint):
+        gitlab = MagicMock()
+        gitlab.profiler = RequestsProfiler()
+        gitlab.tracer = Tracer()
+        gitlab.fingerprints = SectionsFingerprints(
+            str(tmp_path / "fingerprints.json"), "https://gitlab.example.com"
+        )
+        processors = AbstractProcessors(gitlab, MagicMock(), False)
+        for section in ["variables", "badges", "members"]:
+            processor = MagicMock()
+            processor.configuration_name = section
+            # there is no cheap remote fingerprint of the members
+            processor.get_remote_fingerprint.return_value = (
+                None if section == "members" else remote_fingerprint
+            )
+            processor.has_reported_failures.return_value = False
+            processors.processors.append(processor)
+        return processors
+
+    return make_processors
+
+
+def _process(processors, configuration):
+    processors.process_entity(
+        "group/project",
+        configuration,
+        dry_run=False,
+        diff_only_changed=False,
+        effective_configuration=MagicMock(),
+        only_sections="all",
+    )
+    processors.gitlab.fingerprints.write()
+    return [
+        processor.configuration_name
+        for processor in processors.processors
+        if processor.process.called
+    ]
+
+
+def test__only_changed_sections_are_processed(make_processors):
+    configuration = {
+        "variables": {"foo": {"key": "FOO"}},
+        "badges": {},
+        "members": {},
+    }
+
+    processors = make_processors("remote1")
+    assert _process(processors, configuration) == [
+        "variables",
+        "badges",
+        "members",
+    ]
+
+    processors = make_processors("remote1")
+    changed_configuration = configuration | {"badges": {"enforce": True}}
+    assert _process(processors, changed_configuration) == [
+        "badges",
+        "members",
+    ]
+
+    processors = make_processors("remote2")
+    assert _process(processors, changed_configuration) == [
+        "variables",
+        "badges",
+        "members",
+    ]
+
+    processors = make_processors("remote2")
+    processors.gitlab.fingerprints.full_verify = True
+    assert _process(processors, changed_configuration) == [
+        "variables",
+        "badges",
+        "members",
+    ]
+
+
+def test__sections_with_reported_failures_are_processed_again(make_processors):
+    configuration = {
+        "variables": {"foo": {"key": "FOO"}},
+        "badges": {},
+        "members": {},
+    }
+
+    processors = make_processors("remote1")
+    # f.e. some of the badges could not be added, in the non-strict mode
+    processors.processors[1].has_reported_failures.return_value = True
+    assert _process(processors, configuration) == [
+        "variables",
+        "badges",
+        "members",
+    ]
+
+    processors = make_processors("remote1")
+    assert _process(processors, configuration) == ["badges", "members"]
+
+
+class FailingProcessor(AbstractProcessor):
+    def __init__(self, fail: bool):
+        super().__init__("badges", MagicMock())
+        self.fail = fail
+
+    def _process_configuration(self, project_and_group: str, configuration: dict):
+        if self.fail:
+            self._warn_about_failure("Adding badge failed!")
+
+
+def test__processor_reports_failures_of_the_last_section_only():
+    for fail in [True, False]:
+        processor = FailingProcessor(fail)
+        processor.process(
+            "group/project",
+            {"badges": {}},
+            False,
+            False,
+            MagicMock(),
+        )
+        assert processor.has_reported_failures() == fail
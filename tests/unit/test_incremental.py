@@ -0,0 +1,145 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from gitlabform.gitlab.core import UnexpectedResponseException
+from gitlabform.incremental import IncrementalState
+from gitlabform.lists import Groups, OmissionReason, Projects
+from gitlabform.lists.filter import OmitUnchanged
+
+GITLAB_URL = "https://gitlab.example.com"
+
+CONFIGS = {
+    "group1": {"group_settings": {"description": "1"}},
+    "group2": {"group_settings": {"description": "2"}},
+    "group1/project1": {"project_settings": {"visibility": "private"}},
+    "group1/project2": {"project_settings": {"visibility": "private"}},
+    "group2/project3": {"project_settings": {"visibility": "private"}},
+}
+
+
+@pytest.fixture
+def gitlab():
+    gitlab = MagicMock()
+    gitlab.admin = True
+    gitlab.iterate_projects_changed_since.return_value = iter([])
+    gitlab.iterate_audit_events_since.return_value = []
+    return gitlab
+
+
+@pytest.fixture
+def configuration():
+    configuration = MagicMock()
+    configuration.get_effective_config_for_group.side_effect = CONFIGS.get
+    configuration.get_effective_config_for_project.side_effect = CONFIGS.get
+    return configuration
+
+
+def _make_entities(groups_list, projects_list):
+    groups = Groups()
+    groups.add_requested(groups_list)
+    projects = Projects()
+    projects.add_requested(projects_list)
+    return groups, projects
+
+
+def _audit_event(entity_type, path):
+    return {"entity_type": entity_type, "details": {"entity_path": path}}
+
+
+def test__time_is_normalized_to_utc():
+    assert (
+        IncrementalState.parse_time("2024-01-31T14:00:00+02:00")
+        == "2024-01-31T12:00:00Z"
+    )
+    assert IncrementalState.parse_time("2024-01-31") == "2024-01-31T00:00:00Z"
+    assert IncrementalState.parse_time("state.json") is None
+
+
+def test__state_file_keeps_the_watermark_and_configs(tmp_path):
+    path = str(tmp_path / "state.json")
+
+    state = IncrementalState(path, GITLAB_URL)
+    assert state.since is None
+    assert state.is_config_changed("Group/Project", {"foo": "bar"})
+    state.write()
+
+    next_state = IncrementalState(path, GITLAB_URL)
+    assert next_state.since == state.started_at
+    assert not next_state.is_config_changed("group/project", {"foo": "bar"})
+    assert next_state.is_config_changed("group/project", {"foo": "baz"})
+
+
+def test__configs_are_not_compared_when_time_is_given():
+    state = IncrementalState("2024-01-31T12:00:00Z", GITLAB_URL)
+
+    assert state.since == "2024-01-31T12:00:00Z"
+    assert not state.is_config_changed("group/project", {"foo": "bar"})
+
+
+def test__only_changed_and_audited_entities_are_processed(gitlab, configuration):
+    gitlab.iterate_projects_changed_since.return_value = iter(
+        ["Group1/Project1", "other/project"]
+    )
+    gitlab.iterate_audit_events_since.return_value = [
+        _audit_event("Group", "group2"),
+        _audit_event("Project", "group2/project3"),
+        _audit_event("User", "someone"),
+    ]
+    groups, projects = _make_entities(
+        ["group1", "group2"],
+        ["group1/project1", "group1/project2", "group2/project3"],
+    )
+    state = IncrementalState("2024-01-31T12:00:00Z", GITLAB_URL)
+
+    OmitUnchanged(gitlab, configuration, state).filter(groups, projects)
+
+    gitlab.iterate_projects_changed_since.assert_called_once_with(
+        "2024-01-31T12:00:00Z"
+    )
+    assert groups.get_effective() == ["group2"]
+    assert projects.get_effective() == ["group1/project1", "group2/project3"]
+    assert projects.get_omitted(OmissionReason.UNCHANGED) == ["group1/project2"]
+
+
+def test__entities_with_changed_configs_are_processed(gitlab, configuration, tmp_path):
+    path = str(tmp_path / "state.json")
+    state = IncrementalState(path, GITLAB_URL)
+    for entity, entity_configuration in CONFIGS.items():
+        state.is_config_changed(entity, entity_configuration)
+    state.write()
+
+    groups, projects = _make_entities(
+        ["group1", "group2"],
+        ["group1/project1", "group1/project2", "group2/project3"],
+    )
+    changed_configs = CONFIGS | {
+        "group1": {"group_settings": {"description": "changed"}},
+        "group1/project2": {"project_settings": {"visibility": "public"}},
+    }
+    configuration.get_effective_config_for_group.side_effect = changed_configs.get
+    configuration.get_effective_config_for_project.side_effect = changed_configs.get
+
+    OmitUnchanged(gitlab, configuration, IncrementalState(path, GITLAB_URL)).filter(
+        groups, projects
+    )
+
+    assert groups.get_effective() == ["group1"]
+    assert projects.get_effective() == ["group1/project2"]
+
+
+def test__all_groups_are_processed_without_audit_events(gitlab, configuration):
+    gitlab.admin = False
+    gitlab.iterate_audit_events_since.side_effect = UnexpectedResponseException(
+        "Forbidden", 403, ""
+    )
+    groups, projects = _make_entities(["group1", "group2"], ["group1/project1"])
+    state = IncrementalState("2024-01-31T12:00:00Z", GITLAB_URL)
+
+    OmitUnchanged(gitlab, configuration, state).filter(groups, projects)
+
+    gitlab.iterate_audit_events_since.assert_called_once_with(
+        "2024-01-31T12:00:00Z", "group1"
+    )
+    assert groups.get_effective() == ["group1", "group2"]
+    assert projects.get_effective() == []
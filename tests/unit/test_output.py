@@ -0,0 +1,45 @@
+import threading
+
+from gitlabform.output import EntityOutputBuffer, info
+
+
+def test__output_is_written_through_when_not_buffered(capsys):
+    output_buffer = EntityOutputBuffer()
+
+    with output_buffer.installed():
+        info("not buffered")
+
+    assert capsys.readouterr().out == "not buffered\n"
+
+
+def test__buffered_output_of_each_thread_is_printed_atomically(capsys):
+    output_buffer = EntityOutputBuffer()
+    both_threads_started = threading.Barrier(2)
+
+    def print_lines(name: str):
+        with output_buffer.buffered():
+            info(f"{name} line 1")
+            # make sure that the other thread writes its output in the meantime
+            both_threads_started.wait()
+            info(f"{name} line 2")
+
+    with output_buffer.installed():
+        threads = [
+            threading.Thread(target=print_lines, args=(name,))
+            for name in ["first", "second"]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    lines = capsys.readouterr().out.splitlines()
+
+    assert sorted(lines) == [
+        "first line 1",
+        "first line 2",
+        "second line 1",
+        "second line 2",
+    ]
+    for name in ["first", "second"]:
+        assert lines.index(f"{name} line 2") == lines.index(f"{name} line 1") + 1
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from gitlabform.parallel import DependentTasksExecutor, get_namespace_dependencies
+
+
+def test__get_namespace_dependencies():
+    groups = ["a", "a/b", "A/b/c/d", "x"]
+    projects = ["a/project", "a/b/c/project", "y/project", "x/z/project"]
+
+    assert get_namespace_dependencies(groups, projects) == {
+        "a": set(),
+        "a/b": {"a"},
+        "A/b/c/d": {"a/b"},
+        "x": set(),
+        "a/project": {"a"},
+        "a/b/c/project": {"a/b"},
+        "y/project": set(),
+        "x/z/project": {"x"},
+    }
+
+
+def test__tasks_start_after_their_dependencies():
+    finished = []
+    lock = threading.Lock()
+
+    def task(name: str, duration: float):
+        def run():
+            time.sleep(duration)
+            with lock:
+                finished.append(name)
+            return name.upper()
+
+        return run
+
+    tasks = {
+        "parent": task("parent", 0.2),
+        "child": task("child", 0),
+        "grandchild": task("grandchild", 0),
+        "independent": task("independent", 0),
+    }
+    dependencies = {
+        "child": {"parent"},
+        "grandchild": {"child"},
+    }
+
+    with DependentTasksExecutor(max_workers=4) as executor:
+        results = dict(executor.run(tasks, dependencies))
+
+    assert results == {
+        "parent": "PARENT",
+        "child": "CHILD",
+        "grandchild": "GRANDCHILD",
+        "independent": "INDEPENDENT",
+    }
+    # the independent task doesn't have to wait for the slow parent
+    assert finished.index("independent") < finished.index("parent")
+    assert (
+        finished.index("parent")
+        < finished.index("child")
+        < finished.index("grandchild")
+    )
+
+
+def test__dependencies_not_in_tasks_are_ignored():
+    tasks = {"child": lambda: "done"}
+    dependencies = {"child": {"skipped_parent"}}
+
+    with DependentTasksExecutor(max_workers=2) as executor:
+        assert list(executor.run(tasks, dependencies)) == [("child", "done")]
@@ -0,0 +1,160 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from gitlabform.fingerprints import SectionsFingerprints
+from gitlabform.plan import Plan, PlanConflictException
+from gitlabform.processors import AbstractProcessors
+from gitlabform.processors.project.variables_processor import VariablesProcessor
+from gitlabform.profiler import RequestsProfiler
+from gitlabform.tracing import Tracer
+
+
+VARIABLES_IN_GITLAB = [
+    {"key": "SAME", "value": "1", "environment_scope": "*"},
+    {"key": "CHANGED", "value": "old", "environment_scope": "*"},
+    {"key": "NOT_CONFIGURED", "value": "2", "environment_scope": "*"},
+]
+
+CONFIGURATION = {
+    "variables": {
+        "enforce": True,
+        "same": {"key": "SAME", "value": "1"},
+        "changed": {"key": "CHANGED", "value": "new"},
+        "new": {"key": "NEW", "value": "3"},
+    }
+}
+
+
+@pytest.fixture
+def variables_in_gitlab():
+    return [dict(variable) for variable in VARIABLES_IN_GITLAB]
+
+
+@pytest.fixture
+def processor(variables_in_gitlab):
+    gitlab = MagicMock()
+    gitlab.get_project_settings.return_value = {"builds_access_level": "enabled"}
+    gitlab.get_variables.side_effect = lambda project: [
+        dict(variable) for variable in variables_in_gitlab
+    ]
+    return VariablesProcessor(gitlab)
+
+
+def test__fingerprint_does_not_depend_on_the_keys_order():
+    assert Plan.fingerprint({"a": 1, "b": [1, 2]}) == Plan.fingerprint(
+        {"b": [1, 2], "a": 1}
+    )
+    assert Plan.fingerprint({"a": 1}) != Plan.fingerprint({"a": 2})
+
+
+def test__written_plan_can_be_read(tmp_path):
+    plan = Plan("ALL_DEFINED", "https://gitlab.example.com")
+    plan.add_entity(
+        "group/project",
+        {
+            "variables": {
+                "config": "c",
+                "state": "s",
+                "changes": [{"action": "create"}],
+            }
+        },
+    )
+    plan.add_entity(
+        "",
+        {"application_settings": {"config": "c", "state": None, "changes": None}},
+    )
+    plan.write(str(tmp_path / "plan.json"))
+
+    read_plan = Plan.read(str(tmp_path / "plan.json"))
+
+    assert read_plan.target == "ALL_DEFINED"
+    assert read_plan.gitlab_url == "https://gitlab.example.com"
+    assert read_plan.entities == plan.entities
+    assert read_plan.get_changes_count() == 1
+    assert read_plan.get_sections("group/other_project") is None
+
+
+def test__plan_of_incompatible_version_is_rejected(tmp_path):
+    (tmp_path / "plan.json").write_text('{"version": 0}')
+
+    with pytest.raises(SystemExit):
+        Plan.read(str(tmp_path / "plan.json"))
+
+
+def test__changes_are_planned_without_changing_anything(processor):
+
+    section_plan = processor.plan("group/project", CONFIGURATION)
+
+    assert section_plan["config"] == Plan.fingerprint(CONFIGURATION["variables"])
+    assert section_plan["state"] == Plan.fingerprint(VARIABLES_IN_GITLAB)
+    assert section_plan["changes"] == [
+        {
+            "action": "delete",
+            "entity": {"key": "NOT_CONFIGURED", "environment_scope": "*"},
+        },
+        {"action": "update", "entity": {"key": "CHANGED"}},
+        {"action": "create", "entity": {"key": "NEW"}},
+    ]
+    assert "enforce" in CONFIGURATION["variables"]
+    processor.gitlab.post_variable.assert_not_called()
+    processor.gitlab.put_variable.assert_not_called()
+    processor.gitlab.delete_variable.assert_not_called()
+
+
+def test__sections_not_in_configuration_or_skipped_are_not_planned(processor):
+
+    assert processor.plan("group/project", {}) is None
+    assert processor.plan("group/project", {"variables": {"skip": True}}) is None
+
+
+def test__plan_is_checked_before_applying(processor, variables_in_gitlab):
+    section_plan = processor.plan("group/project", CONFIGURATION)
+
+    assert processor.check_plan("group/project", CONFIGURATION, section_plan)
+    assert not processor.check_plan(
+        "group/project", CONFIGURATION, section_plan | {"changes": []}
+    )
+
+    with pytest.raises(PlanConflictException, match="has not been planned"):
+        processor.check_plan("group/project", CONFIGURATION, None)
+
+    changed_configuration = {
+        "variables": CONFIGURATION["variables"] | {"new": {"key": "NEW", "value": "4"}}
+    }
+    with pytest.raises(PlanConflictException, match="Configuration"):
+        processor.check_plan("group/project", changed_configuration, section_plan)
+
+    # a variable has been deleted in GitLab since the plan was made
+    del variables_in_gitlab[2]
+    with pytest.raises(PlanConflictException, match="State"):
+        processor.check_plan("group/project", CONFIGURATION, section_plan)
+
+
+def test__nothing_is_processed_if_any_section_conflicts_with_the_plan():
+    gitlab = MagicMock()
+    gitlab.profiler = RequestsProfiler()
+    gitlab.tracer = Tracer()
+    gitlab.fingerprints = SectionsFingerprints()
+    processors = AbstractProcessors(gitlab, MagicMock(), False)
+    for section in ["variables", "badges"]:
+        processor = MagicMock()
+        processor.configuration_name = section
+        processors.processors.append(processor)
+    # the badges have been changed in GitLab since the plan was made
+    processors.processors[1].check_plan.side_effect = PlanConflictException(
+        "State of section 'badges' in GitLab has changed since the plan was made"
+    )
+
+    with pytest.raises(PlanConflictException):
+        processors.process_entity(
+            "group/project",
+            {"variables": {}, "badges": {}},
+            dry_run=False,
+            diff_only_changed=False,
+            effective_configuration=MagicMock(),
+            only_sections="all",
+            planned_sections={"variables": {}, "badges": {}},
+        )
+
+    processors.processors[0].process.assert_not_called()
@@ -0,0 +1,337 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from gitlabform.cache import EntityCache
+from gitlabform.gitlab.core import UnexpectedResponseException
+from gitlabform.prefetch.groups import GroupsStatePrefetcher
+from gitlabform.prefetch.projects import ProjectsStatePrefetcher
+
+
+def _connection(nodes, end_cursor=None):
+    return {
+        "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor},
+        "nodes": nodes,
+    }
+
+
+MEMBER = {
+    "user": {"id": "gid://gitlab/User/7", "username": "Alice"},
+    "accessLevel": {"integerValue": 50},
+    "expiresAt": "2030-01-01T00:00:00Z",
+    "memberRole": None,
+}
+LABEL = {
+    "id": "gid://gitlab/GroupLabel/3",
+    "title": "bug",
+    "color": "#FF0000",
+    "description": None,
+    "textColor": "#FFFFFF",
+}
+VARIABLE = {
+    "key": "FOO",
+    "value": "bar",
+    "variableType": "ENV_VAR",
+    "protected": False,
+    "masked": True,
+    "raw": False,
+    "hidden": False,
+    "environmentScope": "*",
+    "description": None,
+}
+
+
+@pytest.fixture
+def gitlab():
+    gitlab = MagicMock()
+    gitlab.per_page = 100
+    gitlab.cache = EntityCache()
+    gitlab.configuration.get.side_effect = lambda key, default=None: default
+    return gitlab
+
+
+def test__sections_of_many_groups_are_get_with_a_single_query(gitlab):
+    def query_graphql(query, variables):
+        assert variables == {"path0": "group1", "path1": "group2"}
+        assert "group_variables" not in query.split("entity1")[1]
+        return {
+            "entity0": {
+                "group_members": _connection([MEMBER]),
+                "group_variables": _connection([VARIABLE]),
+            },
+            "entity1": {"group_labels": _connection([LABEL])},
+        }
+
+    gitlab.query_graphql.side_effect = query_graphql
+    prefetcher = GroupsStatePrefetcher(gitlab)
+
+    prefetcher.prefetch(
+        {
+            "group1": {"group_members", "group_variables", "group_settings"},
+            "group2": {"group_labels"},
+            "group3": {"group_badges"},
+        }
+    )
+
+    assert prefetcher.queries == 1
+    prefetched = gitlab.cache.prefetched
+    assert prefetched.take("group_members", "GROUP1") == [
+        {
+            "id": 7,
+            "username": "Alice",
+            "access_level": 50,
+            "expires_at": "2030-01-01",
+        }
+    ]
+    assert prefetched.take("group_variables", "group1") == [
+        {
+            "key": "FOO",
+            "value": "bar",
+            "variable_type": "env_var",
+            "protected": False,
+            "masked": True,
+            "raw": False,
+            "hidden": False,
+            "environment_scope": "*",
+            "description": None,
+        }
+    ]
+    assert prefetched.take("group_labels", "group2") == [
+        {
+            "id": 3,
+            "name": "bug",
+            "color": "#FF0000",
+            "description": None,
+            "text_color": "#FFFFFF",
+        }
+    ]
+    # ...and each entry can be used only once
+    assert prefetched.take("group_members", "group1") is None
+
+
+def test__further_pages_are_get(gitlab):
+    second_member = MEMBER | {
+        "user": {"id": "gid://gitlab/User/8", "username": "bob"},
+        "memberRole": {"id": "gid://gitlab/MemberRole/2"},
+    }
+
+    def query_graphql(query, variables):
+        if "after" in variables:
+            assert variables == {"path": "group1", "after": "cursor1"}
+            return {"entity": {"group_members": _connection([second_member])}}
+        return {"entity0": {"group_members": _connection([MEMBER], "cursor1")}}
+
+    gitlab.query_graphql.side_effect = query_graphql
+    prefetcher = GroupsStatePrefetcher(gitlab)
+
+    prefetcher.prefetch({"group1": {"group_members"}})
+
+    assert prefetcher.queries == 2
+    members = gitlab.cache.prefetched.take("group_members", "group1")
+    assert [member["username"] for member in members] == ["Alice", "bob"]
+    assert members[1]["member_role"] == {"id": 2}
+
+
+def test__what_cannot_be_get_is_not_stored(gitlab):
+    def query_graphql(query, variables):
+        return {
+            "entity0": None,
+            "entity1": {
+                "group_members": _connection([MEMBER]),
+                "group_variables": None,
+            },
+        }
+
+    gitlab.query_graphql.side_effect = query_graphql
+    prefetcher = GroupsStatePrefetcher(gitlab)
+
+    prefetcher.prefetch(
+        {
+            "group1": {"group_members"},
+            "group2": {"group_members", "group_variables"},
+        }
+    )
+
+    prefetched = gitlab.cache.prefetched
+    assert prefetched.take("group_members", "group1") is None
+    assert prefetched.take("group_variables", "group2") is None
+    assert prefetched.take("group_members", "group2") is not None
+
+
+def test__labels_are_not_prefetched_if_ancestor_labels_are_processed(gitlab):
+    queries = []
+
+    def query_graphql(query, variables):
+        queries.append((query, variables))
+        return {
+            "entity0": {"group_labels": _connection([LABEL])},
+            "entity1": {"group_members": _connection([MEMBER])},
+        }
+
+    gitlab.query_graphql.side_effect = query_graphql
+    prefetcher = GroupsStatePrefetcher(gitlab)
+
+    groups_sections = {
+        "group": {"group_labels"},
+        "group/subgroup": {"group_labels", "group_members"},
+        "other-group/subgroup": {"group_labels"},
+    }
+    prefetcher.prefetch(groups_sections, groups_sections)
+
+    # the labels of the "group/subgroup" would be outdated after processing the "group" ones
+    assert len(queries) == 1
+    query, variables = queries[0]
+    assert list(variables.values()) == [
+        "group",
+        "group/subgroup",
+        "other-group/subgroup",
+    ]
+    assert query.count("group_labels: labels(") == 2
+    assert query.count("group_members: groupMembers(") == 1
+
+
+def test__rejected_sections_are_not_prefetched_anymore(gitlab):
+    def query_graphql(query, variables):
+        if "memberRole" in query:
+            raise UnexpectedResponseException(
+                "Field 'memberRole' doesn't exist on type 'GroupMember'", 200, ""
+            )
+        return {
+            f"entity{index}": {"group_labels": _connection([LABEL])}
+            for index in range(len(variables))
+        }
+
+    gitlab.query_graphql.side_effect = query_graphql
+    gitlab.configuration.get.side_effect = lambda key, default=None: (
+        1 if key == "gitlab|prefetch|batch_size" else default
+    )
+    prefetcher = GroupsStatePrefetcher(gitlab)
+
+    prefetcher.prefetch(
+        {
+            "group1": {"group_members", "group_labels"},
+            "group2": {"group_members", "group_labels"},
+        }
+    )
+
+    assert prefetcher.unsupported_sections == {"group_members"}
+    # the failed query with both sections, then separate ones for each of them,
+    # and for the second group - only the one for labels
+    assert prefetcher.queries == 4
+    prefetched = gitlab.cache.prefetched
+    assert prefetched.take("group_labels", "group1") is not None
+    assert prefetched.take("group_labels", "group2") is not None
+    assert prefetched.take("group_members", "group1") is None
+
+
+def test__protected_branches_and_schedules_are_converted(gitlab):
+    def access_level(level, user=None, **extra):
+        return {
+            "accessLevel": level,
+            "accessLevelDescription": "Maintainers",
+            "user": {"id": f"gid://gitlab/User/{user}"} if user else None,
+            "group": None,
+        } | extra
+
+    def query_graphql(query, variables):
+        assert "branchRules" in query and "pipelineSchedules" in query
+        return {
+            "entity0": {
+                "branches": _connection(
+                    [
+                        {"name": "All branches", "branchProtection": None},
+                        {
+                            "name": "main",
+                            "branchProtection": {
+                                "allowForcePush": False,
+                                "codeOwnerApprovalRequired": True,
+                                "pushAccessLevels": {
+                                    "nodes": [access_level(40, deployKey=None)]
+                                },
+                                "mergeAccessLevels": {
+                                    "nodes": [access_level(30, user=5)]
+                                },
+                                "unprotectAccessLevels": {"nodes": []},
+                            },
+                        },
+                    ]
+                ),
+                "schedules": _connection(
+                    [
+                        {
+                            "id": "gid://gitlab/Ci::PipelineSchedule/12",
+                            "description": "nightly",
+                            "ref": "main",
+                            "cron": "0 1 * * *",
+                            "cronTimezone": "UTC",
+                            "active": True,
+                        }
+                    ]
+                ),
+            }
+        }
+
+    gitlab.query_graphql.side_effect = query_graphql
+    prefetcher = ProjectsStatePrefetcher(gitlab)
+
+    prefetcher.prefetch({"group/project": {"branches", "schedules", "hooks"}})
+
+    prefetched = gitlab.cache.prefetched
+    assert prefetched.take("branches", "group/project") == [
+        {
+            "name": "main",
+            "allow_force_push": False,
+            "code_owner_approval_required": True,
+            "push_access_levels": [
+                {
+                    "access_level": 40,
+                    "access_level_description": "Maintainers",
+                    "user_id": None,
+                    "group_id": None,
+                    "deploy_key_id": None,
+                }
+            ],
+            "merge_access_levels": [
+                {
+                    "access_level": 30,
+                    "access_level_description": "Maintainers",
+                    "user_id": 5,
+                    "group_id": None,
+                }
+            ],
+            "unprotect_access_levels": [],
+        }
+    ]
+    assert prefetched.take("schedules", "group/project") == [
+        {
+            "id": 12,
+            "description": "nightly",
+            "ref": "main",
+            "cron": "0 1 * * *",
+            "cron_timezone": "UTC",
+            "active": True,
+        }
+    ]
+
+
+def test__labels_are_not_prefetched_if_group_labels_are_processed(gitlab):
+    queries = []
+
+    def query_graphql(query, variables):
+        queries.append(query)
+        return {}
+
+    gitlab.query_graphql.side_effect = query_graphql
+    prefetcher = ProjectsStatePrefetcher(gitlab)
+
+    prefetcher.prefetch(
+        {
+            "group/subgroup/project": {"labels", "variables"},
+            "other-group/project": {"labels"},
+        },
+        {"Group": {"group_labels"}, "other-group": {"group_members"}},
+    )
+
+    assert len(queries) == 1
+    assert queries[0].count("labels: labels(") == 1
+    assert queries[0].count("variables: ciVariables(") == 1
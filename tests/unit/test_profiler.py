@@ -0,0 +1,154 @@
+import json
+import threading
+
+import pytest
+
+from gitlabform.profiler import RequestsProfiler
+
+
+@pytest.mark.parametrize(
+    "url, endpoint",
+    [
+        ("https://gitlab.example.com/api/v4/version", "version"),
+        (
+            "https://gitlab.example.com/api/v4/projects/group%2Fproject/protected_branches/main?per_page=100",
+            "projects/:id/protected_branches/:name",
+        ),
+        (
+            "https://gitlab.example.com/api/v4/projects/123/repository/files/dir%2Ffile.txt/raw",
+            "projects/:id/repository/files/:name/raw",
+        ),
+        (
+            "https://gitlab.example.com/api/v4/groups/group/members/42",
+            "groups/:id/members/:id",
+        ),
+    ],
+)
+def test__normalize_endpoint(url, endpoint):
+    assert RequestsProfiler.normalize_endpoint(url) == endpoint
+
+
+def test__disabled_profiler_doesnt_record():
+    profiler = RequestsProfiler()
+    profiler.record("GET", "https://gitlab.example.com/api/v4/version", 200, 0.1, 10)
+
+    assert profiler.records == []
+
+
+def test__requests_are_attributed_to_entities_and_sections_per_thread():
+    profiler = RequestsProfiler(enabled=True)
+
+    def process(entity: str, latency: float) -> None:
+        with profiler.entity(entity):
+            with profiler.section("members"):
+                profiler.record(
+                    "GET",
+                    f"https://gitlab.example.com/api/v4/projects/{entity.replace('/', '%2F')}/members",
+                    200,
+                    latency,
+                    100,
+                )
+            profiler.record(
+                "PUT",
+                f"https://gitlab.example.com/api/v4/projects/{entity.replace('/', '%2F')}",
+                200,
+                latency,
+                10,
+            )
+
+    threads = [
+        threading.Thread(target=process, args=("group/a", 1.0)),
+        threading.Thread(target=process, args=("group/b", 2.0)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    profiler.record("GET", "https://gitlab.example.com/api/v4/version", 200, 0.5, 1)
+
+    report = profiler.get_report()
+
+    assert report["endpoints"][0] == {
+        "method": "GET",
+        "endpoint": "projects/:id/members",
+        "count": 2,
+        "total_time": 3.0,
+        "bytes": 200,
+    }
+    assert {s["section"]: s["total_time"] for s in report["sections"]} == {
+        "members": 3.0,
+        None: 3.5,
+    }
+    assert {e["entity"]: e["count"] for e in report["entities"]} == {
+        "group/a": 2,
+        "group/b": 2,
+        None: 1,
+    }
+
+
+def test__write_report(tmp_path):
+    profiler = RequestsProfiler(enabled=True)
+    profiler.record("GET", "https://gitlab.example.com/api/v4/version", 200, 0.5, 1)
+    path = tmp_path / "profile.json"
+
+    profiler.write_report(str(path))
+
+    report = json.loads(path.read_text())
+    assert report["requests"] == [
+        {
+            "method": "GET",
+            "endpoint": "version",
+            "status": 200,
+            "latency": 0.5,
+            "bytes": 1,
+            "entity": None,
+            "section": None,
+        }
+    ]
+
+
+def test__sections_metrics():
+    profiler = RequestsProfiler()
+
+    for entity in ["group/a", "group/b", "group/c"]:
+        with profiler.entity(entity):
+            with profiler.section("members"):
+                profiler.count_request("GET")
+                profiler.count_request("POST")
+            with profiler.section("files", timed=False):
+                profiler.count_request("GET")
+    profiler.count_request("GET")
+
+    metrics = profiler.get_sections_metrics()
+
+    assert len(metrics) == 1
+    assert metrics[0]["section"] == "members"
+    assert metrics[0]["entities"] == 3
+    assert metrics[0]["p50"] <= metrics[0]["p95"] <= metrics[0]["time"]
+    assert (metrics[0]["gets"], metrics[0]["writes"]) == (3, 3)
+
+
+def test__write_metrics(tmp_path):
+    profiler = RequestsProfiler()
+    profiler.sections_durations["members"] = [1.0, 2.0, 3.0, 4.0]
+    profiler.sections_requests["members"]["GET"] = 10
+    path = tmp_path / "gitlabform.prom"
+
+    profiler.write_metrics(str(path))
+
+    lines = path.read_text().splitlines()
+    assert (
+        'gitlabform_section_duration_seconds{section="members",quantile="0.5"} 2.0'
+        in lines
+    )
+    assert (
+        'gitlabform_section_duration_seconds{section="members",quantile="0.95"} 4.0'
+        in lines
+    )
+    assert 'gitlabform_section_duration_seconds_sum{section="members"} 10.0' in lines
+    assert 'gitlabform_section_duration_seconds_count{section="members"} 4' in lines
+    assert 'gitlabform_section_requests_total{section="members",kind="get"} 10' in lines
+    assert (
+        'gitlabform_section_requests_total{section="members",kind="write"} 0' in lines
+    )
+    assert lines[-1] == "# EOF"
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from gitlabform.tracing import Tracer
+
+
+def _make_tracer(tmp_path) -> Tracer:
+    tracer = Tracer()
+    tracer.enable(file=str(tmp_path / "trace.json"))
+    return tracer
+
+
+def _spans_by_name(tracer: Tracer) -> dict:
+    return {span.name: span for span in tracer.spans}
+
+
+def test__disabled_tracer_doesnt_record(monkeypatch):
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_ENDPOINT", raising=False)
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", raising=False)
+    tracer = Tracer()
+    tracer.enable()
+
+    with tracer.span("run") as span:
+        assert span is None
+
+    assert tracer.spans == []
+
+
+def test__endpoint_from_environment(monkeypatch):
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", raising=False)
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://collector:4318/")
+    tracer = Tracer()
+    tracer.enable()
+
+    assert tracer.endpoint == "http://collector:4318/v1/traces"
+
+
+def test__spans_parents(tmp_path):
+    tracer = _make_tracer(tmp_path)
+
+    def process_in_thread():
+        with tracer.span("group/project"):
+            with tracer.span("members"):
+                pass
+
+    with tracer.span("run"):
+        thread = threading.Thread(target=process_in_thread)
+        thread.start()
+        thread.join()
+
+    spans = _spans_by_name(tracer)
+    assert spans["run"].parent_span_id is None
+    # a thread doesn't inherit the context, so the root span is used
+    assert spans["group/project"].parent_span_id == spans["run"].span_id
+    assert spans["members"].parent_span_id == spans["group/project"].span_id
+    assert len({span.trace_id for span in tracer.spans}) == 1
+
+
+def test__asyncio_tasks_spans_parents(tmp_path):
+    tracer = _make_tracer(tmp_path)
+
+    async def request(name: str):
+        with tracer.span(name):
+            await asyncio.sleep(0.01)
+
+    async def get_all():
+        with tracer.span("list"):
+            await asyncio.gather(request("GET a"), request("GET b"))
+
+    with tracer.span("run"):
+        asyncio.run(get_all())
+
+    spans = _spans_by_name(tracer)
+    assert spans["GET a"].parent_span_id == spans["list"].span_id
+    assert spans["GET b"].parent_span_id == spans["list"].span_id
+
+
+def test__exceptions_set_error_status_and_export(tmp_path):
+    tracer = _make_tracer(tmp_path)
+
+    with pytest.raises(ValueError):
+        with tracer.span("run", {"gitlabform.target": "ALL", "retries": 3}):
+            raise ValueError("boom")
+    tracer.export()
+
+    otlp = json.loads((tmp_path / "trace.json").read_text())
+    [span] = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert span["name"] == "run"
+    assert span["status"] == {"code": 2, "message": "boom"}
+    assert span["attributes"] == [
+        {"key": "gitlabform.target", "value": {"stringValue": "ALL"}},
+        {"key": "retries", "value": {"intValue": "3"}},
+    ]
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])